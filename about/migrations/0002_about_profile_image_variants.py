@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("about", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="about",
+            name="profile_image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
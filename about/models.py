@@ -5,6 +5,7 @@ class About(models.Model):
     name = models.CharField(max_length=200)
     bio = models.TextField()
     profile_image = models.ImageField(upload_to="about/", blank=True, null=True)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     skills = models.TextField(help_text="Comma separated skills")
     
 
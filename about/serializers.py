@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from portfolio.fields import ImageSrcsetField
 from .models import About
 
 class AboutSerializer(serializers.ModelSerializer):
+    profile_image_srcset = ImageSrcsetField(source="profile_image_variants")
+
     class Meta:
         model = About
         fields = "__all__"
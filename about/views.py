@@ -1,7 +1,9 @@
 from rest_framework import viewsets
+from portfolio.mixins import ConditionalGetMixin
 from .models import About
 from .serializers import AboutSerializer
 
-class AboutViewSet(viewsets.ModelViewSet):
+class AboutViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = About.objects.all()
     serializer_class = AboutSerializer
+    version_collections = ("about",)
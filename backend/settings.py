@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
+import tempfile
 
 import dj_database_url
 from dotenv import load_dotenv  # Add this import
@@ -45,19 +46,23 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     'rest_framework',
+    'rest_framework_simplejwt.token_blacklist',
+    'drf_yasg',
     'projects',
     "blog",
     "about",
     "contact",
     "corsheaders",
     "users",
-    "certifications"
+    "certifications",
+    "portfolio",
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "portfolio.compression.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -109,6 +114,23 @@ else:
         }
     }
 
+# Cache
+# Defaults to a per-process memory cache. Point CACHE_BACKEND/CACHE_LOCATION at a
+# shared backend (e.g. file or database cache) when running several workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "portfolio"),
+    }
+}
+
+# Public portfolio owner
+# Anonymous visitors see this user's profile, projects and certifications.
+
+PORTFOLIO_OWNER_USERNAME = os.environ.get("PORTFOLIO_OWNER_USERNAME", "AbuArwa001")
+PORTFOLIO_OWNER_TTL = int(os.environ.get("PORTFOLIO_OWNER_TTL", 300))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -155,26 +177,100 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Responsive image variants (see portfolio/images.py)
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANTS_ASYNC = True
+
+# Contact form queue (see contact/queue.py)
+CONTACT_QUEUE_SIZE = int(os.environ.get("CONTACT_QUEUE_SIZE", 1000))
+CONTACT_QUEUE_BATCH_SIZE = 100
+# Seconds the worker waits for more messages before writing a batch
+CONTACT_QUEUE_FLUSH_INTERVAL = 0.05
+# Requests that may insert directly while the queue is full; beyond that, 503
+CONTACT_QUEUE_SPILL_LIMIT = int(os.environ.get("CONTACT_QUEUE_SPILL_LIMIT", 4))
+CONTACT_QUEUE_ASYNC = True
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    # Put the user's claims in access tokens (users/tokens.py)
+    'TOKEN_OBTAIN_SERIALIZER': 'users.tokens.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.tokens.TokenRefreshSerializer',
 }
 
+# Per-process Bloom filter of blacklisted refresh tokens (users/blacklist.py)
+TOKEN_BLACKLIST_FILTER_CAPACITY = int(os.environ.get("TOKEN_BLACKLIST_FILTER_CAPACITY", 100000))
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = 0.001
+
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
+    # orjson-backed when it is installed (portfolio/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'portfolio.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'portfolio.renderers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Token buckets for views with a throttle_scope (portfolio/throttling.py);
+    # "<scope>" is per client IP, "<scope>.route" for all clients together
+    'DEFAULT_THROTTLE_CLASSES': (
+        'portfolio.throttling.TokenBucketThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '10/min',
+        'login.route': '300/min',
+        'register': '5/hour',
+        'register.route': '100/hour',
+        'contact': '5/min',
+        'contact.route': '120/min',
+    },
+    # Proxies in front of the app, for the client IP in X-Forwarded-For
+    'NUM_PROXIES': int(os.environ.get("NUM_PROXIES", 0)) or None,
 }
 
+# Response compression (portfolio/compression.py): smaller bodies are sent as is
+COMPRESSION_MIN_SIZE = 512
+# Brotli quality for dynamic responses; cached ones use the maximum
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Use orjson in portfolio/renderers.py when installed; set to 0 to force the stdlib
+ORJSON_ENABLED = os.environ.get("ORJSON_ENABLED", "1") != "0"
+
+# Throttle buckets: "memory" (per process) or "mmap" (shared by the workers on a host)
+THROTTLE_BACKEND = os.environ.get("THROTTLE_BACKEND", "memory")
+THROTTLE_MMAP_PATH = os.environ.get("THROTTLE_MMAP_PATH", os.path.join(tempfile.gettempdir(), "portfolio-throttle.bin"))
+THROTTLE_MMAP_SLOTS = 65536
+THROTTLE_MEMORY_MAX_KEYS = 10000
+
 # Auth user model
 AUTH_USER_MODEL = 'users.User'
+
+# Clerk authentication (users/authentication.py)
+CLERK_JWKS_URL = os.environ.get("CLERK_JWKS_URL")
+CLERK_PUBLISHABLE_KEY = os.environ.get("CLERK_PUBLISHABLE_KEY")
+# Seconds a fetched key set is used; it is refreshed in the background near the end
+CLERK_JWKS_TTL = int(os.environ.get("CLERK_JWKS_TTL", 3600))
+# Verified tokens remembered until they expire
+CLERK_VERIFIED_TOKEN_CACHE_SIZE = int(os.environ.get("CLERK_VERIFIED_TOKEN_CACHE_SIZE", 1024))
+# Seconds a Clerk user is served from memory without a database lookup
+CLERK_USER_CACHE_TTL = int(os.environ.get("CLERK_USER_CACHE_TTL", 60))
+CLERK_USER_CACHE_SIZE = int(os.environ.get("CLERK_USER_CACHE_SIZE", 1024))
+# Signing secret of the Clerk webhook endpoint (whsec_...)
+CLERK_WEBHOOK_SECRET = os.environ.get("CLERK_WEBHOOK_SECRET")
+# Apply received webhook events on a background thread (see users/webhooks.py)
+CLERK_WEBHOOKS_ASYNC = True
 # Get the string from .env, default to empty string if not found
 cors_origins = os.getenv("CORS_ALLOWED_ORIGINS", "")
 
@@ -10,6 +10,7 @@ from contact.views import ContactMessageViewSet
 from django.conf import settings
 from django.conf.urls.static import static
 from certifications.views import CertificationViewSet
+from portfolio.views import PortfolioSnapshotView, ThrottleStatsView
 
 router = routers.DefaultRouter()
 router.register(r'about', AboutViewSet)
@@ -37,6 +38,10 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/portfolio/', PortfolioSnapshotView.as_view(), name='portfolio-snapshot'),
+    path('api/throttles/', ThrottleStatsView.as_view(), name='throttle-stats'),
+    # Async public reads, for ASGI deployments (see portfolio/async_views.py)
+    path('api/async/', include('portfolio.async_urls')),
     path('api/', include(router.urls)),
     path('api/auth/', include('users.urls')),
     path('api/docs/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import BlogPost
+from blog.rendering import RENDERED_FIELDS, render_post
+from portfolio.versioning import bump_versions
+
+
+class Command(BaseCommand):
+    help = "Render stored HTML, excerpts and reading times for existing blog posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Rows loaded and written per batch (default: 500)",
+        )
+        parser.add_argument(
+            "--missing", action="store_true",
+            help="Only render posts that have no stored HTML yet",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        posts = BlogPost.objects.only("id", "content").order_by("id")
+        if options["missing"]:
+            posts = posts.filter(content_html="")
+
+        rendered = 0
+        batch = []
+        for post in posts.iterator(chunk_size=batch_size):
+            for field, value in zip(RENDERED_FIELDS, render_post(post.content)):
+                setattr(post, field, value)
+            batch.append(post)
+            if len(batch) >= batch_size:
+                BlogPost.objects.bulk_update(batch, RENDERED_FIELDS)
+                rendered += len(batch)
+                batch = []
+        if batch:
+            BlogPost.objects.bulk_update(batch, RENDERED_FIELDS)
+            rendered += len(batch)
+
+        # bulk_update sends no signals
+        if rendered:
+            bump_versions("blog")
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} blog posts"))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="blogpost",
+            index=models.Index(
+                fields=["created_at", "id"], name="blog_post_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+from django.db import migrations
+
+# The statements are kept here rather than imported from blog.search so
+# the migration does not change when the app code does.
+POSTGRES_INSTALL = [
+    """
+    ALTER TABLE blog_blogpost ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS blog_post_search_idx ON blog_blogpost USING GIN (search_vector)",
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS blog_post_search_idx",
+    "ALTER TABLE blog_blogpost DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS blog_blogpost_fts USING fts5(
+        title, content, content='blog_blogpost', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_blogpost_fts_insert AFTER INSERT ON blog_blogpost BEGIN
+        INSERT INTO blog_blogpost_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_blogpost_fts_delete AFTER DELETE ON blog_blogpost BEGIN
+        INSERT INTO blog_blogpost_fts(blog_blogpost_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_blogpost_fts_update AFTER UPDATE ON blog_blogpost BEGIN
+        INSERT INTO blog_blogpost_fts(blog_blogpost_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO blog_blogpost_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    # Index rows that existed before the triggers
+    "INSERT INTO blog_blogpost_fts(blog_blogpost_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS blog_blogpost_fts_insert",
+    "DROP TRIGGER IF EXISTS blog_blogpost_fts_delete",
+    "DROP TRIGGER IF EXISTS blog_blogpost_fts_update",
+    "DROP TABLE IF EXISTS blog_blogpost_fts",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0002_blogpost_blog_post_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"postgresql": POSTGRES_INSTALL, "sqlite": SQLITE_INSTALL}),
+            run({"postgresql": POSTGRES_UNINSTALL, "sqlite": SQLITE_UNINSTALL}),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:30
+
+from django.db import migrations, models
+
+# SQLite rebuilt blog_blogpost above, which dropped the FTS triggers
+# created by 0003; the statements are copied from there
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_blogpost_fts_insert AFTER INSERT ON blog_blogpost BEGIN
+        INSERT INTO blog_blogpost_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_blogpost_fts_delete AFTER DELETE ON blog_blogpost BEGIN
+        INSERT INTO blog_blogpost_fts(blog_blogpost_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_blogpost_fts_update AFTER UPDATE ON blog_blogpost BEGIN
+        INSERT INTO blog_blogpost_fts(blog_blogpost_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO blog_blogpost_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO blog_blogpost_fts(blog_blogpost_fts) VALUES ('rebuild')",
+]
+
+
+def reinstall_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in SQLITE_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0003_blogpost_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blogpost",
+            name="content_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="blogpost",
+            name="excerpt",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="blogpost",
+            name="reading_time",
+            field=models.PositiveSmallIntegerField(
+                default=0, editable=False, help_text="Minutes"
+            ),
+        ),
+        migrations.AddField(
+            model_name="blogpost",
+            name="word_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(reinstall_search_triggers, migrations.RunPython.noop),
+    ]
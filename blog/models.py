@@ -1,5 +1,7 @@
 from django.db import models
 
+from .rendering import RENDERED_FIELDS, render_post
+
 
 class BlogPost(models.Model):
     title = models.CharField(max_length=200)
@@ -7,5 +9,31 @@ class BlogPost(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Derived from content on save, see blog/rendering.py
+    content_html = models.TextField(blank=True, default="", editable=False)
+    excerpt = models.TextField(blank=True, default="", editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False, help_text="Minutes")
+
+    class Meta:
+        indexes = [
+            # Keyset pagination on (created_at, id)
+            models.Index(fields=["created_at", "id"], name="blog_post_created_id_idx"),
+        ]
+
+    def render(self):
+        """Recompute the rendered fields from ``content``."""
+        for field, value in zip(RENDERED_FIELDS, render_post(self.content)):
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.render()
+        elif "content" in update_fields:
+            self.render()
+            kwargs["update_fields"] = {*update_fields, *RENDERED_FIELDS}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.title
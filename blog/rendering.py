@@ -0,0 +1,40 @@
+"""
+Markdown rendering for blog posts.
+
+Posts are rendered once when they are saved; readers get the stored
+HTML, excerpt and reading time instead of rendering on every view.
+"""
+import html
+import re
+
+import markdown
+import nh3
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "sane_lists"]
+EXCERPT_WORDS = 50
+WORDS_PER_MINUTE = 200
+
+# Rendered fields stored on BlogPost, in the order returned by render_post
+RENDERED_FIELDS = ("content_html", "excerpt", "word_count", "reading_time")
+
+
+def render_markdown(text):
+    """Render Markdown to HTML and strip anything unsafe (scripts, handlers, ...)."""
+    return nh3.clean(markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS))
+
+
+def plain_text(content_html):
+    text = html.unescape(strip_tags(content_html))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def render_post(content):
+    """Return ``(content_html, excerpt, word_count, reading_time)`` for ``content``."""
+    content_html = render_markdown(content)
+    text = plain_text(content_html)
+    word_count = len(text.split())
+    excerpt = Truncator(text).words(EXCERPT_WORDS, truncate="…")
+    reading_time = max(1, round(word_count / WORDS_PER_MINUTE)) if word_count else 0
+    return content_html, excerpt, word_count, reading_time
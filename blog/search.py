@@ -0,0 +1,101 @@
+"""
+Full-text search over blog posts.
+
+PostgreSQL keeps a generated ``search_vector`` tsvector column on
+``blog_blogpost`` with a GIN index. SQLite keeps an FTS5 external
+content table, ``blog_blogpost_fts``, in sync through triggers. Both
+are created by migration ``0003_blogpost_search_index``; SQLite drops
+the triggers whenever Django rebuilds the table, so a migration that
+alters ``blog_blogpost`` has to create them again (as ``0004`` does).
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import BlogPost
+
+
+def _fts5_query(query):
+    # Quote every word so user input cannot use FTS5 query syntax
+    terms = re.findall(r"\w+", query)
+    return " ".join('"%s"' % term for term in terms)
+
+
+class SearchResults:
+    """
+    Ranked search results, sliceable like a queryset.
+
+    Slicing runs one query for the ranked ids of the requested page and
+    one for the posts themselves; ``len()`` counts matches in the index.
+    This is what Django's ``Paginator`` needs.
+    """
+
+    def __init__(self, query, queryset=None):
+        self.query = query
+        self.queryset = queryset if queryset is not None else BlogPost.objects.all()
+        self.vendor = connection.vendor
+        self._count = None
+
+    def _match_sql(self):
+        if self.vendor == "postgresql":
+            return (
+                "FROM blog_blogpost, websearch_to_tsquery('english', %s) query "
+                "WHERE search_vector @@ query",
+                "ORDER BY ts_rank_cd(search_vector, query) DESC, id DESC",
+                "id",
+                [self.query],
+            )
+        return (
+            "FROM blog_blogpost_fts WHERE blog_blogpost_fts MATCH %s",
+            "ORDER BY bm25(blog_blogpost_fts, 10.0, 1.0), rowid DESC",
+            "rowid",
+            [_fts5_query(self.query)],
+        )
+
+    def _fallback(self):
+        return self.queryset.filter(
+            Q(title__icontains=self.query) | Q(content__icontains=self.query)
+        ).order_by("-created_at", "-id")
+
+    def _is_empty(self):
+        return self.vendor == "sqlite" and not _fts5_query(self.query)
+
+    def count(self):
+        if self._count is None:
+            if self._is_empty():
+                self._count = 0
+            elif self.vendor not in ("postgresql", "sqlite"):
+                self._count = self._fallback().count()
+            else:
+                from_where, _, _, params = self._match_sql()
+                with connection.cursor() as cursor:
+                    cursor.execute(f"SELECT count(*) {from_where}", params)
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        if self._is_empty() or stop <= start:
+            return []
+        if self.vendor not in ("postgresql", "sqlite"):
+            return list(self._fallback()[start:stop])
+        from_where, order_by, id_column, params = self._match_sql()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {id_column} {from_where} {order_by} LIMIT %s OFFSET %s",
+                params + [stop - start, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query, queryset=None):
+    return SearchResults(query, queryset)
@@ -5,3 +5,10 @@ class BlogPostSerializer(serializers.ModelSerializer):
     class Meta:
         model = BlogPost
         fields = "__all__"
+
+
+class BlogPostSummarySerializer(serializers.ModelSerializer):
+    """List representation without the post body."""
+    class Meta:
+        model = BlogPost
+        fields = ["id", "title", "slug", "excerpt", "word_count", "reading_time", "created_at"]
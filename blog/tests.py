@@ -1,3 +1,97 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import BlogPost
+
+
+class BlogSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.django = BlogPost.objects.create(
+            title="Scaling Django", slug="scaling-django",
+            content="Caching querysets and indexing tables.",
+        )
+        cls.networks = BlogPost.objects.create(
+            title="Home networks", slug="home-networks",
+            content="Routers, switches and a little Django on the side.",
+        )
+        BlogPost.objects.create(title="Linux tips", slug="linux-tips", content="Shell aliases.")
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def search(self, query):
+        response = self.client.get("/api/blog/", {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_ranks_title_matches_first(self):
+        body = self.search("django")
+        self.assertEqual(body["count"], 2)
+        self.assertEqual(
+            [post["id"] for post in body["results"]], [self.django.pk, self.networks.pk]
+        )
+
+    def test_stemming(self):
+        body = self.search("router")
+        self.assertEqual([post["id"] for post in body["results"]], [self.networks.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.networks.content = "Nothing relevant any more."
+        self.networks.save()
+        self.assertEqual(self.search("routers")["count"], 0)
+        self.django.delete()
+        self.assertEqual(self.search("django")["count"], 0)
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.search('django* "(:')["count"], 2)
+        self.assertEqual(self.search("***")["count"], 0)
+
+    def test_paginated_with_fixed_query_count(self):
+        with self.assertNumQueries(3):
+            body = self.search("django")
+        self.assertIsNone(body["next"])
+
+
+class BlogRenderingTests(TestCase):
+    def test_renders_and_sanitizes_on_save(self):
+        post = BlogPost.objects.create(
+            title="Rendered", slug="rendered",
+            content="# Heading\n\nSome **bold** text.<script>alert(1)</script>",
+        )
+        self.assertIn("<h1>Heading</h1>", post.content_html)
+        self.assertIn("<strong>bold</strong>", post.content_html)
+        self.assertNotIn("<script>", post.content_html)
+        self.assertEqual(post.excerpt, "Heading Some bold text.")
+        self.assertEqual(post.word_count, 4)
+        self.assertEqual(post.reading_time, 1)
+
+    def test_update_fields_with_content_rerenders(self):
+        post = BlogPost.objects.create(title="Post", slug="post", content="old")
+        post.content = " ".join(["word"] * 600)
+        post.save(update_fields=["content"])
+        post.refresh_from_db()
+        self.assertEqual(post.word_count, 600)
+        self.assertEqual(post.reading_time, 3)
+        self.assertTrue(post.excerpt.endswith("…"))
+
+    def test_summary_list_omits_body(self):
+        BlogPost.objects.create(title="Post", slug="post", content="Body text")
+        response = APIClient().get("/api/blog/", {"summary": "true"})
+        post = response.json()["results"][0]
+        self.assertEqual(post["excerpt"], "Body text")
+        self.assertNotIn("content", post)
+        self.assertNotIn("content_html", post)
 
-# Create your tests here.
+    def test_render_command_fills_existing_rows(self):
+        BlogPost.objects.bulk_create(
+            BlogPost(title=f"Post {i}", slug=f"post-{i}", content=f"*post* {i}") for i in range(5)
+        )
+        call_command("render_blog_posts", "--missing", "--batch-size", "2", stdout=StringIO())
+        self.assertFalse(BlogPost.objects.filter(content_html="").exists())
+        self.assertEqual(
+            BlogPost.objects.get(slug="post-3").content_html, "<p><em>post</em> 3</p>"
+        )
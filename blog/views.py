@@ -1,7 +1,42 @@
 from rest_framework import viewsets
+from portfolio.mixins import ConditionalGetMixin
+from portfolio.pagination import CreatedAtCursorPagination, SearchPagination
 from .models import BlogPost
-from .serializers import BlogPostSerializer
+from .search import search_posts
+from .serializers import BlogPostSerializer, BlogPostSummarySerializer
 
-class BlogPostViewSet(viewsets.ModelViewSet):
-    queryset = BlogPost.objects.all().order_by("-created_at")
+class BlogPostViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = BlogPost.objects.all().order_by("-created_at", "-id")
     serializer_class = BlogPostSerializer
+    pagination_class = CreatedAtCursorPagination
+    version_collections = ("blog",)
+
+    def is_summary(self):
+        # GET /api/blog/?summary=true returns excerpts without the post body
+        if self.action != "list":
+            return False
+        return self.request.query_params.get("summary", "").lower() in ("1", "true", "yes")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.is_summary():
+            queryset = queryset.only(*BlogPostSummarySerializer.Meta.fields)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return BlogPostSummarySerializer
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return super().list(request, *args, **kwargs)
+
+        # Ranked full-text search, see blog/search.py
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(
+            search_posts(query, self.get_queryset()), request, view=self
+        )
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
@@ -2,7 +2,7 @@ from rest_framework import serializers
 from .models import Certification
 
 class CertificationSerializer(serializers.ModelSerializer):
-    user = serializers.ReadOnlyField(source='user.id')
+    user = serializers.ReadOnlyField(source='user_id')
     class Meta:
         model = Certification
         fields = "__all__"
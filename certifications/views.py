@@ -4,12 +4,14 @@ from django.shortcuts import render
 from rest_framework import viewsets
 from .models import Certification
 from .serializers import CertificationSerializer
-from users.models import User
+from portfolio.mixins import ConditionalGetMixin
+from portfolio.owner import get_public_owner
 
 
-class CertificationViewSet(viewsets.ModelViewSet):
+class CertificationViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Certification.objects.all()
     serializer_class = CertificationSerializer
+    version_collections = ('certifications',)
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -26,9 +28,8 @@ class CertificationViewSet(viewsets.ModelViewSet):
         if self.request.user.is_authenticated:
             return Certification.objects.filter(user=self.request.user)
         
-        # Otherwise, show certifications for the specific email
-        try:
-            user = User.objects.get(email='khalfan@khalfanathman.dev')
-            return Certification.objects.filter(user=user)
-        except User.DoesNotExist:
-            return Certification.objects.none()
\ No newline at end of file
+        # Otherwise, show the public portfolio owner's certifications
+        owner = get_public_owner()
+        if not owner:
+            return Certification.objects.none()
+        return Certification.objects.filter(user_id=owner.user_id)
\ No newline at end of file
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contact", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contactmessage",
+            index=models.Index(
+                fields=["created_at", "id"], name="contact_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contact", "0002_contactmessage_contact_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="contactmessage",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+    ]
@@ -1,10 +1,19 @@
 from django.db import models
+from django.utils import timezone
 
 class ContactMessage(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField()
     message = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the submission is accepted, which can be before it is written
+    # (contact.queue)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination on (created_at, id)
+            models.Index(fields=["created_at", "id"], name="contact_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"Message from {self.name}"
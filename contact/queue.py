@@ -0,0 +1,145 @@
+"""
+Buffered ingestion of contact form submissions.
+
+``POST /api/contact/`` validates a submission, puts it on a bounded
+in-process queue and answers 202 without touching the database. A single
+worker thread writes queued messages with ``bulk_create`` in batches, so
+a burst of submissions holds one database connection instead of one per
+request.
+
+When the queue is full, submissions fall back to a direct insert into the
+table, but only ``CONTACT_QUEUE_SPILL_LIMIT`` requests at a time; past
+that the request is refused (503) until the worker catches up. Whatever
+is still queued when the process exits is written before it does.
+
+The queue itself is not durable: submissions still in it are lost if the
+process is killed without exiting normally. ``created_at`` is stamped
+when a submission is accepted, so messages keep their order and time
+however long they wait to be written.
+"""
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from portfolio.versioning import bump_versions
+
+from .models import ContactMessage
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """The queue and the direct-insert fallback are both saturated."""
+
+
+class ContactQueue:
+    def __init__(self, maxsize, batch_size, spill_limit, flush_interval):
+        self.queue = queue.Queue(maxsize)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill = threading.BoundedSemaphore(spill_limit) if spill_limit else None
+        self.lock = threading.Lock()
+        self.worker = None
+
+    def put(self, data):
+        """
+        Queue a validated submission; returns False if it was written directly.
+
+        Raises ``QueueFull`` when it can be neither queued nor written.
+        """
+        data = {**data, "created_at": timezone.now()}
+        try:
+            self.queue.put_nowait(data)
+        except queue.Full:
+            if self.spill is None or not self.spill.acquire(blocking=False):
+                raise QueueFull
+            try:
+                ContactMessage.objects.create(**data)
+            finally:
+                self.spill.release()
+            return False
+
+        if settings.CONTACT_QUEUE_ASYNC:
+            self.start()
+        else:
+            transaction.on_commit(self.flush)
+        return True
+
+    def _take(self, block):
+        """Up to ``batch_size`` queued submissions, waiting for the first if ``block``."""
+        batch = []
+        try:
+            batch.append(self.queue.get(block=block))
+            while len(batch) < self.batch_size:
+                # Wait briefly for more, so a burst is written in one query
+                batch.append(self.queue.get(timeout=self.flush_interval))
+        except queue.Empty:
+            pass
+        return batch
+
+    def write(self, batch):
+        try:
+            ContactMessage.objects.bulk_create(
+                [ContactMessage(**data) for data in batch], batch_size=self.batch_size
+            )
+        except Exception:
+            # Retry one by one so a single bad row does not lose the batch
+            logger.exception("Writing %d contact messages failed; retrying singly", len(batch))
+            for data in batch:
+                try:
+                    ContactMessage.objects.create(**data)
+                except Exception:
+                    logger.exception("Dropping contact message from %s", data.get("email"))
+        # bulk_create sends no signals
+        bump_versions("contact")
+
+    def flush(self):
+        """Write everything queued so far; returns the number of messages."""
+        written = 0
+        while True:
+            batch = self._take(block=False)
+            if not batch:
+                return written
+            self.write(batch)
+            written += len(batch)
+
+    def _run(self):
+        while True:
+            batch = self._take(block=True)
+            try:
+                self.write(batch)
+            except Exception:
+                logger.exception("Contact queue worker failed")
+            finally:
+                # Do not hold a connection while idle
+                if self.queue.empty():
+                    connections.close_all()
+
+    def start(self):
+        if self.worker is not None:
+            return
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, name="contact-queue", daemon=True)
+                self.worker.start()
+
+
+contact_queue = ContactQueue(
+    settings.CONTACT_QUEUE_SIZE,
+    settings.CONTACT_QUEUE_BATCH_SIZE,
+    settings.CONTACT_QUEUE_SPILL_LIMIT,
+    settings.CONTACT_QUEUE_FLUSH_INTERVAL,
+)
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        contact_queue.flush()
+    except Exception:
+        logger.exception("Flushing the contact queue on exit failed")
@@ -1,3 +1,69 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from portfolio.throttling import get_backend
+from users.models import User
+
+from .models import ContactMessage
+from .queue import ContactQueue, contact_queue
+
+SUBMISSION = {"name": "Visitor", "email": "visitor@example.com", "message": "Hi"}
+
+
+@override_settings(CONTACT_QUEUE_ASYNC=False)
+class ContactQueueTests(TestCase):
+    def setUp(self):
+        get_backend().reset()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("owner", "owner@example.com"))
+
+    def post(self, **data):
+        return self.client.post("/api/contact/", {**SUBMISSION, **data})
+
+    def test_submissions_are_written_in_one_batch(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for index in range(3):
+                response = self.post(name=f"Visitor {index}")
+                self.assertEqual(response.status_code, 202)
+                self.assertEqual(response.data["name"], f"Visitor {index}")
+        self.assertFalse(ContactMessage.objects.exists())
+        with self.assertNumQueries(1):
+            self.assertEqual(contact_queue.flush(), 3)
+        self.assertEqual(ContactMessage.objects.count(), 3)
+        # The remaining flush callbacks find nothing to write
+        for callback in callbacks:
+            callback()
+        self.assertEqual(ContactMessage.objects.count(), 3)
+
+    def test_created_at_is_when_the_submission_was_accepted(self):
+        accepted = timezone.now() - timedelta(minutes=5)
+        with self.captureOnCommitCallbacks(), mock.patch("contact.queue.timezone.now", return_value=accepted):
+            self.assertEqual(self.post().status_code, 202)
+        contact_queue.flush()
+        self.assertEqual(ContactMessage.objects.get().created_at, accepted)
+
+    def test_invalid_submission_is_not_queued(self):
+        with mock.patch.object(contact_queue, "put") as put:
+            self.assertEqual(self.post(email="not-an-email").status_code, 400)
+        put.assert_not_called()
+
+    def test_full_queue_falls_back_to_direct_insert(self):
+        with mock.patch("contact.views.contact_queue", ContactQueue(1, 10, 1, 0)) as small:
+            self.assertEqual(self.post(name="Queued").status_code, 202)
+            self.assertEqual(self.post(name="Direct").status_code, 202)
+            self.assertEqual(list(ContactMessage.objects.values_list("name", flat=True)), ["Direct"])
+            small.flush()
+        self.assertEqual(ContactMessage.objects.count(), 2)
+
+    def test_backpressure_once_queue_and_fallback_are_full(self):
+        with mock.patch("contact.views.contact_queue", ContactQueue(1, 10, 0, 0)) as small:
+            self.assertEqual(self.post().status_code, 202)
+            response = self.post()
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response["Retry-After"], "5")
+            small.flush()
+        self.assertEqual(ContactMessage.objects.count(), 1)
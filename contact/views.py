@@ -1,7 +1,32 @@
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+from portfolio.mixins import ConditionalGetMixin
+from portfolio.pagination import CreatedAtCursorPagination
 from .models import ContactMessage
+from .queue import QueueFull, contact_queue
 from .serializers import ContactMessageSerializer
 
-class ContactMessageViewSet(viewsets.ModelViewSet):
-    queryset = ContactMessage.objects.all().order_by("-created_at")
+class ContactMessageViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = ContactMessage.objects.all().order_by("-created_at", "-id")
     serializer_class = ContactMessageSerializer
+    pagination_class = CreatedAtCursorPagination
+    version_collections = ("contact",)
+
+    def get_throttles(self):
+        # Only submissions are throttled (portfolio.throttling)
+        self.throttle_scope = "contact" if self.action == "create" else None
+        return super().get_throttles()
+
+    def create(self, request, *args, **kwargs):
+        # Validated here, written in batches by contact.queue
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            contact_queue.put(serializer.validated_data)
+        except QueueFull:
+            return Response(
+                {"detail": "Too many messages right now, please try again shortly."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "5"},
+            )
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
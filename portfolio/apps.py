@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PortfolioConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "portfolio"
+
+    def ready(self):
+        # Connect cache invalidation receivers
+        from . import signals  # noqa: F401
@@ -0,0 +1,15 @@
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path('profile/', async_views.profile, name='async-profile'),
+    path('profile/skill-categories/', async_views.skill_categories, name='async-skill-categories'),
+    path('profile/skills/', async_views.skills, name='async-skills'),
+    path('profile/certifications/', async_views.profile_certifications, name='async-profile-certifications'),
+    path('profile/languages/', async_views.languages, name='async-languages'),
+    path('projects/', async_views.projects, name='async-projects'),
+    path('certifications/', async_views.certifications, name='async-certifications'),
+    path('blog/', async_views.blog_list, name='async-blog-list'),
+    path('blog/<int:pk>/', async_views.blog_detail, name='async-blog-detail'),
+]
@@ -0,0 +1,239 @@
+"""
+Async versions of the public, read-only portfolio endpoints.
+
+Mounted under ``/api/async/``, they return what anonymous visitors get
+from the sync endpoints (the public owner's profile, skill categories,
+skills, certifications, languages and projects, and the blog) as plain
+Django async views, so under ASGI (see the README) a request waiting on
+the database does not hold a worker: the event loop keeps serving other
+requests meanwhile. Authentication is not looked at; signed-in users
+read and write their own data through the sync API.
+
+Queries go through Django's async ORM. Django runs the ORM calls of a
+request one after another on a thread of that request, so queries of
+different requests overlap while those of one request are sent back to
+back; independent queries are still issued together with
+``asyncio.gather`` so a request waits on the database once. Responses
+carry the same ``ETag``/``Last-Modified`` validators as the sync views
+(``portfolio.mixins``) and a matching conditional request is answered
+with a 304 without any query.
+"""
+import asyncio
+import functools
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from blog.models import BlogPost
+from blog.serializers import BlogPostSerializer, BlogPostSummarySerializer
+from certifications.models import Certification
+from certifications.serializers import CertificationSerializer
+from projects.models import Project
+from projects.serializers import ProjectSerializer
+from users.models import Certification as ProfileCertification
+from users.models import Language, Skill, SkillCategory, UserProfile
+from users.serializers import (
+    CertificationSerializer as ProfileCertificationSerializer,
+    LanguageSerializer,
+    SkillCategorySerializer,
+    SkillSerializer,
+    UserProfileSerializer,
+)
+
+from .mixins import last_modified
+from .owner import get_public_owner
+from .pagination import CreatedAtCursorPagination
+from .renderers import JSONRenderer
+from .versioning import get_versions
+
+# The owner is usually served from process memory; a lookup is a query
+public_owner = sync_to_async(get_public_owner)
+
+_renderer = JSONRenderer()
+
+
+class ProfileFieldsSerializer(UserProfileSerializer):
+    """``UserProfileSerializer`` without the relation id lists, which are fetched separately."""
+
+    class Meta(UserProfileSerializer.Meta):
+        fields = [
+            name for name in UserProfileSerializer.Meta.fields
+            if name not in ('skill_categories', 'certifications', 'languages')
+        ]
+
+
+def json_response(data, status=200):
+    return HttpResponse(_renderer.render(data), content_type='application/json', status=status)
+
+
+def not_modified(request, collections):
+    """
+    Validators of ``collections`` for ``request`` (as in
+    ``ConditionalGetMixin``), and a 304 response if the client has them.
+    """
+    stamp = max(get_versions(collections))
+    fingerprint = f"{stamp!r}:anonymous:{request.get_full_path()}:application/json"
+    etag = '"%s"' % hashlib.md5(fingerprint.encode()).hexdigest()
+    validators = (etag, last_modified(stamp))
+    response = get_conditional_response(request, etag=etag, last_modified=validators[1])
+    if response is not None and response.status_code == 304:
+        return validators, finalize(HttpResponseNotModified(), validators)
+    return validators, None
+
+
+def finalize(response, validators):
+    if response.status_code in (200, 304):
+        etag, modified = validators
+        response['ETag'] = etag
+        if modified is not None:
+            response['Last-Modified'] = http_date(modified)
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional(*collections):
+    """Decorate an async view with the validators of ``collections``."""
+    def decorator(view):
+        @require_safe
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            # Stamps are read from the cache, which may be a database cache
+            validators, response = await sync_to_async(not_modified)(request, collections)
+            if response is not None:
+                return response
+            return finalize(await view(request, *args, **kwargs), validators)
+        return wrapper
+    return decorator
+
+
+async def as_list(queryset):
+    return [obj async for obj in queryset]
+
+
+async def as_ids(queryset):
+    return [pk async for pk in queryset.values_list('pk', flat=True)]
+
+
+@conditional('profile')
+async def profile(request):
+    owner = await public_owner()
+    if not owner:
+        return json_response({'error': 'User not found'}, status=404)
+    if not owner.profile_id:
+        return json_response({'error': 'Profile not found'}, status=404)
+
+    # The profile row and its three relations are independent of each other
+    try:
+        instance, categories, certifications, languages = await asyncio.gather(
+            UserProfile.objects.select_related('user').aget(pk=owner.profile_id),
+            as_ids(SkillCategory.objects.filter(userprofile=owner.profile_id)),
+            as_ids(ProfileCertification.objects.filter(userprofile=owner.profile_id)),
+            as_ids(Language.objects.filter(userprofile=owner.profile_id)),
+        )
+    except UserProfile.DoesNotExist:
+        return json_response({'error': 'Profile not found'}, status=404)
+    return json_response({
+        **ProfileFieldsSerializer(instance).data,
+        'skill_categories': categories,
+        'certifications': certifications,
+        'languages': languages,
+    })
+
+
+async def profile_list(request, queryset, serializer_class):
+    """The owner's rows of a profile relation; ``queryset`` takes the profile id."""
+    owner = await public_owner()
+    if not owner or not owner.profile_id:
+        return json_response([])
+    rows = await as_list(queryset(owner.profile_id))
+    return json_response(serializer_class(rows, many=True, context={'request': request}).data)
+
+
+@conditional('profile')
+async def skill_categories(request):
+    return await profile_list(
+        request,
+        lambda profile_id: SkillCategory.objects.filter(userprofile=profile_id).prefetch_related('skills'),
+        SkillCategorySerializer,
+    )
+
+
+@conditional('profile')
+async def skills(request):
+    return await profile_list(
+        request, lambda profile_id: Skill.objects.filter(category__userprofile=profile_id), SkillSerializer
+    )
+
+
+@conditional('profile')
+async def profile_certifications(request):
+    return await profile_list(
+        request,
+        lambda profile_id: ProfileCertification.objects.filter(userprofile=profile_id),
+        ProfileCertificationSerializer,
+    )
+
+
+@conditional('profile')
+async def languages(request):
+    return await profile_list(
+        request, lambda profile_id: Language.objects.filter(userprofile=profile_id), LanguageSerializer
+    )
+
+
+async def owner_list(request, model, serializer_class):
+    owner = await public_owner()
+    if not owner:
+        return json_response([])
+    rows = await as_list(model.objects.filter(user_id=owner.user_id))
+    return json_response(serializer_class(rows, many=True, context={'request': request}).data)
+
+
+@conditional('projects')
+async def projects(request):
+    return await owner_list(request, Project, ProjectSerializer)
+
+
+@conditional('certifications')
+async def certifications(request):
+    return await owner_list(request, Certification, CertificationSerializer)
+
+
+@conditional('blog')
+async def blog_list(request):
+    """
+    A page of posts, newest first, with the same cursors as ``/api/blog/``
+    and its ``?summary=true`` excerpts. Search (``?q=``) is only on the
+    sync endpoint.
+    """
+    queryset = BlogPost.objects.order_by('-created_at', '-id')
+    serializer_class = BlogPostSerializer
+    if request.GET.get('summary', '').lower() in ('1', 'true', 'yes'):
+        queryset = queryset.only(*BlogPostSummarySerializer.Meta.fields)
+        serializer_class = BlogPostSummarySerializer
+
+    # CursorPagination has no async API; its query runs on the request's
+    # database thread like the async ORM's
+    drf_request = Request(request)
+    paginator = CreatedAtCursorPagination()
+    try:
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, drf_request)
+    except APIException as exc:  # an invalid cursor
+        return json_response({'detail': exc.detail}, status=exc.status_code)
+    data = serializer_class(page, many=True, context={'request': drf_request}).data
+    return json_response(paginator.get_paginated_response(data).data)
+
+
+@conditional('blog')
+async def blog_detail(request, pk):
+    try:
+        post = await BlogPost.objects.aget(pk=pk)
+    except BlogPost.DoesNotExist:
+        return json_response({'detail': 'No BlogPost matches the given query.'}, status=404)
+    return json_response(BlogPostSerializer(post, context={'request': request}).data)
@@ -0,0 +1,525 @@
+"""
+Endpoint benchmark: seeded data, a replayed request mix and baselines.
+
+``seed`` fills an empty database at a given ``Scale``: the public owner
+with an about page, skill categories, skills, languages, projects, both
+kinds of certifications and blog posts, other users with profiles and
+contact messages. ``replay`` sends a weighted mix of requests (``ROUTES``)
+covering every route of ``backend/urls.py`` and ``users/urls.py`` except
+the Django admin to the WSGI application in-process, one at a time, and
+records the latency, status and queries of each. Every route is sent at
+least once; the rest of the requests are drawn by weight.
+
+``summarize`` reduces the samples to throughput, p50/p95/p99 latency and
+queries per request, overall and per route; the result is what
+``manage.py bench_endpoints --save`` writes as a JSON baseline, and
+``compare`` reports the changes of a later run against one.
+
+Requests run with the settings of ``benchmark_settings``: throttling is
+off, and the contact queue, Clerk webhooks and image variants are
+processed within the request, so their work is measured too.
+"""
+import base64
+import json
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, get_resolver, resolve
+from PIL import Image
+from svix.webhooks import Webhook
+
+from about.models import About
+from blog.models import BlogPost
+from certifications.models import Certification
+from contact.models import ContactMessage
+from contact.queue import contact_queue
+from projects.models import Project
+from users.blacklist import blacklist_filter
+from users.models import Certification as ProfileCertification
+from users.models import Language, Skill, SkillCategory, User, UserProfile
+from users.tokens import TokenObtainPairSerializer
+
+from .owner import invalidate_public_owner
+from .throttling import get_backend
+from .versioning import bump_versions
+
+Scale = namedtuple(
+    "Scale", ["users", "projects", "certifications", "skills", "posts", "messages"],
+    defaults=[10, 50, 20, 50, 100, 500],
+)
+
+PASSWORD = "benchmark-password"
+SKILLS_PER_CATEGORY = 10
+LANGUAGES = ("English", "Swahili", "Arabic", "French", "German")
+WEBHOOK_SECRET = "whsec_" + base64.b64encode(b"portfolio-benchmark-webhook-key!").decode()
+# Routes of these prefixes are not part of the API
+EXCLUDED_PREFIXES = ("admin/",)
+PERCENTILES = (50, 95, 99)
+
+
+def seed(scale):
+    """
+    Create the benchmark data in an empty database; returns the ids the
+    request mix refers to.
+    """
+    password = make_password(PASSWORD)
+    owner = User.objects.create(
+        username=settings.PORTFOLIO_OWNER_USERNAME, email="owner@example.com",
+        password=password, is_staff=True,
+    )
+    profile = UserProfile.objects.create(
+        user=owner, title="Software Engineer", bio="Builds things for the web.", location="Nairobi",
+    )
+    about = About.objects.create(profile=profile, name="Owner", bio="Bio", skills="Python, Django, React")
+
+    users = User.objects.bulk_create(
+        User(username=f"user{i}", email=f"user{i}@example.com", password=password)
+        for i in range(scale.users)
+    )
+    UserProfile.objects.bulk_create(UserProfile(user=user) for user in users)
+
+    categories = SkillCategory.objects.bulk_create(
+        SkillCategory(name=f"Category {i}")
+        for i in range(max(1, -(-scale.skills // SKILLS_PER_CATEGORY)))
+    )
+    Skill.objects.bulk_create(
+        Skill(name=f"Skill {i}", level=i % 100, category=categories[i // SKILLS_PER_CATEGORY])
+        for i in range(scale.skills)
+    )
+    profile_certifications = ProfileCertification.objects.bulk_create(
+        ProfileCertification(title=f"Cert {i}", issuer="Issuer", date="2024", user=owner)
+        for i in range(scale.certifications)
+    )
+    languages = Language.objects.bulk_create(
+        Language(name=name, proficiency="Fluent") for name in LANGUAGES
+    )
+    profile.skill_categories.set(categories)
+    profile.certifications.set(profile_certifications)
+    profile.languages.set(languages)
+
+    Project.objects.bulk_create(
+        Project(
+            user=owner, name=f"Project {i}", description="A project. " * 20,
+            link=f"https://example.com/{i}", status="completed", completion="100%",
+            technologies="Python, Django, PostgreSQL", type="web",
+        )
+        for i in range(scale.projects)
+    )
+    Certification.objects.bulk_create(
+        Certification(
+            user=owner, name=f"Certification {i}", issuer="Issuer", date=date(2024, 1, 1),
+            badge="https://example.com/badge.png", type="other",
+        )
+        for i in range(scale.certifications)
+    )
+    posts = []
+    for i in range(scale.posts):
+        post = BlogPost(
+            title=f"Post {i} about Django", slug=f"post-{i}",
+            content=f"# Post {i}\n\n" + "Some *markdown* about Django and Python. " * 60,
+        )
+        post.render()
+        posts.append(post)
+    BlogPost.objects.bulk_create(posts, batch_size=500)
+    ContactMessage.objects.bulk_create(
+        (
+            ContactMessage(name=f"Visitor {i}", email=f"visitor{i}@example.com", message="Hello! " * 20)
+            for i in range(scale.messages)
+        ),
+        batch_size=500,
+    )
+
+    # bulk_create sends no signals
+    bump_versions("profile", "projects", "certifications", "blog", "contact", "about")
+    invalidate_public_owner()
+    return {
+        "owner": owner.pk,
+        "profile": profile.pk,
+        "about": about.pk,
+        "project": Project.objects.values_list("pk", flat=True).first() or 0,
+        "certification": Certification.objects.values_list("pk", flat=True).first() or 0,
+        "profile_certification": profile_certifications[0].pk if profile_certifications else 0,
+        "language": languages[0].pk,
+        "skill_category": categories[0].pk,
+        "skill": Skill.objects.values_list("pk", flat=True).first() or 0,
+        "post": BlogPost.objects.values_list("pk", flat=True).first() or 0,
+        "message": ContactMessage.objects.values_list("pk", flat=True).first() or 0,
+    }
+
+
+def access_token(user):
+    return str(TokenObtainPairSerializer.get_token(user).access_token)
+
+
+class Route:
+    """
+    A request of the mix. ``path`` may use the ``seed`` ids
+    (``"/api/projects/{project}/"``). ``prepare(fixture, number)`` returns
+    a replacement ``path``, ``data`` or extra ``headers`` before each
+    request, outside the timing; ``after(fixture, body)`` sees successful
+    responses.
+    """
+
+    def __init__(self, method, path, weight=1, data=None, status=200, auth=False,
+                 content_type="application/json", prepare=None, after=None, headers=None, label=None):
+        self.method = method
+        self.path = path
+        self.weight = weight
+        self.data = data
+        self.status = status
+        self.auth = auth
+        self.content_type = content_type
+        self.prepare = prepare
+        self.after = after
+        self.headers = headers or {}
+        self.label = label or f"{method} {path}"
+
+    def build(self, factory, fixture, number):
+        """The WSGI environ of request ``number``."""
+        values = dict(fixture, number=number)
+        extra = self.prepare(fixture, number) if self.prepare else {}
+        values.update(extra)
+        path = extra.get("path") or self.path.format(**values)
+        data = extra.get("data", self.data)
+        headers = dict(self.headers, **extra.get("headers", {}))
+        if self.auth:
+            headers.setdefault("Authorization", f"Bearer {fixture['access']}")
+
+        method = self.method.lower()
+        if method == "get":
+            return factory.get(path, data, headers=headers).environ
+        if self.content_type == "multipart":
+            return factory.post(path, data, headers=headers).environ
+        if isinstance(data, (dict, list)):
+            data = json.dumps(data)
+        return getattr(factory, method)(
+            path, data or "", content_type=self.content_type, headers=headers
+        ).environ
+
+
+def _refresh_token(fixture, number):
+    if "refresh" not in fixture:
+        serializer = TokenObtainPairSerializer(
+            data={"username": settings.PORTFOLIO_OWNER_USERNAME, "password": PASSWORD}
+        )
+        serializer.is_valid(raise_exception=True)
+        fixture["refresh"] = serializer.validated_data["refresh"]
+    return {"data": {"refresh": fixture["refresh"]}}
+
+
+def _rotated(fixture, body):
+    # The refresh token is rotated and the old one blacklisted
+    fixture["refresh"] = json.loads(body)["refresh"]
+
+
+def _scratch_user(fixture, number):
+    username = f"scratch{number}-{uuid.uuid4().hex[:8]}"
+    user = User.objects.create(username=username, email=f"{username}@example.com")
+    UserProfile.objects.create(user=user)
+    return {"headers": {"Authorization": f"Bearer {access_token(user)}"}}
+
+
+def _upload(fixture, number):
+    # Large enough for every variant width to be generated
+    buffer = BytesIO()
+    Image.new("RGB", (1600, 1200), (number % 256, 96, 160)).save(buffer, "PNG")
+    image = SimpleUploadedFile("avatar.png", buffer.getvalue(), content_type="image/png")
+    return {"data": {"profile_image": image}}
+
+
+def _registration(fixture, number):
+    username = f"visitor{number}-{uuid.uuid4().hex[:8]}"
+    return {"data": {
+        "username": username, "email": f"{username}@example.com",
+        "password": PASSWORD, "password_confirm": PASSWORD,
+    }}
+
+
+def _webhook(fixture, number):
+    msg_id = f"msg_{uuid.uuid4().hex}"
+    now = datetime.now(tz=timezone.utc)
+    body = json.dumps({
+        "type": "user.updated", "timestamp": int(now.timestamp() * 1000),
+        "data": {
+            "id": f"user_bench_{number}", "first_name": "Bench", "last_name": str(number),
+            "email_addresses": [{"id": "idn_1", "email_address": f"clerk{number}@example.com"}],
+            "primary_email_address_id": "idn_1",
+        },
+    })
+    return {"data": body, "headers": {
+        "svix-id": msg_id, "svix-timestamp": str(int(now.timestamp())),
+        "svix-signature": Webhook(WEBHOOK_SECRET).sign(msg_id, now, body),
+    }}
+
+
+def _categories(fixture, number):
+    return {"data": [
+        {"category": f"Category {i}", "skills": [{"name": f"Skill {i}", "level": (number + i) % 100}]}
+        for i in range(3)
+    ]}
+
+
+def _certifications(fixture, number):
+    return {"data": [
+        {"title": f"Cert {i}", "issuer": "Issuer", "date": str(2020 + number % 5)} for i in range(3)
+    ]}
+
+
+def _languages(fixture, number):
+    return {"data": [{"name": name, "proficiency": "Fluent"} for name in LANGUAGES]}
+
+
+# Weights approximate the traffic of the public site: page loads read the
+# snapshot or the individual collections; writes and the admin's own
+# routes are rare
+ROUTES = (
+    # backend/urls.py
+    Route("GET", "/api/portfolio/", weight=30),
+    Route("GET", "/api/throttles/", auth=True),
+    Route("GET", "/api/", weight=2),
+    Route("GET", "/api/about/", weight=5),
+    Route("GET", "/api/about/{about}/", weight=2),
+    Route("GET", "/api/projects/", weight=15),
+    Route("GET", "/api/projects/{project}/", weight=10),
+    Route("PATCH", "/api/projects/{project}/", data={"completion": "90%"}, auth=True),
+    Route("GET", "/api/blog/", weight=10),
+    Route("GET", "/api/blog/?summary=true", weight=10),
+    Route("GET", "/api/blog/?q=django", weight=3),
+    Route("GET", "/api/blog/{post}/", weight=15),
+    Route("GET", "/api/contact/", auth=True),
+    Route("GET", "/api/contact/{message}/", auth=True),
+    Route(
+        "POST", "/api/contact/", weight=2, status=202, auth=True,
+        data={"name": "Visitor", "email": "visitor@example.com", "message": "Hello, let's talk."},
+    ),
+    Route("GET", "/api/certifications/", weight=5),
+    Route("GET", "/api/certifications/{certification}/", weight=2),
+    Route("GET", "/api/async/profile/", weight=3),
+    Route("GET", "/api/async/profile/skill-categories/", weight=3),
+    Route("GET", "/api/async/profile/skills/", weight=2),
+    Route("GET", "/api/async/profile/certifications/", weight=2),
+    Route("GET", "/api/async/profile/languages/", weight=2),
+    Route("GET", "/api/async/projects/", weight=3),
+    Route("GET", "/api/async/certifications/", weight=2),
+    Route("GET", "/api/async/blog/", weight=3),
+    Route("GET", "/api/async/blog/{post}/", weight=3),
+    Route("GET", "/api/docs/?format=openapi"),
+    Route("GET", "/api/redoc/"),
+    # users/urls.py
+    Route("GET", "/api/auth/", weight=1),
+    Route("POST", "/api/auth/login/", weight=2, data={
+        "username": settings.PORTFOLIO_OWNER_USERNAME, "password": PASSWORD,
+    }),
+    Route("POST", "/api/auth/token/refresh/", weight=3, prepare=_refresh_token, after=_rotated),
+    Route("GET", "/api/auth/profile/", weight=10),
+    Route("GET", "/api/auth/profile/", weight=3, auth=True, label="GET /api/auth/profile/ (owner)"),
+    Route("POST", "/api/auth/profile/", auth=True, data={"title": "Software Engineer"}),
+    Route("POST", "/api/auth/profile/update/", auth=True, data={"bio": "Builds things for the web."}),
+    Route(
+        "POST", "/api/auth/profile/upload-image/", auth=True, content_type="multipart", prepare=_upload,
+    ),
+    Route("DELETE", "/api/auth/profile/remove/", status=204, prepare=_scratch_user),
+    Route("GET", "/api/auth/profile/skill-categories/", weight=8),
+    Route("GET", "/api/auth/profile/skill-categories/{skill_category}/", weight=2),
+    Route("POST", "/api/auth/profile/skill-categories/bulk-update/", auth=True, prepare=_categories),
+    Route("GET", "/api/auth/profile/skills/", weight=5),
+    Route("GET", "/api/auth/profile/skills/{skill}/", weight=2),
+    Route("GET", "/api/auth/profile/certifications/", weight=5),
+    Route("GET", "/api/auth/profile/certifications/{profile_certification}/", weight=2),
+    Route("POST", "/api/auth/profile/certifications/bulk-update/", auth=True, prepare=_certifications),
+    Route("GET", "/api/auth/profile/languages/", weight=5),
+    Route("GET", "/api/auth/profile/languages/{language}/", weight=2),
+    Route("POST", "/api/auth/profile/languages/bulk-update/", auth=True, prepare=_languages),
+    Route("GET", "/api/auth/me/", weight=3, auth=True),
+    Route("GET", "/api/auth/users/me/", weight=2, auth=True),
+    Route("POST", "/api/auth/register/", status=201, prepare=_registration),
+    Route("POST", "/api/auth/users/register/", status=201, prepare=_registration),
+    Route("POST", "/api/auth/webhooks/clerk/", prepare=_webhook),
+)
+
+
+def _join_route(prefix, pattern):
+    # As django.urls.resolvers._join_route, for ResolverMatch.route
+    pattern = str(pattern)
+    return prefix + (pattern[1:] if pattern.startswith("^") else pattern)
+
+
+def url_routes():
+    """Every route of the URLconf except the excluded ones and format suffixes."""
+    found = set()
+
+    def walk(patterns, prefix):
+        for pattern in patterns:
+            route = _join_route(prefix, pattern.pattern)
+            if route.startswith(EXCLUDED_PREFIXES):
+                continue
+            if isinstance(pattern, URLPattern):
+                if "format>" not in route:
+                    found.add(route)
+            else:
+                walk(pattern.url_patterns, route)
+
+    walk(get_resolver().url_patterns, "")
+    return found
+
+
+def uncovered_routes(fixture, routes=ROUTES):
+    """Routes of the URLconf that no request of ``routes`` reaches."""
+    covered = set()
+    for route in routes:
+        path = route.path.format(**dict(fixture, number=0))
+        covered.add(resolve(path.partition("?")[0]).route)
+    return sorted(url_routes() - covered)
+
+
+def schedule(routes, requests, rng):
+    """Every route once, then weighted draws up to ``requests`` in total."""
+    order = list(routes)
+    rng.shuffle(order)
+    if requests > len(order):
+        order += rng.choices(routes, weights=[route.weight for route in routes], k=requests - len(order))
+    return order
+
+
+def send(application, environ):
+    """Run one request through the WSGI ``application``; returns (status, body)."""
+    status = []
+    result = application(environ, lambda code, headers, exc_info=None: status.append(code))
+    try:
+        body = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return int(status[0].split()[0]), body
+
+
+@contextmanager
+def benchmark_settings():
+    """Settings and state for a run; see the module docstring."""
+    overrides = override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}},
+        CONTACT_QUEUE_ASYNC=False,
+        CLERK_WEBHOOK_SECRET=WEBHOOK_SECRET,
+        CLERK_WEBHOOKS_ASYNC=False,
+        IMAGE_VARIANTS_ASYNC=False,
+    )
+    # Write each message at once rather than wait for more to batch
+    flush_interval, contact_queue.flush_interval = contact_queue.flush_interval, 0
+    with overrides, tempfile.TemporaryDirectory(prefix="portfolio-bench-") as media_root, \
+            override_settings(MEDIA_ROOT=media_root):
+        cache.clear()
+        blacklist_filter.reset()
+        get_backend().reset()
+        invalidate_public_owner()
+        # Keep the connection across requests, as the test client does
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            yield
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+            contact_queue.flush_interval = flush_interval
+
+
+def replay(application, fixture, requests, warmup=1, seed=0, routes=ROUTES):
+    """
+    Send ``requests`` requests of the mix, after ``warmup`` untimed passes
+    over every route. Returns ``[(label, status_ok, seconds, queries)]``.
+    """
+    factory = RequestFactory()
+    fixture = dict(fixture)
+    owner = User.objects.get(pk=fixture["owner"])
+    fixture["access"] = access_token(owner)
+    rng = random.Random(seed)
+
+    samples = []
+    order = [route for _ in range(warmup) for route in routes] + schedule(routes, requests, rng)
+    for number, route in enumerate(order):
+        environ = route.build(factory, fixture, number)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            status, body = send(application, environ)
+            elapsed = time.perf_counter() - started
+        if status == route.status and route.after:
+            route.after(fixture, body)
+        if number >= warmup * len(routes):
+            samples.append((route.label, status == route.status, elapsed, len(queries)))
+    return samples
+
+
+def _percentiles(timings):
+    if len(timings) == 1:
+        return {f"p{p}_ms": round(timings[0] * 1000, 3) for p in PERCENTILES}
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    return {f"p{p}_ms": round(cuts[p - 1] * 1000, 3) for p in PERCENTILES}
+
+
+def _stats(samples):
+    timings = [seconds for _, _, seconds, _ in samples]
+    queries = [count for _, _, _, count in samples]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, ok, _, _ in samples if not ok),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        **_percentiles(timings),
+        "queries_mean": round(statistics.fmean(queries), 2),
+        "queries_max": max(queries),
+    }
+
+
+def summarize(samples, scale):
+    """The report of a run, as written to a baseline file."""
+    by_route = {}
+    for sample in samples:
+        by_route.setdefault(sample[0], []).append(sample)
+    total = _stats(samples)
+    busy = sum(seconds for _, _, seconds, _ in samples)
+    return {
+        "created": datetime.now(tz=timezone.utc).isoformat(timespec="seconds"),
+        "database": connection.vendor,
+        "scale": scale._asdict(),
+        # Requests are sent one at a time, so this is the rate of one worker
+        "throughput_rps": round(len(samples) / busy, 1) if busy else 0.0,
+        "total": total,
+        "routes": {label: _stats(by_route[label]) for label in sorted(by_route)},
+    }
+
+
+def compare(report, baseline, tolerance=0.2, min_change_ms=1.0):
+    """
+    Changes from ``baseline`` to ``report``: ``[(route, metric, before,
+    after, regression)]`` for each route in both. A latency percentile is
+    a regression when it grew by more than ``tolerance`` (a fraction) and
+    ``min_change_ms``; queries per request when they grew at all.
+    """
+    changes = []
+    pairs = [("total", report["total"], baseline["total"])] + [
+        (label, stats, baseline["routes"][label])
+        for label, stats in report["routes"].items()
+        if label in baseline["routes"]
+    ]
+    for label, after, before in pairs:
+        for metric in [f"p{p}_ms" for p in PERCENTILES]:
+            growth = after[metric] - before[metric]
+            regression = growth > min_change_ms and growth > before[metric] * tolerance
+            changes.append((label, metric, before[metric], after[metric], regression))
+        for metric in ("queries_mean", "queries_max"):
+            changes.append((label, metric, before[metric], after[metric], after[metric] > before[metric]))
+    return changes
@@ -0,0 +1,101 @@
+"""
+Brotli and gzip compression of API responses.
+
+``CompressionMiddleware`` compresses text and JSON responses for clients
+that accept it, preferring Brotli. Bodies under ``COMPRESSION_MIN_SIZE``,
+streaming responses and responses that already have a
+``Content-Encoding`` are left alone; the latter lets views that cache
+their output (``portfolio.snapshot``) store the compressed bytes next to
+the plain ones and serve them on later hits without compressing again.
+
+Dynamic responses use a moderate Brotli quality and Django's gzip with
+random filename padding (as ``GZipMiddleware`` does against BREACH);
+cached entries are compressed once at the highest levels.
+"""
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def negotiate_encoding(request):
+    """The best encoding the request accepts: "br", "gzip" or None."""
+    accepted = {}
+    for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli is not None else ("gzip",)
+    for coding in candidates:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def compress(content, encoding, best=False):
+    """
+    Compress ``content``; ``best`` trades time for size, for output that
+    is compressed once and cached.
+    """
+    if encoding == "br":
+        quality = 11 if best else settings.COMPRESSION_BROTLI_QUALITY
+        return brotli.compress(content, quality=quality)
+    if best:
+        return gzip.compress(content, compresslevel=9, mtime=0)
+    return compress_string(content, max_random_bytes=100)
+
+
+def is_compressible(response):
+    content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if not is_compressible(response) or response.has_header("Content-Encoding"):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.streaming or len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if "no-transform" in response.get("Cache-Control", ""):
+            return response
+        encoding = negotiate_encoding(request)
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # The compressed body is not byte-identical, so a strong ETag must
+        # become weak (as Django's GZipMiddleware does)
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
@@ -0,0 +1,20 @@
+from rest_framework import serializers
+
+
+class ImageSrcsetField(serializers.ReadOnlyField):
+    """
+    Renders a variants field (see ``portfolio.images``) as a map of
+    format to ``srcset`` string, e.g.
+    ``{"webp": "https://.../me-320w.webp 320w, https://.../me-640w.webp 640w"}``.
+    """
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        srcset = {}
+        for name, entries in (value or {}).get('variants', {}).items():
+            candidates = []
+            for entry in entries:
+                url = request.build_absolute_uri(entry['url']) if request else entry['url']
+                candidates.append(f"{url} {entry['width']}w")
+            srcset[name] = ', '.join(candidates)
+        return srcset
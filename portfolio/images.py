@@ -0,0 +1,186 @@
+"""
+Responsive image variants for uploaded images.
+
+When an image field changes, resized WebP and JPEG copies are written
+next to the original (``<upload_to>/variants/``) at each width in
+``IMAGE_VARIANT_WIDTHS``. EXIF data is dropped and the orientation is
+applied before resizing. The result is recorded on the model's variants
+field as::
+
+    {
+        "source": "profiles/me.jpg",
+        "width": 2400,
+        "height": 1600,
+        "variants": {
+            "webp": [{"name": ..., "url": ..., "width": 320, "height": 213}, ...],
+            "jpeg": [...],
+        },
+    }
+
+Variants are generated on a background thread after the transaction
+that saved the image commits, so uploads never wait for them.
+``manage.py generate_image_variants`` backfills existing images.
+"""
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from .versioning import bump_versions
+
+logger = logging.getLogger(__name__)
+
+# model label -> (image field, variants field, collection)
+IMAGE_FIELDS = {
+    "users.UserProfile": ("profile_image", "profile_image_variants", "profile"),
+    "about.About": ("profile_image", "profile_image_variants", "about"),
+    "projects.Project": ("image", "image_variants", "projects"),
+}
+
+# format name -> (Pillow format, extension, save options)
+FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 6}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-variants")
+
+
+def _encode(image, image_format, options):
+    if image_format == "JPEG" and image.mode != "RGB":
+        # JPEG has no alpha channel; flatten onto white
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    buffer = BytesIO()
+    # No exif= argument, so no metadata is written
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(field_file):
+    """Write the variants of ``field_file`` to its storage and describe them."""
+    storage = field_file.storage
+    with field_file.open("rb") as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    directory, filename = posixpath.split(field_file.name)
+    stem = posixpath.splitext(filename)[0]
+    widths = sorted({min(width, image.width) for width in settings.IMAGE_VARIANT_WIDTHS})
+
+    variants = {name: [] for name in FORMATS}
+    for width in widths:
+        resized = image.copy()
+        resized.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        for name, (image_format, extension, options) in FORMATS.items():
+            content = _encode(resized, image_format, options)
+            target = posixpath.join(directory, "variants", f"{stem}-{width}w.{extension}")
+            saved = storage.save(target, ContentFile(content))
+            variants[name].append({
+                "name": saved,
+                "url": storage.url(saved),
+                "width": resized.width,
+                "height": resized.height,
+            })
+    return {
+        "source": field_file.name,
+        "width": image.width,
+        "height": image.height,
+        "variants": variants,
+    }
+
+
+def delete_variants(storage, data):
+    for entries in (data or {}).get("variants", {}).values():
+        for entry in entries:
+            try:
+                storage.delete(entry["name"])
+            except Exception:
+                logger.warning("Could not delete image variant %s", entry["name"], exc_info=True)
+
+
+def reset_if_replaced(instance):
+    """
+    Forget the variants of an image that is being replaced.
+
+    Called before save: a newly assigned file may reuse the old file's
+    name, so the recorded source name alone cannot tell them apart. A file
+    that was stored beforehand and assigned by name is caught by the name.
+    The old variants are kept on the instance and deleted after commit.
+    """
+    image_field, variants_field, _ = IMAGE_FIELDS[instance._meta.label]
+    image = getattr(instance, image_field)
+    data = getattr(instance, variants_field)
+    if data and (not image._committed or image.name != data.get("source")):
+        instance._replaced_image_variants = data
+        setattr(instance, variants_field, {})
+
+
+def delete_replaced_variants(instance):
+    data = instance.__dict__.pop("_replaced_image_variants", None)
+    if data:
+        image_field = IMAGE_FIELDS[instance._meta.label][0]
+        storage = getattr(instance, image_field).storage
+        transaction.on_commit(lambda: delete_variants(storage, data))
+
+
+def needs_variants(instance):
+    image_field, variants_field, _ = IMAGE_FIELDS[instance._meta.label]
+    image = getattr(instance, image_field)
+    data = getattr(instance, variants_field) or {}
+    return (image.name or None) != data.get("source")
+
+
+def process_instance(label, pk, force=False):
+    """(Re)generate the variants of one row, if its image still needs them."""
+    model = apps.get_model(label)
+    image_field, variants_field, collection = IMAGE_FIELDS[label]
+    instance = model.objects.filter(pk=pk).only("pk", image_field, variants_field).first()
+    if instance is None or not (force or needs_variants(instance)):
+        return
+
+    image = getattr(instance, image_field)
+    previous = getattr(instance, variants_field)
+    data = generate_variants(image) if image.name else {}
+
+    # Only record the result if the image was not replaced meanwhile
+    if image.name:
+        unchanged = Q(**{image_field: image.name})
+    else:
+        unchanged = Q(**{image_field: ""}) | Q(**{f"{image_field}__isnull": True})
+    updated = model.objects.filter(unchanged, pk=pk).update(**{variants_field: data})
+    if updated:
+        delete_variants(image.storage, previous)
+        bump_versions(collection)
+    else:
+        delete_variants(image.storage, data)
+
+
+def _run_in_background(label, pk):
+    try:
+        process_instance(label, pk)
+    except Exception:
+        logger.exception("Generating image variants for %s %s failed", label, pk)
+    finally:
+        connections.close_all()
+
+
+def schedule_variants(instance):
+    """Generate variants for ``instance`` once the current transaction commits."""
+    label, pk = instance._meta.label, instance.pk
+    if settings.IMAGE_VARIANTS_ASYNC:
+        transaction.on_commit(lambda: _executor.submit(_run_in_background, label, pk))
+    else:
+        transaction.on_commit(lambda: process_instance(label, pk))
@@ -0,0 +1,180 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from portfolio.owner import get_public_owner
+
+# Sync route -> its async version (portfolio/async_urls.py)
+ROUTES = {
+    "/api/auth/profile/": "/api/async/profile/",
+    "/api/auth/profile/skill-categories/": "/api/async/profile/skill-categories/",
+    "/api/auth/profile/skills/": "/api/async/profile/skills/",
+    "/api/auth/profile/certifications/": "/api/async/profile/certifications/",
+    "/api/auth/profile/languages/": "/api/async/profile/languages/",
+    "/api/projects/": "/api/async/projects/",
+    "/api/certifications/": "/api/async/certifications/",
+    "/api/blog/": "/api/async/blog/",
+}
+
+
+class SlowDatabase:
+    """Execute wrapper that holds every query for ``delay`` seconds, as a distant database would."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.delay)
+        return execute(sql, params, many, context)
+
+    def install(self, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+def summarize(label, timings, statuses, elapsed):
+    errors = sum(1 for status in statuses if status != 200)
+    percentiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+    return (
+        f"{label:5} {len(timings) / elapsed:9.1f} req/s  p50 {percentiles[49] * 1000:8.1f} ms  "
+        f"p99 {percentiles[98] * 1000:8.1f} ms  errors {errors}"
+    )
+
+
+def run_wsgi(paths, total, concurrency, workers, host):
+    """
+    ``concurrency`` clients sending requests back to back to ``workers``
+    sync workers (as ``gunicorn -w <workers>``), which take requests in
+    arrival order; waiting for a free worker counts towards latency.
+    """
+    application = get_wsgi_application()
+    pool = ThreadPoolExecutor(workers)
+    counter = iter(range(total))
+    lock = threading.Lock()
+    timings, statuses = [], []
+
+    def request(path):
+        environ = {"PATH_INFO": path, "HTTP_HOST": host, "wsgi.input": BytesIO()}
+        setup_testing_defaults(environ)
+        status = []
+        body = application(environ, lambda code, headers, exc_info=None: status.append(code))
+        try:
+            b"".join(body)
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+        return int(status[0].split()[0])
+
+    def client():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            started = time.perf_counter()
+            status = pool.submit(request, paths[index % len(paths)]).result()
+            with lock:
+                timings.append(time.perf_counter() - started)
+                statuses.append(status)
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    pool.shutdown()
+    return timings, statuses, time.perf_counter() - started
+
+
+async def run_asgi(paths, total, concurrency, host):
+    """``concurrency`` clients sending requests back to back to one ASGI event loop (one uvicorn worker)."""
+    application = get_asgi_application()
+    counter = iter(range(total))
+    timings, statuses = [], []
+
+    async def request(path):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+            "query_string": b"", "headers": [(b"host", host.encode())],
+            "client": ("127.0.0.1", 0), "server": (host, 80),
+        }
+        received = asyncio.Event()
+        status = []
+
+        async def receive():
+            if not received.is_set():
+                received.set()
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # The client stays connected until the response is sent
+            await asyncio.Future()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        await application(scope, receive, send)
+        return status[0]
+
+    async def client():
+        for index in counter:
+            started = time.perf_counter()
+            status = await request(paths[index % len(paths)])
+            timings.append(time.perf_counter() - started)
+            statuses.append(status)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return timings, statuses, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency of the public read endpoints on sync "
+        "WSGI workers and of their async versions on an ASGI event loop"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per stack (default: 2000)")
+        parser.add_argument("--concurrency", type=int, default=100, help="Concurrent clients (default: 100)")
+        parser.add_argument("--workers", type=int, default=4, help="Sync workers of the WSGI stack (default: 4)")
+        parser.add_argument(
+            "--db-latency", type=float, default=0,
+            help="Milliseconds added to every query, e.g. 20 for a remote database over SSL (default: 0)",
+        )
+
+    def handle(self, *args, **options):
+        if get_public_owner() is None:
+            raise CommandError(
+                f"The public owner {settings.PORTFOLIO_OWNER_USERNAME!r} does not exist in this database"
+            )
+        # Each thread opens its own connection; the main thread's is not used again
+        connections.close_all()
+        if options["db_latency"]:
+            slow = SlowDatabase(options["db_latency"] / 1000)
+            connection_created.connect(slow.install, weak=False)
+
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+        if host in ("*", ""):
+            host = "localhost"
+        total, concurrency = options["requests"], options["concurrency"]
+        self.stdout.write(
+            f"{total} requests, {concurrency} clients, {options['workers']} sync workers, "
+            f"{options['db_latency']:g} ms per query"
+        )
+        timings, statuses, elapsed = run_wsgi(list(ROUTES), total, concurrency, options["workers"], host)
+        self.stdout.write(summarize("wsgi", timings, statuses, elapsed))
+        timings, statuses, elapsed = asyncio.run(run_asgi(list(ROUTES.values()), total, concurrency, host))
+        self.stdout.write(summarize("asgi", timings, statuses, elapsed))
@@ -0,0 +1,91 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from backend.wsgi import application
+from portfolio import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database, replay a request mix against every API route "
+        "through the WSGI application and report latency, throughput and queries"
+    )
+
+    def add_arguments(self, parser):
+        defaults = benchmark.Scale()
+        for field in benchmark.Scale._fields:
+            parser.add_argument(
+                f"--{field}", type=int, default=getattr(defaults, field),
+                help=f"Rows to seed (default: {getattr(defaults, field)})",
+            )
+        parser.add_argument("--requests", type=int, default=2000, help="Timed requests (default: 2000)")
+        parser.add_argument("--warmup", type=int, default=1, help="Untimed passes over every route first (default: 1)")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the request mix (default: 0)")
+        parser.add_argument("--save", metavar="PATH", help="Write the report to PATH as a JSON baseline")
+        parser.add_argument("--compare", metavar="PATH", help="Compare with the baseline in PATH")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2,
+            help="Latency growth reported as a regression, as a fraction (default: 0.2)",
+        )
+        parser.add_argument("--check", action="store_true", help="Fail if --compare finds a regression")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as baseline_file:
+                baseline = json.load(baseline_file)
+        scale = benchmark.Scale(*(options[field] for field in benchmark.Scale._fields))
+
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with benchmark.benchmark_settings():
+                fixture = benchmark.seed(scale)
+                uncovered = benchmark.uncovered_routes(fixture)
+                samples = benchmark.replay(
+                    application, fixture, options["requests"], options["warmup"], options["seed"]
+                )
+                report = benchmark.summarize(samples, scale)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.write_report(report)
+        if uncovered:
+            self.stdout.write("Routes not in the request mix: " + ", ".join(uncovered))
+        if options["save"]:
+            with open(options["save"], "w") as baseline_file:
+                json.dump(report, baseline_file, indent=2)
+                baseline_file.write("\n")
+            self.stdout.write(f"Baseline written to {options['save']}")
+        if baseline is not None:
+            regressions = self.write_comparison(report, baseline, options["tolerance"])
+            if regressions and options["check"]:
+                raise CommandError(f"{regressions} regression(s) against {options['compare']}")
+
+    def write_report(self, report):
+        self.stdout.write(
+            f"{'route':62} {'n':>5} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}"
+        )
+        for label, stats in [*report["routes"].items(), ("total", report["total"])]:
+            self.stdout.write(
+                f"{label[:62]:62} {stats['requests']:5} {stats['errors']:4} {stats['p50_ms']:8.2f} "
+                f"{stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f} {stats['queries_mean']:8.2f}"
+            )
+        self.stdout.write(f"Throughput: {report['throughput_rps']} requests/s (one worker)")
+
+    def write_comparison(self, report, baseline, tolerance):
+        changes = benchmark.compare(report, baseline, tolerance)
+        regressions = [change for change in changes if change[4]]
+        if report["scale"] != baseline["scale"]:
+            self.stdout.write(f"The baseline was seeded at a different scale: {baseline['scale']}")
+        self.stdout.write(
+            f"Against {baseline['created']}: throughput {baseline['throughput_rps']} -> "
+            f"{report['throughput_rps']} requests/s"
+        )
+        for label, metric, before, after, _ in regressions:
+            self.stdout.write(f"REGRESSION {label} {metric}: {before} -> {after}")
+        if not regressions:
+            self.stdout.write("No regressions")
+        return len(regressions)
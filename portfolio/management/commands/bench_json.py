@@ -0,0 +1,83 @@
+import time
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework import parsers, renderers
+
+from contact.models import ContactMessage
+from contact.serializers import ContactMessageSerializer
+from portfolio import renderers as fast
+from projects.models import Project
+from projects.serializers import ProjectSerializer
+
+VARIANTS = {
+    "variants": {
+        kind: [{"url": f"/media/projects/variants/p-{width}w.{kind}", "width": width} for width in (320, 640, 1280)]
+        for kind in ("webp", "jpeg")
+    }
+}
+
+
+def sample_data(rows):
+    """Serialized lists of unsaved projects and contact messages."""
+    now = timezone.now()
+    projects = [
+        Project(
+            id=index, user_id=1, name=f"Project {index}", description="A project – with notes. " * 8,
+            link=f"https://example.com/{index}", status="completed", completion="100%",
+            technologies="Python, Django, PostgreSQL", type="web", image=f"projects/p-{index}.jpg",
+            image_variants=VARIANTS, created_at=now - timedelta(minutes=index),
+        )
+        for index in range(rows)
+    ]
+    messages = [
+        ContactMessage(
+            id=index, name=f"Visitor {index}", email=f"visitor{index}@example.com",
+            message="Hello! I would like to talk about a project. " * 4, created_at=now - timedelta(seconds=index),
+        )
+        for index in range(rows)
+    ]
+    return {
+        "projects": ProjectSerializer(projects, many=True).data,
+        "contact": ContactMessageSerializer(messages, many=True).data,
+    }
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSON renderer and parser with portfolio.renderers on large lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="Items per list (default: 5000)")
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement; the best is kept (default: 20)")
+
+    def handle(self, *args, **options):
+        if fast.orjson is None:
+            self.stdout.write("orjson is not installed; portfolio.renderers falls back to the stdlib")
+        pairs = (
+            ("drf", renderers.JSONRenderer(), parsers.JSONParser()),
+            ("fast", fast.JSONRenderer(), fast.JSONParser()),
+        )
+        for name, data in sample_data(options["rows"]).items():
+            outputs = {}
+            for label, renderer, parser in pairs:
+                content = outputs[label] = renderer.render(data)
+                render = best_of(options["repeat"], lambda: renderer.render(data))
+                parse = best_of(options["repeat"], lambda: parser.parse(BytesIO(content)))
+                self.stdout.write(
+                    f"{name:8} {label:5} {len(content) / 1024:9.1f} KiB  "
+                    f"render {render * 1000:8.2f} ms ({len(content) / render / 2 ** 20:7.1f} MiB/s)  "
+                    f"parse {parse * 1000:8.2f} ms ({len(content) / parse / 2 ** 20:7.1f} MiB/s)"
+                )
+            identical = "identical" if outputs["drf"] == outputs["fast"] else "DIFFERENT"
+            self.stdout.write(f"{name:8} output {identical}")
@@ -0,0 +1,30 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from portfolio.images import IMAGE_FIELDS, needs_variants, process_instance
+
+
+class Command(BaseCommand):
+    help = "Generate responsive variants for uploaded images that do not have them yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Regenerate variants even when they are up to date",
+        )
+
+    def handle(self, *args, **options):
+        for label, (image_field, variants_field, _) in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            rows = (
+                model.objects.exclude(**{image_field: ""})
+                .exclude(**{f"{image_field}__isnull": True})
+                .only("pk", image_field, variants_field)
+            )
+            generated = 0
+            for instance in rows.iterator():
+                if not options["force"] and not needs_variants(instance):
+                    continue
+                process_instance(label, instance.pk, force=options["force"])
+                generated += 1
+            self.stdout.write(f"{label}: generated variants for {generated} images")
@@ -0,0 +1,78 @@
+import hashlib
+import math
+import time
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from .versioning import get_versions
+
+
+class NotModified(Exception):
+    pass
+
+
+def last_modified(stamp):
+    """
+    The Last-Modified time for a version stamp, or ``None`` for now.
+
+    HTTP dates have whole seconds, so the stamp is rounded up: a write later
+    in the same second must not compare as older than an earlier response.
+    Until that second is over a further write could still round to the same
+    time, so no Last-Modified is given (the ETag still is).
+    """
+    modified = math.ceil(stamp)
+    return modified if modified <= time.time() else None
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag and Last-Modified validators to list and retrieve responses.
+
+    Validators are derived from the version stamps of the collections in
+    ``version_collections``, so a matching ``If-None-Match`` (or
+    ``If-Modified-Since``) request is answered with a 304 before the
+    queryset is evaluated or anything is serialized.
+    """
+    version_collections = ()
+    conditional_actions = ('list', 'retrieve')
+
+    def get_validators(self, request):
+        stamp = max(get_versions(self.version_collections))
+        principal = request.user.pk if request.user.is_authenticated else 'anonymous'
+        fingerprint = f"{stamp!r}:{principal}:{request.get_full_path()}:{request.accepted_media_type}"
+        etag = '"%s"' % hashlib.md5(fingerprint.encode()).hexdigest()
+        return etag, last_modified(stamp)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if request.method not in ('GET', 'HEAD') or self.action not in self.conditional_actions:
+            return
+        self.validators = self.get_validators(request)
+        etag, modified = self.validators
+        response = get_conditional_response(request._request, etag=etag, last_modified=modified)
+        if response is not None and response.status_code == status.HTTP_304_NOT_MODIFIED:
+            raise NotModified
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, 'validators', None)
+        if validators and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            etag, modified = validators
+            response['ETag'] = etag
+            if modified is not None:
+                response['Last-Modified'] = http_date(modified)
+            # Always revalidate; a matching validator costs no queries
+            patch_cache_control(response, no_cache=True)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True)
+            patch_vary_headers(response, ('Authorization',))
+        return response
@@ -0,0 +1,53 @@
+"""
+Resolves the public portfolio owner shown to anonymous visitors.
+
+The owner's user and profile ids are looked up once and kept in
+process memory for ``PORTFOLIO_OWNER_TTL`` seconds. Saving or deleting
+a ``User`` or ``UserProfile`` drops the cached value (see
+``portfolio.signals``).
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+from users.models import User
+
+PublicOwner = namedtuple("PublicOwner", ["user_id", "profile_id"])
+
+_lock = threading.Lock()
+_cache = {"owner": None, "expires_at": 0.0}
+
+
+def _lookup():
+    row = (
+        User.objects.filter(username=settings.PORTFOLIO_OWNER_USERNAME)
+        .values_list("id", "profile__id")
+        .first()
+    )
+    return PublicOwner(*row) if row else None
+
+
+def get_public_owner():
+    """
+    Return the public owner as a ``PublicOwner(user_id, profile_id)``,
+    or ``None`` if the configured user does not exist. ``profile_id`` is
+    ``None`` when the owner has no profile yet.
+    """
+    now = time.monotonic()
+    if now < _cache["expires_at"]:
+        return _cache["owner"]
+    with _lock:
+        if now < _cache["expires_at"]:
+            return _cache["owner"]
+        owner = _lookup()
+        _cache["owner"] = owner
+        _cache["expires_at"] = time.monotonic() + settings.PORTFOLIO_OWNER_TTL
+        return owner
+
+
+def invalidate_public_owner():
+    with _lock:
+        _cache["owner"] = None
+        _cache["expires_at"] = 0.0
@@ -0,0 +1,94 @@
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination over ``(created_at, id)``, newest first.
+
+    The cursor carries both values of the last row seen and the next page
+    is ``WHERE created_at < c OR (created_at = c AND id < i)``, an indexed
+    range scan. Since the pair is unique, rows sharing a timestamp never
+    fall back to DRF's ``OFFSET`` walk: every page costs the same
+    regardless of depth and no ``COUNT(*)`` is issued.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor is not None else None
+
+        if reverse:
+            queryset = queryset.order_by('created_at', 'id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if position is not None:
+            created_at, pk = self._parse_position(position)
+            if reverse:
+                after = Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            else:
+                after = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            queryset = queryset.filter(after)
+
+        # One extra row tells whether a page follows this one
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = (
+            self._get_position_from_instance(results[-1], self.ordering)
+            if len(results) > self.page_size else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = position is not None, position
+            self.has_previous, self.previous_position = following is not None, following
+        else:
+            self.has_next, self.next_position = following is not None, following
+            self.has_previous, self.previous_position = position is not None, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        # Positions are unique, so a crafted offset has nothing to skip
+        if cursor is not None and cursor.offset:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            created_at, pk = instance['created_at'], instance['id']
+        else:
+            created_at, pk = instance.created_at, instance.pk
+        return f'{created_at.isoformat()}|{pk}'
+
+    def _parse_position(self, position):
+        created_at, _, pk = position.rpartition('|')
+        try:
+            return datetime.fromisoformat(created_at), int(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+
+class SearchPagination(PageNumberPagination):
+    """Numbered pages for ranked search results, which have no stable key."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
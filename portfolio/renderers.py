@@ -0,0 +1,63 @@
+"""
+JSON renderer and parser backed by orjson, when it is installed.
+
+They are drop-in replacements for DRF's ``JSONRenderer`` and
+``JSONParser`` and produce the same output: values orjson cannot encode
+natively (datetimes, Decimals, lazy strings, ...) are handed to DRF's own
+encoder, U+2028/U+2029 are escaped, and anything orjson rejects (indented
+output, integers over 64 bits, non UTF-8 input) goes through the stdlib
+implementation. The one difference: NaN and infinite floats become
+``null`` where DRF's strict encoder refuses them. Without orjson, or with
+``ORJSON_ENABLED`` off, both classes behave exactly like DRF's.
+"""
+from django.conf import settings
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+_encoder = JSONEncoder()
+# Datetimes are passed through so that DRF's format (millisecond
+# precision, "Z" for UTC) is kept
+ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            orjson is None
+            or not settings.ORJSON_ENABLED
+            or not api_settings.COMPACT_JSON
+            or not api_settings.UNICODE_JSON
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except (TypeError, orjson.JSONEncodeError):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Valid JSON but not valid JavaScript inside a <script> tag
+        if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+            content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return content
+
+
+class JSONParser(parsers.JSONParser):
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or not settings.ORJSON_ENABLED or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,98 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+from about.models import About
+from blog.models import BlogPost
+from certifications.models import Certification
+from contact.models import ContactMessage
+from projects.models import Project
+from users.models import (
+    Certification as ProfileCertification,
+    Language,
+    Skill,
+    SkillCategory,
+    User,
+    UserProfile,
+)
+
+from .images import (
+    IMAGE_FIELDS,
+    delete_replaced_variants,
+    delete_variants,
+    needs_variants,
+    reset_if_replaced,
+    schedule_variants,
+)
+from .owner import invalidate_public_owner
+from .versioning import bump_versions
+
+# Collections whose cached representations depend on each model
+MODEL_COLLECTIONS = {
+    User: ("profile",),
+    UserProfile: ("profile",),
+    SkillCategory: ("profile",),
+    Skill: ("profile",),
+    ProfileCertification: ("profile",),
+    Language: ("profile",),
+    Project: ("projects",),
+    Certification: ("certifications",),
+    BlogPost: ("blog",),
+    About: ("about",),
+    ContactMessage: ("contact",),
+}
+
+RELATION_COLLECTIONS = {
+    UserProfile.skill_categories.through: ("profile",),
+    UserProfile.certifications.through: ("profile",),
+    UserProfile.languages.through: ("profile",),
+}
+
+OWNER_MODELS = (User, UserProfile)
+
+
+def _bump_model(sender, **kwargs):
+    bump_versions(*MODEL_COLLECTIONS[sender])
+
+
+def _bump_relation(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_versions(*RELATION_COLLECTIONS[sender])
+
+
+def _invalidate_owner(sender, **kwargs):
+    invalidate_public_owner()
+
+
+def _reset_image_variants(sender, instance, **kwargs):
+    reset_if_replaced(instance)
+
+
+def _schedule_image_variants(sender, instance, **kwargs):
+    delete_replaced_variants(instance)
+    if needs_variants(instance):
+        schedule_variants(instance)
+
+
+def _delete_image_variants(sender, instance, **kwargs):
+    image_field, variants_field, _ = IMAGE_FIELDS[sender._meta.label]
+    delete_variants(getattr(instance, image_field).storage, getattr(instance, variants_field))
+
+
+for model in MODEL_COLLECTIONS:
+    label = model._meta.label
+    post_save.connect(_bump_model, sender=model, dispatch_uid=f"version-save-{label}")
+    post_delete.connect(_bump_model, sender=model, dispatch_uid=f"version-delete-{label}")
+
+for through in RELATION_COLLECTIONS:
+    m2m_changed.connect(
+        _bump_relation, sender=through, dispatch_uid=f"version-m2m-{through._meta.label}"
+    )
+
+for model in OWNER_MODELS:
+    label = model._meta.label
+    post_save.connect(_invalidate_owner, sender=model, dispatch_uid=f"owner-save-{label}")
+    post_delete.connect(_invalidate_owner, sender=model, dispatch_uid=f"owner-delete-{label}")
+
+for label in IMAGE_FIELDS:
+    pre_save.connect(_reset_image_variants, sender=label, dispatch_uid=f"images-pre-save-{label}")
+    post_save.connect(_schedule_image_variants, sender=label, dispatch_uid=f"images-save-{label}")
+    post_delete.connect(_delete_image_variants, sender=label, dispatch_uid=f"images-delete-{label}")
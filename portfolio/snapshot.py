@@ -0,0 +1,118 @@
+"""
+Builds the public portfolio document served by ``/api/portfolio/``.
+
+The document bundles everything the public site needs on page load
+(profile, skills, certifications, languages, projects and blog posts)
+and is cached as rendered JSON bytes, plus their Brotli or gzip form once
+a client asked for it. The cache key embeds the version
+stamps of the collections it is built from, so any change to an
+underlying row (see ``portfolio.signals``) moves readers to a new entry.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+
+from blog.models import BlogPost
+from blog.serializers import BlogPostSummarySerializer
+from certifications.models import Certification
+from certifications.serializers import CertificationSerializer
+from projects.models import Project
+from projects.serializers import ProjectSerializer
+from users.models import UserProfile
+from users.serializers import (
+    CertificationSerializer as ProfileCertificationSerializer,
+    LanguageSerializer,
+    SkillCategorySerializer,
+    UserProfileSerializer,
+)
+
+from .compression import compress
+from .owner import get_public_owner
+from .pagination import CreatedAtCursorPagination
+from .renderers import JSONRenderer
+from .versioning import get_versions
+
+SNAPSHOT_TIMEOUT = 60 * 60
+SNAPSHOT_COLLECTIONS = ("profile", "projects", "certifications", "blog")
+
+
+def _cache_key(request):
+    versions = ":".join(repr(stamp) for stamp in get_versions(SNAPSHOT_COLLECTIONS))
+    # Image URLs are absolute, so the rendered bytes depend on the host.
+    return f"portfolio:snapshot:{versions}:{request.scheme}://{request.get_host()}"
+
+
+def build_snapshot(request):
+    """
+    Return the public portfolio document as a dict.
+
+    Runs a fixed number of queries regardless of how many rows the
+    owner has: one for the profile and user, four for the profile's
+    relations and one each for projects, certifications and blog posts.
+    """
+    owner = get_public_owner()
+    if not owner or not owner.profile_id:
+        return None
+    try:
+        profile = UserProfile.objects.select_related("user").get(pk=owner.profile_id)
+    except UserProfile.DoesNotExist:
+        return None
+    user = profile.user
+
+    prefetch_related_objects(
+        [profile], "skill_categories__skills", "certifications", "languages"
+    )
+    context = {"request": request}
+
+    return {
+        "profile": UserProfileSerializer(profile, context=context).data,
+        "skill_categories": SkillCategorySerializer(
+            profile.skill_categories.all(), many=True, context=context
+        ).data,
+        "profile_certifications": ProfileCertificationSerializer(
+            profile.certifications.all(), many=True, context=context
+        ).data,
+        "languages": LanguageSerializer(
+            profile.languages.all(), many=True, context=context
+        ).data,
+        "projects": ProjectSerializer(
+            Project.objects.filter(user=user), many=True, context=context
+        ).data,
+        "certifications": CertificationSerializer(
+            Certification.objects.filter(user=user), many=True, context=context
+        ).data,
+        # Latest page of posts, as excerpts
+        "blog": BlogPostSummarySerializer(
+            BlogPost.objects.order_by("-created_at", "-id")
+            .only(*BlogPostSummarySerializer.Meta.fields)[:CreatedAtCursorPagination.page_size],
+            many=True,
+            context=context,
+        ).data,
+    }
+
+
+def get_snapshot_bytes(request, encoding=None):
+    """
+    Return ``(content, encoding)`` for the rendered snapshot, building and
+    caching it on a miss. With an ``encoding`` ("br" or "gzip") the
+    compressed bytes are cached as well and served on later hits; the
+    returned encoding is None when the snapshot was too small to compress.
+    Returns ``None`` when the public owner or their profile is missing.
+    """
+    key = _cache_key(request)
+    if encoding:
+        content = cache.get(f"{key}:{encoding}")
+        if content is not None:
+            return content, encoding
+    content = cache.get(key)
+    if content is None:
+        document = build_snapshot(request)
+        if document is None:
+            return None
+        content = JSONRenderer().render(document)
+        cache.set(key, content, SNAPSHOT_TIMEOUT)
+    if not encoding or len(content) < settings.COMPRESSION_MIN_SIZE:
+        return content, None
+    compressed = compress(content, encoding, best=True)
+    cache.set(f"{key}:{encoding}", compressed, SNAPSHOT_TIMEOUT)
+    return compressed, encoding
@@ -0,0 +1,1008 @@
+import base64
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+import uuid
+from datetime import date, datetime, time, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+import brotli
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework import parsers, renderers as drf_renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APIClient
+
+from about.models import About
+from blog.models import BlogPost
+from certifications.models import Certification
+from contact.models import ContactMessage
+from projects.models import Project
+from users.blacklist import blacklist_filter
+from users.models import (
+    Certification as ProfileCertification,
+    Language,
+    Skill,
+    SkillCategory,
+    User,
+    UserProfile,
+)
+
+from .owner import get_public_owner, invalidate_public_owner
+from . import benchmark, compression, renderers, throttling
+from .throttling import MmapBackend, get_backend
+from .versioning import KEY_TEMPLATE
+
+# 1x1 transparent PNG
+PNG_BYTES = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06"
+    b"\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\rIDATx\x9cc\xf8\x0f\x00\x00\x01\x01"
+    b"\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def seed_portfolio(owner, profile, rows):
+    """Give the owner ``rows`` rows of every related resource."""
+    categories = SkillCategory.objects.bulk_create(
+        SkillCategory(name=f"Category {i}") for i in range(rows)
+    )
+    Skill.objects.bulk_create(
+        Skill(name=f"Skill {i}", level=50, category=category)
+        for i, category in enumerate(categories)
+    )
+    profile_certifications = ProfileCertification.objects.bulk_create(
+        ProfileCertification(title=f"Cert {i}", issuer="Issuer", date="2024", user=owner)
+        for i in range(rows)
+    )
+    languages = Language.objects.bulk_create(
+        Language(name=f"Language {i}", proficiency="Fluent") for i in range(rows)
+    )
+    profile.skill_categories.through.objects.bulk_create(
+        profile.skill_categories.through(userprofile=profile, skillcategory=category)
+        for category in categories
+    )
+    profile.certifications.through.objects.bulk_create(
+        profile.certifications.through(userprofile=profile, certification=certification)
+        for certification in profile_certifications
+    )
+    profile.languages.through.objects.bulk_create(
+        profile.languages.through(userprofile=profile, language=language)
+        for language in languages
+    )
+    Project.objects.bulk_create(
+        Project(
+            user=owner, name=f"Project {i}", description="Description", status="done",
+            completion="100%", technologies="Python", type="web",
+        )
+        for i in range(rows)
+    )
+    Certification.objects.bulk_create(
+        Certification(
+            user=owner, name=f"Cert {i}", issuer="Issuer", date=date(2024, 1, 1),
+            badge="https://example.com/badge.png", type="other",
+        )
+        for i in range(rows)
+    )
+    BlogPost.objects.bulk_create(
+        BlogPost(title=f"Post {i}", slug=f"post-{i}", content="Content") for i in range(rows)
+    )
+    ContactMessage.objects.bulk_create(
+        ContactMessage(name=f"Visitor {i}", email="visitor@example.com", message="Hello")
+        for i in range(rows)
+    )
+
+
+@override_settings(PORTFOLIO_OWNER_USERNAME="owner")
+class PortfolioSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username="owner", email="owner@example.com")
+        cls.profile = UserProfile.objects.create(user=cls.owner, title="Engineer")
+        seed_portfolio(cls.owner, cls.profile, 3)
+
+    def setUp(self):
+        cache.clear()
+        invalidate_public_owner()
+        get_public_owner()
+
+    def get(self):
+        response = self.client.get("/api/portfolio/")
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_document_is_built_with_fixed_queries_and_cached(self):
+        with self.assertNumQueries(8):
+            document = self.get()
+        self.assertEqual(document["profile"]["title"], "Engineer")
+        lists = ("skill_categories", "profile_certifications", "languages", "projects", "certifications", "blog")
+        for name in lists:
+            self.assertEqual(len(document[name]), 3, name)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(), document)
+
+    def test_changes_invalidate_the_document(self):
+        self.get()
+        # Stamps move when the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.filter(user=self.owner).first().delete()
+        self.assertEqual(len(self.get()["projects"]), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.languages.clear()
+        self.assertEqual(self.get()["languages"], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            BlogPost.objects.create(title="Latest", slug="latest", content="Content")
+        self.assertEqual(self.get()["blog"][0]["title"], "Latest")
+
+    @override_settings(PORTFOLIO_OWNER_USERNAME="nobody")
+    def test_missing_owner(self):
+        invalidate_public_owner()
+        self.assertEqual(self.client.get("/api/portfolio/").status_code, 404)
+
+
+@override_settings(PORTFOLIO_OWNER_USERNAME="owner")
+class SnapshotCommitTests(TransactionTestCase):
+    """A reader on another connection while a write is not yet committed."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(username="owner", email="owner@example.com")
+        UserProfile.objects.create(user=self.owner)
+        invalidate_public_owner()
+
+    def read_in_thread(self):
+        result = {}
+
+        def read():
+            try:
+                result["projects"] = json.loads(self.client.get("/api/portfolio/").content)["projects"]
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        return result["projects"]
+
+    def test_write_is_not_hidden_by_a_read_before_commit(self):
+        self.assertEqual(self.read_in_thread(), [])
+        with transaction.atomic():
+            Project.objects.create(user=self.owner, name="New", description="", status="done", type="web")
+            # Served from the cache under the unchanged stamps. (SQLite's shared
+            # in-memory test database locks the written table for other
+            # connections, so a read that reached the database would fail.)
+            self.assertEqual(self.read_in_thread(), [])
+        self.assertEqual([project["name"] for project in self.read_in_thread()], ["New"])
+
+
+@override_settings(PORTFOLIO_OWNER_USERNAME="owner", PORTFOLIO_OWNER_TTL=300)
+class PublicOwnerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username="owner", email="owner@example.com")
+        cls.profile = UserProfile.objects.create(user=cls.owner)
+
+    def setUp(self):
+        invalidate_public_owner()
+
+    def test_owner_is_looked_up_once(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_public_owner(), (self.owner.pk, self.profile.pk))
+            self.assertEqual(get_public_owner(), (self.owner.pk, self.profile.pk))
+
+    def test_saving_user_or_profile_invalidates(self):
+        for instance in (self.owner, self.profile):
+            with self.subTest(model=type(instance).__name__):
+                get_public_owner()
+                instance.save()
+                with self.assertNumQueries(1):
+                    get_public_owner()
+
+    def test_expires_after_ttl(self):
+        with mock.patch("portfolio.owner.time.monotonic", return_value=1000.0):
+            get_public_owner()
+        with mock.patch("portfolio.owner.time.monotonic", return_value=1299.0), self.assertNumQueries(0):
+            get_public_owner()
+        with mock.patch("portfolio.owner.time.monotonic", return_value=1301.0), self.assertNumQueries(1):
+            get_public_owner()
+
+    def test_configured_username(self):
+        UserProfile.objects.filter(pk=self.profile.pk).delete()
+        self.assertEqual(get_public_owner(), (self.owner.pk, None))
+        invalidate_public_owner()
+        with override_settings(PORTFOLIO_OWNER_USERNAME="nobody"):
+            self.assertIsNone(get_public_owner())
+
+    def test_public_views_use_the_owner(self):
+        Project.objects.create(user=self.owner, name="Mine", description="", status="done", type="web")
+        other = User.objects.create_user(username="other", email="other@example.com")
+        Project.objects.create(user=other, name="Theirs", description="", status="done", type="web")
+        response = self.client.get("/api/projects/")
+        self.assertEqual([project["name"] for project in response.json()], ["Mine"])
+
+
+@override_settings(
+    PORTFOLIO_OWNER_USERNAME="owner",
+    MEDIA_ROOT=MEDIA_ROOT,
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class QueryBudgetTests(TestCase):
+    """
+    Asserts a fixed maximum number of queries for every API route.
+
+    Subclasses rerun the suite with more related rows; the budgets must
+    hold at every scale, so a query issued per row fails the build.
+    """
+    rows = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username="owner", email="owner@example.com", password="secret-password"
+        )
+        cls.profile = UserProfile.objects.create(user=cls.owner, title="Engineer")
+        seed_portfolio(cls.owner, cls.profile, cls.rows)
+        cls.about = About.objects.create(profile=cls.profile, name="Owner", bio="Bio", skills="a, b")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.reset()
+        get_backend().reset()
+        invalidate_public_owner()
+        get_public_owner()
+        self.client = APIClient()
+
+    def login(self):
+        # A freshly loaded user, as the authentication class would provide
+        self.client.force_authenticate(User.objects.get(pk=self.owner.pk))
+
+    def assertBudget(self, budget, method, path, data=None, status_code=200, **extra):
+        with self.assertNumQueries(budget):
+            response = getattr(self.client, method)(path, data, **extra)
+        self.assertEqual(response.status_code, status_code, response.content[:200])
+        return response
+
+    # Public routes (backend/urls.py)
+
+    def test_api_root_and_schema(self):
+        self.assertBudget(0, "get", "/api/")
+        self.assertBudget(0, "get", "/api/auth/")
+        self.assertBudget(0, "get", "/api/docs/", {"format": "openapi"})
+
+    def test_portfolio_snapshot(self):
+        self.assertBudget(8, "get", "/api/portfolio/")
+        self.assertBudget(0, "get", "/api/portfolio/")
+
+    def test_about(self):
+        self.assertBudget(1, "get", "/api/about/")
+        self.assertBudget(1, "get", f"/api/about/{self.about.pk}/")
+
+    def test_projects(self):
+        project = Project.objects.first()
+        self.assertBudget(1, "get", "/api/projects/")
+        self.assertBudget(1, "get", f"/api/projects/{project.pk}/")
+
+    def test_blog(self):
+        post = BlogPost.objects.first()
+        self.assertBudget(1, "get", "/api/blog/")
+        self.assertBudget(1, "get", f"/api/blog/{post.pk}/")
+
+    def test_contact(self):
+        message = ContactMessage.objects.first()
+        self.assertBudget(1, "get", "/api/contact/")
+        self.assertBudget(1, "get", f"/api/contact/{message.pk}/")
+        self.login()
+        # Queued; written in batches by contact.queue
+        with self.captureOnCommitCallbacks(execute=True), self.settings(CONTACT_QUEUE_ASYNC=False):
+            self.assertBudget(
+                0, "post", "/api/contact/",
+                {"name": "Visitor", "email": "visitor@example.com", "message": "Hi"},
+                status_code=202,
+            )
+        self.assertTrue(ContactMessage.objects.filter(email="visitor@example.com").exists())
+
+    def test_certifications(self):
+        certification = Certification.objects.first()
+        self.assertBudget(1, "get", "/api/certifications/")
+        self.assertBudget(1, "get", f"/api/certifications/{certification.pk}/")
+
+    # Profile routes (users/urls.py), anonymous
+
+    def test_profile(self):
+        # The three id lists are subqueries of the profile query
+        body = self.assertBudget(1, "get", "/api/auth/profile/").json()
+        for relation in ("skill_categories", "certifications", "languages"):
+            ids = getattr(self.profile, relation).order_by("pk").values_list("pk", flat=True)
+            self.assertEqual(body[relation], list(ids))
+
+    def test_profile_skill_categories(self):
+        category = self.profile.skill_categories.first()
+        self.assertBudget(2, "get", "/api/auth/profile/skill-categories/")
+        self.assertBudget(2, "get", f"/api/auth/profile/skill-categories/{category.pk}/")
+
+    def test_profile_skills(self):
+        skill = Skill.objects.first()
+        self.assertBudget(1, "get", "/api/auth/profile/skills/")
+        self.assertBudget(1, "get", f"/api/auth/profile/skills/{skill.pk}/")
+
+    def test_profile_certifications(self):
+        certification = self.profile.certifications.first()
+        self.assertBudget(1, "get", "/api/auth/profile/certifications/")
+        self.assertBudget(1, "get", f"/api/auth/profile/certifications/{certification.pk}/")
+
+    def test_profile_languages(self):
+        language = self.profile.languages.first()
+        self.assertBudget(1, "get", "/api/auth/profile/languages/")
+        self.assertBudget(1, "get", f"/api/auth/profile/languages/{language.pk}/")
+
+    # Async public reads (portfolio/async_urls.py)
+
+    def test_async_reads(self):
+        post = BlogPost.objects.first()
+        routes = [
+            (4, "/api/async/profile/"),
+            (2, "/api/async/profile/skill-categories/"),
+            (1, "/api/async/profile/skills/"),
+            (1, "/api/async/profile/certifications/"),
+            (1, "/api/async/profile/languages/"),
+            (1, "/api/async/projects/"),
+            (1, "/api/async/certifications/"),
+            (1, "/api/async/blog/"),
+            (1, f"/api/async/blog/{post.pk}/"),
+        ]
+        for budget, path in routes:
+            self.assertBudget(budget, "get", path)
+
+    # Profile routes (users/urls.py), authenticated
+
+    def test_authenticated_profile(self):
+        self.login()
+        self.assertBudget(1, "get", "/api/auth/profile/")
+        self.assertBudget(2, "post", "/api/auth/profile/update/", {"title": "Architect"})
+        # A relation set by the update is read back, not the stale annotation
+        response = self.client.post("/api/auth/profile/update/", {"languages": []}, format="json")
+        self.assertEqual(response.json()["languages"], [])
+
+    def test_authenticated_profile_lists(self):
+        routes = [
+            (3, "/api/auth/profile/skill-categories/"),
+            (2, "/api/auth/profile/skills/"),
+            (2, "/api/auth/profile/certifications/"),
+            (2, "/api/auth/profile/languages/"),
+            (1, "/api/projects/"),
+            (1, "/api/certifications/"),
+        ]
+        for budget, path in routes:
+            self.login()
+            self.assertBudget(budget, "get", path)
+
+    def test_upload_image(self):
+        self.login()
+        image = SimpleUploadedFile("avatar.png", PNG_BYTES, content_type="image/png")
+        self.assertBudget(
+            2, "post", "/api/auth/profile/upload-image/", {"profile_image": image},
+            format="multipart",
+        )
+
+    def test_certifications_bulk_update(self):
+        self.login()
+        self.profile.certifications.add(
+            ProfileCertification.objects.create(title="Old cert", issuer="Issuer", date="2020")
+        )
+        # Up to 100 existing rows changed, 100 new rows, and the rest dropped
+        kept = min(self.rows, 100)
+        items = [
+            {"title": f"Cert {i}", "issuer": "Issuer", "date": "2025"} for i in range(kept)
+        ] + [
+            {"title": f"New cert {i}", "issuer": "Issuer", "date": "2025"} for i in range(100)
+        ]
+        response = self.assertBudget(
+            10, "post", "/api/auth/profile/certifications/bulk-update/", items, format="json"
+        )
+        self.assertEqual(
+            (response.data["created"], response.data["updated"], response.data["removed"]),
+            (100, kept, self.rows - kept + 1),
+        )
+
+    def test_skill_categories_bulk_update(self):
+        self.login()
+        first = SkillCategory.objects.filter(userprofile=self.profile).order_by("pk").first()
+        Skill.objects.create(name="Dropped", level=10, category=first)
+        self.profile.skill_categories.add(SkillCategory.objects.create(name="Old category"))
+        # Up to 50 categories with a changed and an added skill, plus 10 new ones
+        kept = min(self.rows, 50)
+        items = [
+            {"category": f"Category {i}", "skills": [
+                {"name": f"Skill {i}", "level": 80}, {"name": "Added", "level": 20},
+            ]}
+            for i in range(kept)
+        ] + [
+            {"category": f"New category {i}", "skills": [
+                {"name": f"Skill {j}", "level": 60} for j in range(5)
+            ]}
+            for i in range(10)
+        ]
+        response = self.assertBudget(
+            14, "post", "/api/auth/profile/skill-categories/bulk-update/", items, format="json"
+        )
+        self.assertEqual(
+            (response.data["created"], response.data["updated"], response.data["removed"]),
+            (10 + kept + 50, kept, self.rows - kept + 2),
+        )
+
+    def test_languages_bulk_update(self):
+        self.login()
+        self.profile.languages.add(Language.objects.create(name="Old language", proficiency="Basic"))
+        # Up to 50 existing rows changed, 10 new rows, and the rest dropped
+        kept = min(self.rows, 50)
+        items = [
+            {"name": f"Language {i}", "proficiency": "Native"} for i in range(kept)
+        ] + [
+            {"name": f"New language {i}", "proficiency": "Basic"} for i in range(10)
+        ]
+        response = self.assertBudget(
+            10, "post", "/api/auth/profile/languages/bulk-update/", items, format="json"
+        )
+        self.assertEqual(
+            (response.data["created"], response.data["updated"], response.data["removed"]),
+            (10, kept, self.rows - kept + 1),
+        )
+
+    def test_remove_profile(self):
+        self.login()
+        self.assertBudget(7, "delete", "/api/auth/profile/remove/", status_code=204)
+
+    def test_me(self):
+        self.login()
+        self.assertBudget(1, "get", "/api/auth/me/")
+        self.login()
+        self.assertBudget(1, "get", "/api/auth/users/me/")
+
+    def test_register(self):
+        for index, path in enumerate(("/api/auth/users/register/", "/api/auth/register/")):
+            with self.subTest(path=path):
+                self.assertBudget(
+                    4, "post", path,
+                    {
+                        "username": f"visitor{index}", "email": f"visitor{index}@example.com",
+                        "password": "long-password", "password_confirm": "long-password",
+                    },
+                    status_code=201,
+                )
+
+    def test_login_and_refresh(self):
+        # The user, then the refresh token recorded as outstanding
+        response = self.assertBudget(
+            2, "post", "/api/auth/login/",
+            {"username": "owner", "password": "secret-password"},
+        )
+        # The blacklist filter is loaded once per process; rotating the token
+        # blacklists it in a savepoint and records the new one
+        response = self.assertBudget(
+            7, "post", "/api/auth/token/refresh/", {"refresh": response.data["refresh"]}
+        )
+        self.assertBudget(6, "post", "/api/auth/token/refresh/", {"refresh": response.data["refresh"]})
+
+
+class QueryBudgetHundredRowsTests(QueryBudgetTests):
+    rows = 100
+
+
+class QueryBudgetTenThousandRowsTests(QueryBudgetTests):
+    rows = 10_000
+
+
+@override_settings(PORTFOLIO_OWNER_USERNAME="owner")
+class ConditionalGetTests(TestCase):
+    routes = (
+        "/api/about/",
+        "/api/projects/",
+        "/api/blog/",
+        "/api/contact/",
+        "/api/certifications/",
+        "/api/auth/profile/",
+        "/api/auth/profile/skill-categories/",
+        "/api/auth/profile/skills/",
+        "/api/auth/profile/certifications/",
+        "/api/auth/profile/languages/",
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username="owner", email="owner@example.com")
+        cls.profile = UserProfile.objects.create(user=cls.owner)
+        seed_portfolio(cls.owner, cls.profile, 3)
+
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.reset()
+        get_backend().reset()
+        invalidate_public_owner()
+        get_public_owner()
+        self.client = APIClient()
+
+    def test_matching_etag_returns_304_without_queries(self):
+        for path in self.routes:
+            with self.subTest(path=path):
+                # Once the second of the stamps is over
+                with mock.patch("portfolio.mixins.time") as clock:
+                    clock.time.return_value = datetime.now().timestamp() + 1
+                    response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("Last-Modified", response)
+                with self.assertNumQueries(0):
+                    response = self.client.get(path, HTTP_IF_NONE_MATCH=response["ETag"])
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+
+    def test_detail_etag(self):
+        project = Project.objects.first()
+        path = f"/api/projects/{project.pk}/"
+        etag = self.client.get(path)["ETag"]
+        self.assertNotEqual(etag, self.client.get("/api/projects/")["ETag"])
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_write_changes_etag(self):
+        etag = self.client.get("/api/projects/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.first().delete()
+        response = self.client.get("/api/projects/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_relation_change_changes_etag(self):
+        etag = self.client.get("/api/auth/profile/languages/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.languages.clear()
+        response = self.client.get("/api/auth/profile/languages/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_last_modified_is_rounded_up(self):
+        cache.set(KEY_TEMPLATE.format("projects"), 1000.25, None)
+        response = self.client.get("/api/projects/")
+        self.assertEqual(response["Last-Modified"], http_date(1001))
+        self.assertEqual(
+            self.client.get("/api/projects/", HTTP_IF_MODIFIED_SINCE=http_date(1001)).status_code, 304
+        )
+        # A response from earlier in the second of the write is stale
+        response = self.client.get("/api/projects/", HTTP_IF_MODIFIED_SINCE=http_date(1000))
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_last_modified_during_the_second_of_a_write(self):
+        cache.set(KEY_TEMPLATE.format("projects"), 1000.25, None)
+        with mock.patch("portfolio.mixins.time") as clock:
+            clock.time.return_value = 1000.5
+            response = self.client.get("/api/projects/")
+        self.assertNotIn("Last-Modified", response)
+        self.assertIn("ETag", response)
+
+    def test_etag_depends_on_user(self):
+        etag = self.client.get("/api/projects/")["ETag"]
+        self.client.force_authenticate(self.owner)
+        response = self.client.get("/api/projects/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+
+
+@override_settings(PORTFOLIO_OWNER_USERNAME="owner")
+class AsyncReadTests(TestCase):
+    # Async route -> the sync route it mirrors for anonymous visitors
+    routes = {
+        "/api/async/profile/": "/api/auth/profile/",
+        "/api/async/profile/skill-categories/": "/api/auth/profile/skill-categories/",
+        "/api/async/profile/skills/": "/api/auth/profile/skills/",
+        "/api/async/profile/certifications/": "/api/auth/profile/certifications/",
+        "/api/async/profile/languages/": "/api/auth/profile/languages/",
+        "/api/async/projects/": "/api/projects/",
+        "/api/async/certifications/": "/api/certifications/",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username="owner", email="owner@example.com")
+        cls.profile = UserProfile.objects.create(user=cls.owner, title="Engineer")
+        seed_portfolio(cls.owner, cls.profile, 3)
+
+    def setUp(self):
+        cache.clear()
+        invalidate_public_owner()
+
+    def test_matches_sync_endpoints(self):
+        for async_path, sync_path in self.routes.items():
+            with self.subTest(path=async_path):
+                response = self.client.get(async_path)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["Content-Type"], "application/json")
+                self.assertEqual(response.json(), self.client.get(sync_path).json())
+
+    def test_blog(self):
+        post = BlogPost.objects.first()
+        response = self.client.get(f"/api/async/blog/{post.pk}/")
+        self.assertEqual(response.json(), self.client.get(f"/api/blog/{post.pk}/").json())
+        self.assertEqual(self.client.get("/api/async/blog/0/").status_code, 404)
+
+        for query in ("", "?summary=true"):
+            sync_results = self.client.get(f"/api/blog/{query}").json()["results"]
+            self.assertEqual(self.client.get(f"/api/async/blog/{query}").json()["results"], sync_results)
+
+    def test_blog_cursor(self):
+        seen = []
+        url = "/api/async/blog/?page_size=2"
+        while url:
+            body = self.client.get(url).json()
+            seen += [post["id"] for post in body["results"]]
+            url = body["next"]
+        self.assertEqual(seen, list(BlogPost.objects.order_by("-created_at", "-id").values_list("id", flat=True)))
+        response = self.client.get("/api/async/blog/?cursor=bogus")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"detail": "Invalid cursor"})
+
+    def test_matching_etag_returns_304_without_queries(self):
+        get_public_owner()
+        for path in self.routes:
+            with self.subTest(path=path):
+                etag = self.client.get(path)["ETag"]
+                with self.assertNumQueries(0):
+                    response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+        Project.objects.first().delete()
+        response = self.client.get("/api/async/projects/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_last_modified_is_rounded_up(self):
+        cache.set(KEY_TEMPLATE.format("projects"), 1000.25, None)
+        response = self.client.get("/api/async/projects/")
+        self.assertEqual(response["Last-Modified"], http_date(1001))
+        response = self.client.get("/api/async/projects/", HTTP_IF_MODIFIED_SINCE=http_date(1000))
+        self.assertEqual(response.status_code, 200)
+        with mock.patch("portfolio.mixins.time") as clock:
+            clock.time.return_value = 1000.5
+            self.assertNotIn("Last-Modified", self.client.get("/api/async/projects/"))
+
+    def test_read_only(self):
+        self.assertEqual(self.client.post("/api/async/projects/").status_code, 405)
+        self.assertEqual(self.client.head("/api/async/projects/").status_code, 200)
+
+    @override_settings(PORTFOLIO_OWNER_USERNAME="nobody")
+    def test_without_owner(self):
+        self.assertEqual(self.client.get("/api/async/profile/").status_code, 404)
+        self.assertEqual(self.client.get("/api/async/projects/").json(), [])
+        self.assertEqual(self.client.get("/api/async/profile/languages/").json(), [])
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ContactMessage.objects.bulk_create(
+            ContactMessage(name=f"Visitor {i}", email="visitor@example.com", message="Hello")
+            for i in range(45)
+        )
+        # Identical timestamps must not skip or repeat rows across pages
+        ContactMessage.objects.update(created_at=ContactMessage.objects.first().created_at)
+
+    def test_walks_every_row_once_without_count(self):
+        seen = []
+        url = "/api/contact/?page_size=10"
+        while url:
+            with self.assertNumQueries(1) as queries:
+                response = self.client.get(url)
+            self.assertNotIn("OFFSET", queries.captured_queries[0]["sql"])
+            body = response.json()
+            self.assertLessEqual(len(body["results"]), 10)
+            self.assertNotIn("count", body)
+            seen.extend(message["id"] for message in body["results"])
+            last, url = body, body["next"]
+        self.assertEqual(sorted(seen, reverse=True), seen)
+        self.assertEqual(len(seen), 45)
+
+        # Walking back from the last page yields the same rows in reverse
+        back, url = [], last["previous"]
+        while url:
+            with self.assertNumQueries(1) as queries:
+                body = self.client.get(url).json()
+            self.assertNotIn("OFFSET", queries.captured_queries[0]["sql"])
+            back[:0] = [message["id"] for message in body["results"]]
+            url = body["previous"]
+        self.assertEqual(back, seen[:40])
+
+    def test_malformed_position_is_rejected(self):
+        cursor = base64.b64encode(b"p=yesterday").decode()
+        response = self.client.get("/api/contact/", {"cursor": cursor})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    IMAGE_VARIANTS_ASYNC=False,
+    IMAGE_VARIANT_WIDTHS=(320, 640, 4000),
+)
+class ImageVariantTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="owner", email="owner@example.com")
+        cls.profile = UserProfile.objects.create(user=cls.user)
+
+    def jpeg(self, size=(1200, 800)):
+        exif = Image.Exif()
+        exif[0x010F] = "Camera maker"
+        buffer = BytesIO()
+        Image.new("RGB", size, (200, 30, 30)).save(buffer, "JPEG", exif=exif)
+        return SimpleUploadedFile("photo.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+    def upload(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(
+                "/api/auth/profile/upload-image/", {"profile_image": self.jpeg()}, format="multipart"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.profile.refresh_from_db()
+        return self.profile.profile_image_variants
+
+    def test_upload_generates_variants(self):
+        data = self.upload()
+        self.assertEqual(data["source"], self.profile.profile_image.name)
+        self.assertEqual((data["width"], data["height"]), (1200, 800))
+        # Widths above the original are capped at the original size
+        self.assertEqual([v["width"] for v in data["variants"]["webp"]], [320, 640, 1200])
+        self.assertEqual([v["height"] for v in data["variants"]["jpeg"]], [213, 427, 800])
+        for entries in data["variants"].values():
+            for entry in entries:
+                with Image.open(self.profile.profile_image.storage.open(entry["name"])) as variant:
+                    self.assertEqual(variant.width, entry["width"])
+                    self.assertEqual(len(variant.getexif()), 0)
+
+    def test_serializers_expose_srcset(self):
+        self.upload()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        body = client.get("/api/auth/profile/").json()
+        webp = body["profile_image_srcset"]["webp"].split(", ")
+        self.assertEqual(len(webp), 3)
+        self.assertTrue(webp[0].startswith("/media/profiles/variants/"))
+        self.assertTrue(webp[0].endswith(" 320w"))
+
+    def test_replacing_image_removes_old_variants(self):
+        self.upload()
+        storage = self.profile.profile_image.storage
+        new = self.upload()
+        # The new upload may reuse the old file name; variants are still regenerated
+        self.assertEqual(new["source"], self.profile.profile_image.name)
+        stem = self.profile.profile_image.name.split("/")[-1].rsplit(".", 1)[0]
+        current = {entry["name"].split("/")[-1] for entries in new["variants"].values() for entry in entries}
+        _, files = storage.listdir("profiles/variants")
+        self.assertEqual({name for name in files if name.startswith(stem + "-")}, current)
+
+
+def throttle_rates(**rates):
+    return {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+
+
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        get_backend().reset()
+        User.objects.create_user(username="owner", email="owner@example.com", password="secret-password")
+
+    def login(self, ip="10.0.0.1"):
+        return self.client.post(
+            "/api/auth/login/", {"username": "owner", "password": "wrong"}, REMOTE_ADDR=ip
+        )
+
+    @mock.patch.object(throttling.time, "monotonic", return_value=1000.0)
+    def test_login_is_limited_per_ip(self, monotonic):
+        for _ in range(10):
+            self.assertEqual(self.login().status_code, 401)
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        # One token of 10/min comes back every 6 seconds
+        self.assertEqual(response["Retry-After"], "6")
+        # Other clients keep their own bucket
+        self.assertEqual(self.login(ip="10.0.0.2").status_code, 401)
+        self.assertEqual(throttling.denied_counts()["login"], 1)
+
+    def test_tokens_refill_over_time(self):
+        with override_settings(REST_FRAMEWORK=throttle_rates(login="2/min")):
+            with mock.patch.object(throttling.time, "monotonic", return_value=1000.0):
+                self.login()
+                self.login()
+                self.assertEqual(self.login().status_code, 429)
+            with mock.patch.object(throttling.time, "monotonic", return_value=1030.0):
+                self.assertEqual(self.login().status_code, 401)
+                self.assertEqual(self.login().status_code, 429)
+
+    def test_route_limit_applies_to_all_clients(self):
+        with override_settings(REST_FRAMEWORK=throttle_rates(**{"register": "5/hour", "register.route": "2/hour"})):
+            for index in range(2):
+                self.client.post("/api/auth/users/register/", {}, REMOTE_ADDR=f"10.0.1.{index}")
+            response = self.client.post("/api/auth/users/register/", {}, REMOTE_ADDR="10.0.1.9")
+        self.assertEqual(response.status_code, 429)
+
+    def test_reads_are_not_throttled(self):
+        with override_settings(REST_FRAMEWORK=throttle_rates(contact="1/min")):
+            for _ in range(3):
+                self.assertEqual(self.client.get("/api/contact/").status_code, 200)
+
+    def test_stats_endpoint_is_admin_only(self):
+        self.assertEqual(self.client.get("/api/throttles/").status_code, 401)
+        admin = User.objects.create_superuser(username="admin", email="admin@example.com", password="pw")
+        client = APIClient()
+        client.force_authenticate(admin)
+        body = client.get("/api/throttles/").json()
+        self.assertEqual(body["backend"], "memory")
+        self.assertEqual(body["denied"], {"contact": 0, "login": 0, "register": 0})
+
+
+class MmapThrottleBackendTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = f"{directory}/throttle.bin"
+
+    def test_workers_share_buckets_and_counters(self):
+        first, second = MmapBackend(self.path, 64), MmapBackend(self.path, 64)
+        self.assertEqual(first.consume("login:1.2.3.4", 2, 1 / 30), 0)
+        self.assertEqual(second.consume("login:1.2.3.4", 2, 1 / 30), 0)
+        self.assertGreater(first.consume("login:1.2.3.4", 2, 1 / 30), 29)
+        self.assertEqual(second.consume("login:5.6.7.8", 2, 1 / 30), 0)
+        first.incr("login")
+        second.incr("login")
+        self.assertEqual(first.get_counts(["login", "contact"]), {"login": 2, "contact": 0})
+
+    def test_full_table_reuses_least_recently_updated_slot(self):
+        backend = MmapBackend(self.path, 4)
+        for index in range(6):
+            self.assertEqual(backend.consume(f"key-{index}", 1, 1 / 60), 0)
+        # Every key fits somewhere; the oldest buckets were given away
+        self.assertGreater(backend.consume("key-5", 1, 1 / 60), 0)
+        self.assertEqual(backend.consume("key-0", 1, 1 / 60), 0)
+
+
+class JSONRendererTests(SimpleTestCase):
+    data = {
+        "created": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        "day": date(2024, 5, 1),
+        "at": time(9, 15, 30, 500000),
+        "price": Decimal("12.50"),
+        "label": gettext_lazy("Portfolio"),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "text": "Caf\u00e9 \u2028 line \u2029 paragraph",
+        "items": [1, 2.5, None, True, {"nested": ["a", "b"]}],
+        3: "int key",
+    }
+
+    def assertSameAsDRF(self, data, **kwargs):
+        expected = drf_renderers.JSONRenderer().render(data, **kwargs)
+        self.assertEqual(renderers.JSONRenderer().render(data, **kwargs), expected)
+
+    def test_output_matches_drf(self):
+        self.assertSameAsDRF(self.data)
+        self.assertIn(b"\\u2028", renderers.JSONRenderer().render(self.data))
+
+    def test_unsupported_values_fall_back(self):
+        self.assertSameAsDRF({"big": 2 ** 70})
+        self.assertSameAsDRF(self.data, accepted_media_type="application/json; indent=4")
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertSameAsDRF(self.data)
+
+    def test_parser_matches_drf(self):
+        body = b'{"name": "Caf\xc3\xa9", "tags": ["a", 1, 2.5, null]}'
+        self.assertEqual(
+            renderers.JSONParser().parse(BytesIO(body)), parsers.JSONParser().parse(BytesIO(body))
+        )
+        with self.assertRaises(ParseError):
+            renderers.JSONParser().parse(BytesIO(b'{"name": NaN}'))
+
+
+@override_settings(PORTFOLIO_OWNER_USERNAME="owner")
+class CompressionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(username="owner", email="owner@example.com")
+        seed_portfolio(owner, UserProfile.objects.create(user=owner, title="Engineer"), 20)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_negotiation(self):
+        factory = RequestFactory()
+        cases = {
+            "gzip, deflate, br": "br",
+            "br;q=0, gzip": "gzip",
+            "gzip;q=0.5, br;q=0": "gzip",
+            "identity": None,
+            "*": "br",
+            "": None,
+        }
+        for header, expected in cases.items():
+            request = factory.get("/", HTTP_ACCEPT_ENCODING=header)
+            self.assertEqual(compression.negotiate_encoding(request), expected, header)
+
+    def test_api_responses_are_compressed(self):
+        plain = self.client.get("/api/projects/")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        response = self.client.get("/api/projects/", HTTP_ACCEPT_ENCODING="br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), plain.content)
+        self.assertEqual(response["ETag"], "W/" + plain["ETag"])
+        # The weak validator still revalidates
+        response = self.client.get(
+            "/api/projects/", HTTP_ACCEPT_ENCODING="br", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get("/api/projects/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get("/api/about/", HTTP_ACCEPT_ENCODING="br")
+        self.assertLess(len(response.content), 512)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_snapshot_caches_compressed_bytes(self):
+        plain = self.client.get("/api/portfolio/").content
+        with mock.patch.object(compression, "brotli", wraps=brotli) as wrapped:
+            first = self.client.get("/api/portfolio/", HTTP_ACCEPT_ENCODING="br")
+            with self.assertNumQueries(0):
+                second = self.client.get("/api/portfolio/", HTTP_ACCEPT_ENCODING="br")
+        self.assertEqual(wrapped.compress.call_count, 1)
+        self.assertEqual(first["Content-Encoding"], "br")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(json.loads(brotli.decompress(second.content)), json.loads(plain))
+
+
+class EndpointBenchmarkTests(TestCase):
+    scale = benchmark.Scale(users=2, projects=3, certifications=2, skills=12, posts=3, messages=3)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixture = benchmark.seed(cls.scale)
+
+    def test_mix_covers_every_route(self):
+        self.assertEqual(benchmark.uncovered_routes(self.fixture), [])
+        self.assertIn("api/async/blog/<int:pk>/", benchmark.url_routes())
+        self.assertFalse(any(route.startswith("admin/") for route in benchmark.url_routes()))
+
+    def test_replay_and_compare(self):
+        from backend.wsgi import application
+
+        routes = len(benchmark.ROUTES)
+        with benchmark.benchmark_settings(), self.captureOnCommitCallbacks(execute=True):
+            samples = benchmark.replay(application, self.fixture, routes + 5, warmup=0)
+        failed = [label for label, ok, _, _ in samples if not ok]
+        self.assertEqual(failed, [])
+
+        report = benchmark.summarize(samples, self.scale)
+        self.assertEqual(report["total"]["requests"], routes + 5)
+        self.assertEqual(len(report["routes"]), routes)
+        self.assertEqual(report["routes"]["GET /api/auth/profile/"]["queries_max"], 1)
+        report = json.loads(json.dumps(report))
+        self.assertFalse(any(change[4] for change in benchmark.compare(report, report)))
+
+        baseline = json.loads(json.dumps(report))
+        baseline["routes"]["GET /api/projects/"]["queries_max"] = 0
+        baseline["total"]["p95_ms"] = 0
+        regressions = {
+            (label, metric) for label, metric, _, _, regression in benchmark.compare(report, baseline)
+            if regression
+        }
+        self.assertEqual(regressions, {("GET /api/projects/", "queries_max"), ("total", "p95_ms")})
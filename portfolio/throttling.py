@@ -0,0 +1,237 @@
+"""
+Token bucket throttling for the endpoints that are expensive to abuse.
+
+Views opt in with a ``throttle_scope`` (login, register, contact). Each
+scope may have two rates in ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]``:
+``"<scope>"`` limits each client IP and ``"<scope>.route"`` limits all
+clients together. A rate such as ``"5/min"`` is a bucket of 5 tokens
+refilled evenly over the minute, so short bursts pass and sustained
+floods are held to the rate. Refused requests get a 429 with
+``Retry-After`` and are counted per scope.
+
+Buckets are kept by a backend chosen with ``THROTTLE_BACKEND``:
+
+* ``"memory"``: per process; limits are multiplied by the worker count.
+* ``"mmap"``: a fixed-size table in a memory-mapped file
+  (``THROTTLE_MMAP_PATH``), locked with ``flock``, shared by every worker
+  on the host without an external service.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the memory backend is available
+    fcntl = None
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """``"5/min"`` -> (capacity 5, tokens per second 5 / 60)."""
+    number, _, period = rate.partition("/")
+    capacity = int(number)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def take(tokens, updated, now, capacity, refill):
+    """
+    Refill a bucket up to ``now`` and take one token from it.
+
+    Returns the tokens left and the seconds to wait, 0 when the token was
+    taken. A bucket seen for the first time has ``updated`` None.
+    """
+    if updated is None:
+        tokens = capacity
+    else:
+        tokens = min(capacity, tokens + (now - updated) * refill)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) / refill
+
+
+class MemoryBackend:
+    """Buckets and counters in a dict of this process, least recently used evicted."""
+
+    name = "memory"
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def consume(self, key, capacity, refill):
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (0, None))
+            tokens, wait = take(tokens, updated, now, capacity, refill)
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return wait
+
+    def incr(self, name):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def get_counts(self, names):
+        with self.lock:
+            return {name: self.counters.get(name, 0) for name in names}
+
+    def reset(self):
+        with self.lock:
+            self.buckets.clear()
+            self.counters.clear()
+
+
+class MmapBackend:
+    """
+    Buckets and counters in a hash table in a memory-mapped file.
+
+    Each slot holds a 64-bit key hash and two doubles: the tokens and the
+    (wall clock) time of the last update for a bucket, the count and the
+    last update for a counter. Keys are probed linearly over a few slots;
+    when all are taken the least recently updated one is reused, which
+    at worst gives a client a fresh bucket.
+    """
+
+    name = "mmap"
+    slot = struct.Struct("<Qdd")
+    probes = 8
+
+    def __init__(self, path, slots):
+        self.path = path
+        self.slots = slots
+        self.lock = threading.Lock()
+        self.fd = None
+        self.map = None
+        self.pid = None
+
+    def _open(self):
+        # Reopened in each forked worker: flock only excludes other open
+        # file descriptions, not the one inherited from the parent
+        if self.pid == os.getpid():
+            return
+        size = self.slots * self.slot.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self.fd, self.map, self.pid = fd, mmap.mmap(fd, size), os.getpid()
+
+    def _update(self, key, update):
+        """
+        Apply ``update(first, second)`` -> (first, second, result) to the
+        slot of ``key``; a ``first`` of None leaves the slot unchanged.
+        """
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        with self.lock:
+            self._open()
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                start, found, victim = key_hash % self.slots, None, None
+                for probe in range(self.probes):
+                    offset = (start + probe) % self.slots * self.slot.size
+                    stored_hash, first, second = self.slot.unpack_from(self.map, offset)
+                    if stored_hash == key_hash:
+                        found = (offset, first, second)
+                        break
+                    if stored_hash == 0:
+                        found = (offset, 0, None)
+                        break
+                    if victim is None or second < victim[2]:
+                        victim = (offset, 0, second)
+                offset, first, second = found or (victim[0], 0, None)
+                first, second, result = update(first, second)
+                if first is not None:
+                    self.slot.pack_into(self.map, offset, key_hash, first, second)
+                return result
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def consume(self, key, capacity, refill):
+        now = time.time()
+
+        def update(tokens, updated):
+            tokens, wait = take(tokens, updated, now, capacity, refill)
+            return tokens, now, wait
+
+        return self._update(f"bucket:{key}", update)
+
+    def incr(self, name):
+        self._update(f"counter:{name}", lambda count, _updated: (count + 1, time.time(), None))
+
+    def get_counts(self, names):
+        return {
+            name: int(self._update(f"counter:{name}", lambda count, _updated: (None, None, count)))
+            for name in names
+        }
+
+    def reset(self):
+        with self.lock:
+            self._open()
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                self.map[:] = bytes(len(self.map))
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.THROTTLE_BACKEND == "mmap":
+                    _backend = MmapBackend(settings.THROTTLE_MMAP_PATH, settings.THROTTLE_MMAP_SLOTS)
+                else:
+                    _backend = MemoryBackend(settings.THROTTLE_MEMORY_MAX_KEYS)
+    return _backend
+
+
+def throttle_scopes():
+    return sorted({name.partition(".")[0] for name in api_settings.DEFAULT_THROTTLE_RATES})
+
+
+def denied_counts():
+    """Requests refused so far, per scope (per host with the mmap backend)."""
+    return get_backend().get_counts(throttle_scopes())
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttles views that set ``throttle_scope``; see the module docstring."""
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        self.wait_time = 0
+        if not scope:
+            return True
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        backend = get_backend()
+        policies = ((scope, f"{scope}:{self.get_ident(request)}"), (f"{scope}.route", scope))
+        for name, key in policies:
+            rate = rates.get(name)
+            if not rate:
+                continue
+            wait = backend.consume(key, *parse_rate(rate))
+            if wait:
+                self.wait_time = wait
+                backend.incr(scope)
+                return False
+        return True
+
+    def wait(self):
+        return self.wait_time
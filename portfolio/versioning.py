@@ -0,0 +1,50 @@
+"""
+Version stamps for the API's resource collections.
+
+Each collection ("projects", "blog", "profile", ...) has a stamp in the
+cache holding the time of its last change. ``portfolio.signals`` bumps
+the stamp whenever a row in the collection is saved or deleted. Code
+that writes with ``bulk_create``/``bulk_update``/``update()``, which
+send no signals, must call ``bump_versions`` itself. Stamps move when
+the writing transaction commits.
+
+Stamps are used to build HTTP validators (``portfolio.mixins``) and
+cache keys (``portfolio.snapshot``), so nothing has to be deleted on
+change: stale entries simply stop being addressed.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_TEMPLATE = "portfolio:version:{}"
+
+
+def get_version(label):
+    """Return the stamp of ``label``, starting it now if it has none yet."""
+    key = KEY_TEMPLATE.format(label)
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, time.time(), None)
+        stamp = cache.get(key)
+    return stamp
+
+
+def get_versions(labels):
+    return [get_version(label) for label in labels]
+
+
+def bump_versions(*labels):
+    """
+    Move the stamps of ``labels`` to now, once the current transaction
+    commits (at once outside one).
+
+    A stamp moved before the commit would let a concurrent reader, which
+    still sees the old rows, cache them under the new stamp; a rolled
+    back transaction leaves the stamps alone.
+    """
+    def bump():
+        now = time.time()
+        cache.set_many({KEY_TEMPLATE.format(label): now for label in labels}, None)
+
+    transaction.on_commit(bump)
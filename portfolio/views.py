@@ -0,0 +1,39 @@
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .compression import negotiate_encoding
+from .snapshot import get_snapshot_bytes
+from .throttling import denied_counts, get_backend
+
+
+class PortfolioSnapshotView(APIView):
+    """
+    Public portfolio document in a single response.
+
+    Combines the data from the profile, skills, certifications,
+    languages, projects and blog endpoints, served from cache.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        snapshot = get_snapshot_bytes(request, negotiate_encoding(request))
+        if snapshot is None:
+            return Response({'error': 'Profile not found'}, status=404)
+        content, encoding = snapshot
+        response = HttpResponse(content, content_type='application/json')
+        # Compressed once and cached, so CompressionMiddleware leaves it alone
+        if encoding:
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class ThrottleStatsView(APIView):
+    """Requests refused by ``portfolio.throttling`` so far, per scope."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({'backend': get_backend().name, 'denied': denied_counts()})
@@ -15,6 +15,7 @@ class Project(models.Model):
     technologies = models.CharField(max_length=200)
     type = models.CharField(max_length=100)
     image = models.ImageField(upload_to="projects/", blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from portfolio.fields import ImageSrcsetField
 from .models import Project
 
 class ProjectSerializer(serializers.ModelSerializer):
+    image_srcset = ImageSrcsetField(source='image_variants')
+
     class Meta:
         model = Project
         fields = '__all__'
@@ -5,25 +5,24 @@ from rest_framework import status
 from django.shortcuts import get_object_or_404
 from .models import Project
 from .serializers import ProjectSerializer
-from users.models import User
+from portfolio.mixins import ConditionalGetMixin
+from portfolio.owner import get_public_owner
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     http_method_names = ['get', 'post', 'put', 'patch', 'delete']
+    version_collections = ('projects',)
 
     def get_queryset(self):
         if self.request.user.is_authenticated:
             return Project.objects.filter(user=self.request.user)
-        else:
-            # Use specific user or default to user ID 2 if not found
-            try:
-                specific_user = User.objects.get(email="khalfan@khalfanathman.dev")
-                return Project.objects.filter(user=specific_user)
-            except User.DoesNotExist:
-                # Fallback to user ID 2 if specific user doesn't exist
-                return Project.objects.filter(user_id=2)
+        # Anonymous visitors see the public portfolio owner's projects
+        owner = get_public_owner()
+        if not owner:
+            return Project.objects.none()
+        return Project.objects.filter(user_id=owner.user_id)
     def perform_create(self, serializer):
         """
         Automatically assign the current user to the project when creating
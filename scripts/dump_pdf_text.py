@@ -1,20 +1,177 @@
+"""
+Dump the text of one or more PDFs to stdout, page by page.
+
+Pages are extracted in parallel across a process pool and printed in
+order as soon as they are ready. Extracted pages are cached on disk,
+keyed by the file's SHA-256 and the pypdf version, so re-running on the
+same file only reads the cache.
+
+Usage: python dump_pdf_text.py [--jobs N] [--pages 1-3,7] [--no-cache] <pdf_path>...
+"""
+import argparse
+import hashlib
+import os
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
+import pypdf
 from pypdf import PdfReader
 
-def extract_text(pdf_path):
-    reader = PdfReader(pdf_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
-    return text
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("PDF_TEXT_CACHE_DIR")
+    or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "portfolio-pdf-text"
+)
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python dump_pdf_text.py <pdf_path>")
-        sys.exit(1)
-    
-    pdf_path = sys.argv[1]
+# The current file's reader, reused for every page a process is given
+_readers = {}
+
+
+def _page_text(pdf_path, index):
+    reader = _readers.get(pdf_path)
+    if reader is None:
+        _readers.clear()
+        reader = _readers[pdf_path] = PdfReader(pdf_path)
+    return reader.pages[index].extract_text()
+
+
+def file_digest(pdf_path):
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as fp:
+        for block in iter(lambda: fp.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_pages(spec, page_count):
+    """Turn "1-3,7" (1-based, inclusive) into sorted 0-based page indexes."""
+    if not spec:
+        return list(range(page_count))
+    indexes = set()
+    for part in spec.split(","):
+        start, dash, end = part.strip().partition("-")
+        try:
+            first = int(start) if start else 1
+            last = int(end) if end else (page_count if dash else first)
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part!r}")
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid page range: {part!r}")
+        indexes.update(range(first - 1, min(last, page_count)))
+    return sorted(indexes)
+
+
+class PageCache:
+    """Extracted page texts on disk, one file per page."""
+
+    def __init__(self, directory, pdf_path):
+        key = f"{file_digest(pdf_path)}-pypdf{pypdf.__version__}"
+        self.directory = Path(directory) / key
+
+    def _path(self, index):
+        return self.directory / f"{index}.txt"
+
+    def get(self, index):
+        try:
+            return self._path(index).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def set(self, index, text):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so concurrent runs never read a partial page
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            fp.write(text)
+        os.replace(tmp, self._path(index))
+
+
+def iter_pages(pdf_path, pages=None, jobs=None, cache_dir=DEFAULT_CACHE_DIR, executor=None):
+    """
+    Yield the text of each selected page of ``pdf_path``, in page order.
+
+    ``pages`` is a range spec such as "1-3,7"; ``jobs`` is the number of
+    worker processes (1 extracts in this process). Pass ``cache_dir=None``
+    to bypass the cache. An existing ``executor`` may be shared across files.
+    """
+    pdf_path = os.path.abspath(pdf_path)
+    _readers.clear()
+    reader = _readers[pdf_path] = PdfReader(pdf_path)
+    page_count = len(reader.pages)
+    indexes = parse_pages(pages, page_count)
+    cache = PageCache(cache_dir, pdf_path) if cache_dir else None
+
+    cached = {}
+    if cache:
+        for index in indexes:
+            text = cache.get(index)
+            if text is not None:
+                cached[index] = text
+    missing = [index for index in indexes if index not in cached]
+
+    jobs = min(jobs or os.cpu_count() or 1, len(missing))
+    own_executor = None
+    if jobs > 1 and executor is None:
+        executor = own_executor = ProcessPoolExecutor(max_workers=jobs)
+    pending = {}
     try:
-        print(extract_text(pdf_path))
-    except Exception as e:
-        print(f"Error: {e}")
+        if jobs > 1:
+            # Submitted up front, collected in order: each page is yielded as
+            # soon as it and the pages before it are done
+            pending = {index: executor.submit(_page_text, pdf_path, index) for index in missing}
+        for index in indexes:
+            if index in cached:
+                yield cached.pop(index)
+                continue
+            if index in pending:
+                text = pending.pop(index).result()
+            else:
+                text = _page_text(pdf_path, index)
+            if cache:
+                cache.set(index, text)
+            yield text
+    finally:
+        for future in pending.values():
+            future.cancel()
+        if own_executor is not None:
+            own_executor.shutdown(cancel_futures=True)
+
+
+def extract_text(pdf_path, pages=None, jobs=None, cache_dir=DEFAULT_CACHE_DIR):
+    return "".join(text + "\n" for text in iter_pages(pdf_path, pages, jobs, cache_dir))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dump the text of PDF files, page by page.")
+    parser.add_argument("pdf_paths", nargs="+", metavar="pdf_path")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Worker processes (default: one per CPU; 1 disables the pool)",
+    )
+    parser.add_argument("--pages", help='Pages to extract, 1-based, e.g. "1-3,7" (default: all)')
+    parser.add_argument(
+        "--cache-dir", default=str(DEFAULT_CACHE_DIR),
+        help=f"Where extracted pages are cached (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the cache")
+    args = parser.parse_args(argv)
+
+    cache_dir = None if args.no_cache else args.cache_dir
+    jobs = args.jobs or os.cpu_count() or 1
+    status = 0
+    with ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else nullcontext() as executor:
+        for pdf_path in args.pdf_paths:
+            try:
+                for text in iter_pages(pdf_path, args.pages, jobs, cache_dir, executor):
+                    sys.stdout.write(text + "\n")
+                    sys.stdout.flush()
+            except Exception as e:
+                print(f"Error: {e}", file=sys.stderr)
+                status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
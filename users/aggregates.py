@@ -0,0 +1,48 @@
+"""
+Related id lists as a column of the parent row.
+
+``id_list(UserProfile, "skill_categories")`` is a correlated subquery
+that aggregates the ids a many-to-many relation links to a row into one
+list, so a profile and all three of its relation lists come back from a
+single query instead of one query per ``prefetch_related`` lookup.
+PostgreSQL builds the list with ``ARRAY_AGG`` and SQLite with
+``JSON_GROUP_ARRAY``; other backends have no aggregate here and callers
+fall back to prefetching.
+
+Each relation gets its own subquery over its through table rather than
+a join in the outer query: joining several relations side by side would
+multiply their rows together before grouping.
+"""
+import json
+
+from django.db import connection
+from django.db.models import Aggregate, Field, OuterRef, Subquery
+
+VENDORS = ("postgresql", "sqlite")
+
+
+def supported():
+    return connection.vendor in VENDORS
+
+
+class IdListField(Field):
+    def from_db_value(self, value, expression, connection):
+        if isinstance(value, str):
+            value = json.loads(value)
+        # A row without related rows has no group, so the subquery is NULL
+        return sorted(value or ())
+
+
+class IdList(Aggregate):
+    function = "ARRAY_AGG"
+    output_field = IdListField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function="JSON_GROUP_ARRAY", **extra_context)
+
+
+def id_list(model, relation):
+    field = model._meta.get_field(relation)
+    source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+    rows = field.remote_field.through.objects.filter(**{source: OuterRef("pk")})
+    return Subquery(rows.order_by().values(source).annotate(ids=IdList(target)).values("ids"))
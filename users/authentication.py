@@ -1,32 +1,201 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from datetime import datetime, timezone as dt_timezone
+
 import jwt
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import BaseBackend
-from django.contrib.auth.models import User
-from jwt import PyJWKClient
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from portfolio.versioning import bump_versions
+
+from .tokens import USER_CLAIMS, is_revoked, revoke_tokens
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Unknown key ids trigger a refetch at most this often
+JWKS_MIN_REFRESH_INTERVAL = 30
+# Refresh in the background once this share of the TTL has passed
+JWKS_SOFT_TTL_RATIO = 0.8
+JWKS_FETCH_TIMEOUT = 5
+
+
+class JWKSStore:
+    """
+    A process-wide copy of a JSON Web Key Set.
+
+    Keys are fetched once and served from memory for ``ttl`` seconds. Close
+    to the end of the TTL a background thread refreshes them while requests
+    keep using the current set; only an expired set or an unknown ``kid``
+    (keys were rotated) makes a request wait for a fetch, and unknown ids
+    refetch at most every ``JWKS_MIN_REFRESH_INTERVAL`` seconds.
+    """
+
+    def __init__(self, url, ttl):
+        self.url = url
+        self.ttl = ttl
+        self.keys = {}
+        self.fetched_at = None
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+    def fetch(self):
+        with urllib.request.urlopen(self.url, timeout=JWKS_FETCH_TIMEOUT) as response:
+            data = json.load(response)
+        keys = {}
+        for key in data.get("keys", []):
+            try:
+                keys[key.get("kid")] = jwt.PyJWK(key)
+            except jwt.PyJWKError:
+                logger.warning("Skipping unusable JWK %s from %s", key.get("kid"), self.url)
+        return keys
+
+    def refresh(self, unless_newer_than=None):
+        with self.lock:
+            # Another thread may have refreshed while this one waited
+            if unless_newer_than is not None and self.fetched_at and self.fetched_at > unless_newer_than:
+                return
+            try:
+                self.keys = self.fetch()
+                self.fetched_at = time.monotonic()
+            finally:
+                self.refreshing = False
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.warning("Background JWKS refresh from %s failed", self.url, exc_info=True)
+
+    def get_key(self, kid):
+        now = time.monotonic()
+        age = None if self.fetched_at is None else now - self.fetched_at
+        if age is None or age >= self.ttl:
+            try:
+                self.refresh(unless_newer_than=now - self.ttl)
+            except Exception:
+                if not self.keys:
+                    raise
+                # Keep verifying with the expired set rather than failing every request
+                logger.warning("JWKS refresh from %s failed; using cached keys", self.url, exc_info=True)
+        elif age >= self.ttl * JWKS_SOFT_TTL_RATIO and not self.refreshing:
+            self.refreshing = True
+            threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+        key = self.keys.get(kid)
+        if key is None and time.monotonic() - self.fetched_at >= JWKS_MIN_REFRESH_INTERVAL:
+            self.refresh(unless_newer_than=time.monotonic() - JWKS_MIN_REFRESH_INTERVAL)
+            key = self.keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key {kid!r}")
+        return key
+
+
+class ExpiringLRU:
+    """A bounded, thread-safe LRU whose entries each expire at a given time."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def token_key(token):
+    return hashlib.sha256(token.encode()).digest()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+# token hash -> verified claims, until the token's exp; repeat requests
+# skip the signature check entirely
+verified_tokens = ExpiringLRU(settings.CLERK_VERIFIED_TOKEN_CACHE_SIZE)
+# Clerk sub -> (user field values, iat of the last synced token)
+clerk_users = ExpiringLRU(settings.CLERK_USER_CACHE_SIZE)
+USER_FIELDS = [field.attname for field in User._meta.concrete_fields]
+
+
+def get_jwks_store():
+    url = settings.CLERK_JWKS_URL
+    if not url:
+        raise jwt.InvalidTokenError("CLERK_JWKS_URL is not configured")
+    store = _stores.get(url)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(url, JWKSStore(url, settings.CLERK_JWKS_TTL))
+    return store
+
+
+def verify_clerk_token(token):
+    """Return the claims of a valid Clerk session token, or raise ``InvalidTokenError``."""
+    key = token_key(token)
+    claims = verified_tokens.get(key)
+    if claims is not None:
+        return claims
+    header = jwt.get_unverified_header(token)
+    signing_key = get_jwks_store().get_key(header.get("kid"))
+    claims = jwt.decode(
+        token,
+        signing_key.key,
+        algorithms=["RS256"],
+        audience=settings.CLERK_PUBLISHABLE_KEY,
+        options={"verify_exp": True},
+    )
+    if isinstance(claims.get("exp"), (int, float)):
+        verified_tokens.set(key, claims, claims["exp"])
+    return claims
+
 
 class ClerkAuthenticationBackend(BaseBackend):
-    def __init__(self):
-        self.jwks_client = PyJWKClient(settings.CLERK_JWKS_URL)
-    
     def authenticate(self, request, token=None):
         if not token:
             return None
             
         try:
-            # Verify the JWT token
-            signing_key = self.jwks_client.get_signing_key_from_jwt(token)
-            data = jwt.decode(
-                token,
-                signing_key.key,
-                algorithms=["RS256"],
-                audience=settings.CLERK_PUBLISHABLE_KEY,
-                options={"verify_exp": True},
-            )
+            # Verify the JWT token; keys and verified tokens are cached per process
+            data = verify_clerk_token(token)
             
             # Extract user data from the token
             clerk_user_id = data.get("sub")
@@ -34,33 +203,76 @@ class ClerkAuthenticationBackend(BaseBackend):
             
             if not clerk_user_id:
                 return None
-                
-            # Get or create the user
+
+            return self.get_clerk_user(clerk_user_id, email, data.get("iat"))
+            
+        except jwt.InvalidTokenError:
+            return None
+    
+    def get_clerk_user(self, clerk_user_id, email, issued_at):
+        """
+        The user for a Clerk subject, served from ``clerk_users`` when possible.
+
+        The email is written back only when it differs and the token was
+        issued after the last sync, so replayed older tokens cannot revert it.
+        """
+        cached = clerk_users.get(clerk_user_id)
+        if cached is not None:
+            values, synced_at = cached
+            user = User.from_db(router.db_for_read(User), USER_FIELDS, values)
+        else:
             user, created = User.objects.get_or_create(
                 clerk_user_id=clerk_user_id,
                 defaults={
                     "username": email or clerk_user_id,
                     "email": email,
+                    "clerk_synced_at": _from_timestamp(issued_at),
                 }
             )
-            
-            # Update user data if needed
-            if not created:
-                if email and user.email != email:
-                    user.email = email
-                    user.save()
-            
-            return user
-            
-        except jwt.InvalidTokenError:
-            return None
-    
+            synced_at = user.clerk_synced_at.timestamp() if user.clerk_synced_at else None
+
+        if email and user.email != email and (
+            issued_at is None or synced_at is None or issued_at > synced_at
+        ):
+            user.email = email
+            user.clerk_synced_at = _from_timestamp(issued_at) or timezone.now()
+            User.objects.filter(pk=user.pk).update(email=email, clerk_synced_at=user.clerk_synced_at)
+            # update() sends no signals
+            bump_versions("profile")
+            revoke_tokens([user.pk])
+            synced_at = user.clerk_synced_at.timestamp()
+            cached = None
+
+        if cached is None:
+            clerk_users.set(
+                clerk_user_id,
+                ([getattr(user, name) for name in USER_FIELDS], synced_at),
+                time.time() + settings.CLERK_USER_CACHE_TTL,
+            )
+        return user
+
     def get_user(self, user_id):
         try:
             return User.objects.get(pk=user_id)
         except User.DoesNotExist:
             return None
 
+clerk_backend = ClerkAuthenticationBackend()
+
+
+def _from_timestamp(value):
+    if not isinstance(value, (int, float)):
+        return None
+    return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+
+
+@receiver((post_save, post_delete), sender=User)
+def _forget_clerk_user(sender, instance, **kwargs):
+    # Other processes see the change once their entry's short TTL runs out
+    if instance.clerk_user_id:
+        clerk_users.discard(instance.clerk_user_id)
+
+
 class ClerkTokenAuthentication(BaseAuthentication):
     def authenticate(self, request):
         auth_header = request.META.get('HTTP_AUTHORIZATION')
@@ -73,8 +285,7 @@ class ClerkTokenAuthentication(BaseAuthentication):
             token = auth_header.split(' ')[1]  # Bearer <token>
             
             # Use our Clerk authentication backend
-            backend = ClerkAuthenticationBackend()
-            user = backend.authenticate(request, token=token)
+            user = clerk_backend.authenticate(request, token=token)
             
             if user:
                 return (user, token)
@@ -84,4 +295,47 @@ class ClerkTokenAuthentication(BaseAuthentication):
         except IndexError:
             raise AuthenticationFailed('Token prefix missing')
         except Exception as e:
-            raise AuthenticationFailed(str(e))
\ No newline at end of file
+            raise AuthenticationFailed(str(e))
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    SimpleJWT authentication without the per-request user lookup.
+
+    The user is built from the access token's claims (``users.tokens``);
+    its other fields are deferred and loaded together on first access.
+    Tokens without the claims fall back to loading the user.
+    """
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        try:
+            user_id = User._meta.get_field(api_settings.USER_ID_FIELD).to_python(
+                validated_token[api_settings.USER_ID_CLAIM]
+            )
+        except Exception:
+            raise AuthenticationFailed("Token contained no recognizable user identification", code="bad_token")
+        if is_revoked(user_id, validated_token.get("iat")):
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+        values = {field: validated_token[claim] for claim, field in USER_CLAIMS.items()}
+        values[api_settings.USER_ID_FIELD] = user_id
+        # Deactivated users' tokens are revoked, so a valid token means active
+        values["is_active"] = True
+        # from_db takes the values in field order; the missing ones are deferred
+        fields = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+        user = User.from_db(router.db_for_read(User), fields, [values[name] for name in fields])
+        return _load_deferred_together(user)
+
+
+def _load_deferred_together(user):
+    """Make touching one deferred field of ``user`` load all of them in a single query."""
+    refresh_from_db = user.refresh_from_db
+
+    def refresh_deferred(using=None, fields=None, from_queryset=None):
+        if fields is not None:
+            fields = set(fields) | user.get_deferred_fields()
+        refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+    # Only this instance; DeferredAttribute calls instance.refresh_from_db()
+    user.refresh_from_db = refresh_deferred
+    return user
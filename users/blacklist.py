@@ -0,0 +1,153 @@
+"""
+Refresh token blacklist with an in-memory membership check.
+
+SimpleJWT's blacklist app records every refresh token it issues
+(``OutstandingToken``) and the ones revoked on rotation
+(``BlacklistedToken``); by itself it queries the blacklist on every
+refresh. Here each process keeps a Bloom filter of blacklisted token ids:
+a token the filter has never seen is certainly not blacklisted by this
+process, and only possible hits are checked in the database.
+
+Tokens blacklisted by other processes are not in the filter. They are
+caught when the token is blacklisted again on rotation: ``BlacklistedToken``
+is unique per token, so the second insert fails and the refresh is
+refused. The same constraint stops two concurrent refreshes of one token.
+
+``manage.py purge_expired_tokens`` deletes expired entries in batches.
+"""
+import hashlib
+import math
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter of strings."""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistFilter:
+    """
+    This process's Bloom filter of blacklisted token ids.
+
+    Loaded from the database on first use and rebuilt, without the expired
+    entries, once more ids were added than it was sized for.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+
+    def _load(self):
+        bloom = BloomFilter(settings.TOKEN_BLACKLIST_FILTER_CAPACITY, settings.TOKEN_BLACKLIST_FILTER_ERROR_RATE)
+        jtis = (
+            BlacklistedToken.objects.filter(token__expires_at__gt=aware_utcnow())
+            .order_by()
+            .values_list("token__jti", flat=True)
+        )
+        for jti in jtis.iterator():
+            bloom.add(jti)
+        return bloom
+
+    def _get(self):
+        bloom = self.bloom
+        if bloom is None or bloom.count > bloom.capacity:
+            with self.lock:
+                if self.bloom is bloom:
+                    self.bloom = self._load()
+                bloom = self.bloom
+        return bloom
+
+    def might_contain(self, jti):
+        return jti in self._get()
+
+    def add(self, jti):
+        bloom = self._get()
+        with self.lock:
+            bloom.add(jti)
+
+    def reset(self):
+        with self.lock:
+            self.bloom = None
+
+
+blacklist_filter = BlacklistFilter()
+
+
+def is_blacklisted(jti):
+    return blacklist_filter.might_contain(jti) and BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def outstand(token, user_id):
+    """Record a newly issued refresh token."""
+    return OutstandingToken.objects.create(
+        user_id=user_id,
+        jti=token[api_settings.JTI_CLAIM],
+        token=str(token),
+        created_at=token.current_time,
+        expires_at=datetime_from_epoch(token["exp"]),
+    )
+
+
+def blacklist(token, user_id):
+    """Blacklist a refresh token; raises ``TokenError`` if it already was."""
+    jti = token[api_settings.JTI_CLAIM]
+    outstanding, _created = OutstandingToken.objects.get_or_create(
+        jti=jti,
+        defaults={
+            "user_id": user_id,
+            "token": str(token),
+            "created_at": token.current_time,
+            "expires_at": datetime_from_epoch(token["exp"]),
+        },
+    )
+    try:
+        with transaction.atomic():
+            BlacklistedToken.objects.create(token=outstanding)
+    except IntegrityError:
+        raise TokenError(_("Token is blacklisted"))
+    blacklist_filter.add(jti)
+
+
+def purge_expired(batch_size=1000):
+    """Delete expired outstanding tokens and their blacklist entries; returns how many."""
+    now = aware_utcnow()
+    purged = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return purged
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        purged += len(ids)
@@ -0,0 +1,371 @@
+"""
+Import a resume document (``resume_data.json``) into one user's portfolio.
+
+The document is a JSON object with the sections ``profile``,
+``skill_categories``, ``certifications``, ``projects`` and ``languages``.
+Each section is upserted by natural key and only rows belonging to the
+target user are touched. ``manage.py import_resume`` is the entry point.
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import date
+
+from django.db import transaction
+
+from certifications.models import Certification as PublicCertification
+from portfolio.versioning import bump_versions
+from projects.models import Project
+
+from .models import ResumeSectionFingerprint, User, UserProfile
+from .sync import SyncError, SyncResult, sync_certifications, sync_languages, sync_skill_categories
+
+PROFILE_FIELDS = ("title", "bio", "location", "phone", "linkedin", "github", "website")
+USER_FIELDS = ("first_name", "last_name")
+PROJECT_FIELDS = ("description", "technologies", "status", "completion", "type", "link")
+PUBLIC_CERTIFICATION_FIELDS = ("date", "type", "badge")
+
+READ_SIZE = 64 * 1024
+
+
+class ResumeImportError(SyncError):
+    pass
+
+
+def iter_sections(fp, read_size=READ_SIZE):
+    """
+    Yield ``(name, value)`` for each key of the top-level JSON object in ``fp``.
+
+    The file is read incrementally and only one section is decoded and held
+    in memory at a time, so large documents do not have to be loaded whole.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def fill():
+        # Read at least as much as is buffered, so a large section is
+        # re-scanned a logarithmic number of times rather than once per chunk
+        nonlocal buffer, position, eof
+        buffer = buffer[position:]
+        position = 0
+        chunk = fp.read(max(read_size, len(buffer)))
+        if not chunk:
+            eof = True
+        buffer += chunk
+
+    def next_char():
+        # First non-whitespace character, reading more input as needed
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if eof:
+                raise ResumeImportError("Unexpected end of document")
+            fill()
+
+    def decode():
+        nonlocal position
+        next_char()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ResumeImportError("Invalid JSON document")
+                fill()
+                continue
+            # A number may continue past the end of the buffer
+            if end == len(buffer) and not eof:
+                fill()
+                continue
+            position = end
+            return value
+
+    def expect(char):
+        nonlocal position
+        if next_char() != char:
+            raise ResumeImportError(f"Expected {char!r} in document")
+        position += 1
+
+    expect("{")
+    if next_char() == "}":
+        return
+    while True:
+        name = decode()
+        if not isinstance(name, str):
+            raise ResumeImportError("Invalid JSON document")
+        expect(":")
+        yield name, decode()
+        if next_char() == "}":
+            return
+        expect(",")
+
+
+def _parse_date(value):
+    """Résumés often give only a year or a month; those map to its first day."""
+    try:
+        if isinstance(value, str) and len(value) in (4, 7):
+            year, _, month = value.partition("-")
+            return date(int(year), int(month or 1), 1)
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ResumeImportError(f"Invalid certification date: {value!r}")
+
+
+def import_profile(user, profile, data):
+    changed_user = [field for field in USER_FIELDS if field in data and getattr(user, field) != data[field]]
+    for field in changed_user:
+        setattr(user, field, data[field])
+    if changed_user:
+        user.save(update_fields=changed_user)
+
+    changed = [
+        field for field in PROFILE_FIELDS
+        if field in data and getattr(profile, field) != (data[field] or "")
+    ]
+    for field in changed:
+        setattr(profile, field, data[field] or "")
+    if changed:
+        profile.save(update_fields=changed)
+    return SyncResult(0, int(bool(changed_user or changed)), 0)
+
+
+def import_skill_categories(user, profile, data):
+    items = [
+        {"category": item.get("name"), "skills": item.get("skills", [])}
+        if isinstance(item, dict) else item
+        for item in data
+    ]
+    return sync_skill_categories(profile, items)
+
+
+def import_certifications(user, profile, data):
+    """
+    Import into both certification tables.
+
+    The profile's certifications (``users.Certification``) are synced as a
+    list; the public ``certifications.Certification`` rows of the user are
+    upserted by (name, issuer) and the unlisted ones deleted. The public
+    table requires a date, so undated (in progress) entries are left out.
+    """
+    result = sync_certifications(profile, data, user=user)
+
+    wanted = OrderedDict()
+    for item in data:
+        if not item.get("date"):
+            continue
+        wanted[(item["title"], item["issuer"])] = {
+            "date": _parse_date(item.get("date")),
+            "type": item.get("type") or "other",
+            "badge": item.get("badge") or "",
+        }
+    existing = {}
+    removed = []
+    for cert in PublicCertification.objects.filter(user=user).order_by("pk"):
+        key = (cert.name, cert.issuer)
+        if key in wanted and key not in existing:
+            existing[key] = cert
+        else:
+            removed.append(cert.pk)
+    created, updated = _upsert(
+        PublicCertification, existing, wanted, PUBLIC_CERTIFICATION_FIELDS,
+        lambda key, values: PublicCertification(user=user, name=key[0], issuer=key[1], **values),
+    )
+    if removed:
+        PublicCertification.objects.filter(pk__in=removed).delete()
+    if created or updated:
+        bump_versions("certifications")
+    return result
+
+
+def import_projects(user, profile, data):
+    """Upsert the user's projects by name; unlisted projects are deleted."""
+    wanted = OrderedDict()
+    for item in data:
+        if not isinstance(item, dict) or not item.get("name"):
+            raise ResumeImportError("Each project needs a name")
+        wanted[item["name"]] = {
+            "description": item.get("description", ""),
+            "technologies": item.get("technologies", ""),
+            "status": item.get("status", "completed"),
+            "completion": item.get("completion", "100%"),
+            "type": item.get("type", "web"),
+            "link": item.get("link", ""),
+        }
+    existing = {}
+    removed = []
+    for project in Project.objects.filter(user=user).order_by("pk"):
+        if project.name in wanted and project.name not in existing:
+            existing[project.name] = project
+        else:
+            removed.append(project.pk)
+    created, updated = _upsert(
+        Project, existing, wanted, PROJECT_FIELDS,
+        lambda name, values: Project(user=user, name=name, **values),
+    )
+    if removed:
+        Project.objects.filter(pk__in=removed).delete()
+    if created or updated:
+        bump_versions("projects")
+    return SyncResult(created, updated, len(removed))
+
+
+def import_languages(user, profile, data):
+    return sync_languages(profile, data)
+
+
+def _upsert(model, existing, wanted, fields, build):
+    """Create and update ``model`` rows in bulk; returns (created, updated)."""
+    to_create, to_update = [], []
+    for key, values in wanted.items():
+        row = existing.get(key)
+        if row is None:
+            to_create.append(build(key, values))
+        elif any(getattr(row, field) != values[field] for field in fields):
+            for field in fields:
+                setattr(row, field, values[field])
+            to_update.append(row)
+    model.objects.bulk_create(to_create)
+    model.objects.bulk_update(to_update, fields)
+    return len(to_create), len(to_update)
+
+
+SECTIONS = {
+    "profile": import_profile,
+    "skill_categories": import_skill_categories,
+    "certifications": import_certifications,
+    "projects": import_projects,
+    "languages": import_languages,
+}
+
+
+def section_fingerprint(value):
+    """SHA-256 of a section's canonical JSON form."""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def import_resume(user, sections, dry_run=False, skip_unchanged=False):
+    """
+    Import ``(name, value)`` sections for ``user`` in one transaction.
+
+    Returns an ordered mapping of section name to ``SyncResult``. The
+    fingerprint of every imported section is recorded; with
+    ``skip_unchanged`` a section whose fingerprint matches the recorded one
+    is not imported and maps to ``None``. With ``dry_run`` the changes are
+    rolled back once counted.
+    """
+    report = OrderedDict()
+    with transaction.atomic():
+        profile, _ = UserProfile.objects.select_for_update().get_or_create(user=user)
+        recorded = dict(
+            ResumeSectionFingerprint.objects.filter(user=user).values_list("section", "fingerprint")
+        )
+        imported = {}
+        for name, value in sections:
+            importer = SECTIONS.get(name)
+            if importer is None:
+                raise ResumeImportError(f"Unknown section: {name}")
+            if name == "profile":
+                if not isinstance(value, dict):
+                    raise ResumeImportError("The profile section must be an object")
+            elif not isinstance(value, list):
+                raise ResumeImportError(f"The {name} section must be a list")
+            fingerprint = section_fingerprint(value)
+            if skip_unchanged and recorded.get(name) == fingerprint:
+                report[name] = None
+                continue
+            report[name] = importer(user, profile, value)
+            imported[name] = fingerprint
+
+        ResumeSectionFingerprint.objects.bulk_create(
+            [
+                ResumeSectionFingerprint(user=user, section=name, fingerprint=fingerprint)
+                for name, fingerprint in imported.items()
+                if recorded.get(name) != fingerprint
+            ],
+            update_conflicts=True,
+            unique_fields=["user", "section"],
+            update_fields=["fingerprint", "updated_at"],
+        )
+        if dry_run:
+            transaction.set_rollback(True)
+    return report
+
+
+def snapshot(user):
+    """
+    The rows of ``user`` the sections write, as ``{section: {key: fields}}``.
+
+    Keys are the natural keys the sections are upserted by. Taking one
+    before and one after an import gives the row-level changes for
+    ``diff_snapshots``.
+    """
+    profile = UserProfile.objects.filter(user=user).first()
+    rows = {name: {} for name in SECTIONS}
+    if profile is not None:
+        rows["profile"][(user.email,)] = {
+            **{field: getattr(user, field) for field in USER_FIELDS},
+            **{field: getattr(profile, field) for field in PROFILE_FIELDS},
+        }
+        for category in profile.skill_categories.prefetch_related("skills").order_by("pk"):
+            rows["skill_categories"][(category.name,)] = {}
+            for skill in category.skills.all():
+                rows["skill_categories"][(category.name, skill.name)] = {"level": skill.level}
+        for cert in profile.certifications.order_by("pk"):
+            rows["certifications"][(cert.title, cert.issuer)] = {
+                "date": cert.date, "in_progress": cert.in_progress, "type": cert.type, "badge": cert.badge,
+            }
+        for language in profile.languages.order_by("pk"):
+            rows["languages"][(language.name,)] = {"proficiency": language.proficiency}
+    for cert in PublicCertification.objects.filter(user=user).order_by("pk"):
+        rows["certifications"][("public", cert.name, cert.issuer)] = {
+            field: getattr(cert, field) for field in PUBLIC_CERTIFICATION_FIELDS
+        }
+    for project in Project.objects.filter(user=user).order_by("pk"):
+        rows["projects"][(project.name,)] = {field: getattr(project, field) for field in PROJECT_FIELDS}
+    return rows
+
+
+def diff_snapshots(before, after):
+    """
+    Yield ``(section, line)`` for each row that differs between two
+    ``snapshot`` results: ``+ key`` for added rows, ``- key`` for removed
+    ones and ``~ key: field old -> new`` for changed fields.
+    """
+    for name in after:
+        old_rows, new_rows = before.get(name, {}), after[name]
+        for key, fields in new_rows.items():
+            label = " / ".join(str(part) for part in key)
+            if key not in old_rows:
+                values = ", ".join(f"{field}={value!r}" for field, value in fields.items())
+                yield name, f"+ {label}" + (f": {values}" if values else "")
+                continue
+            changes = [
+                f"{field} {old_rows[key].get(field)!r} -> {value!r}"
+                for field, value in fields.items()
+                if old_rows[key].get(field) != value
+            ]
+            if changes:
+                yield name, f"~ {label}: " + ", ".join(changes)
+        for key in old_rows:
+            if key not in new_rows:
+                yield name, "- " + " / ".join(str(part) for part in key)
+
+
+def user_for_profile(data):
+    """Find the user a document's profile describes, creating it if needed."""
+    if not isinstance(data, dict) or not data.get("email"):
+        raise ResumeImportError("The profile section needs an email to identify the user")
+    user, created = User.objects.get_or_create(
+        email=data["email"],
+        defaults={"username": data.get("username") or data["email"]},
+    )
+    if created:
+        user.set_unusable_password()
+        user.save(update_fields=["password"])
+    return user
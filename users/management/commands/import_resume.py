@@ -0,0 +1,81 @@
+from itertools import chain
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from users.importer import diff_snapshots, import_resume, iter_sections, snapshot, user_for_profile
+from users.models import User
+from users.sync import SyncError
+
+
+def write_report(stdout, report):
+    for name, result in report.items():
+        if result is None:
+            stdout.write(f"{name}: unchanged, skipped")
+        else:
+            stdout.write(
+                f"{name}: {result.created} created, {result.updated} updated, {result.removed} removed"
+            )
+
+
+def write_diff(stdout, changes):
+    """Write the ``(section, line)`` pairs of ``diff_snapshots``."""
+    for name, line in changes:
+        stdout.write(f"  {name}: {line}")
+
+
+class Command(BaseCommand):
+    help = "Import a resume document (resume_data.json) into one user's portfolio"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default=str(settings.BASE_DIR / "resume_data.json"),
+            help="JSON document to import (default: resume_data.json in the project root)",
+        )
+        parser.add_argument(
+            "--user",
+            help="Username or email of the user to import into (default: the profile's email, "
+                 "creating the user if needed)",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report the rows that would change without saving anything",
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        changes = []
+        if options["user"]:
+            try:
+                user = User.objects.get(Q(username=options["user"]) | Q(email=options["user"]))
+            except User.DoesNotExist:
+                raise CommandError(f"No user {options['user']!r}")
+
+        try:
+            with open(options["path"], encoding="utf-8") as fp, transaction.atomic():
+                sections = iter_sections(fp)
+                if user is None:
+                    first = next(sections, None)
+                    if first is None or first[0] != "profile":
+                        raise CommandError("Without --user the document must start with its profile")
+                    user = user_for_profile(first[1])
+                    sections = chain([first], sections)
+                before = snapshot(user) if options["dry_run"] else None
+                report = import_resume(user, sections)
+                if options["dry_run"]:
+                    # Read the changes before they are rolled back
+                    changes = list(diff_snapshots(before, snapshot(user)))
+                    transaction.set_rollback(True)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+        except SyncError as exc:
+            raise CommandError(str(exc))
+
+        write_report(self.stdout, report)
+        write_diff(self.stdout, changes)
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"Dry run for {user.username}: nothing was saved"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Imported resume for {user.username}"))
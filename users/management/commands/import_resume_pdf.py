@@ -0,0 +1,94 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from scripts.dump_pdf_text import DEFAULT_CACHE_DIR, iter_pages
+from users.importer import diff_snapshots, import_resume, snapshot, user_for_profile
+from users.management.commands.import_resume import write_diff, write_report
+from users.models import User
+from users.resume_text import parse_resume_text
+from users.sync import SyncError
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract a CV PDF, parse it into resume_data.json sections and import "
+        "the sections that changed since the last import"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CV PDF to import")
+        parser.add_argument(
+            "--user",
+            help="Username or email of the user to import into (default: the email found "
+                 "in the CV, creating the user if needed)",
+        )
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Import every section, even those whose fingerprint is unchanged",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report the rows that would change without saving anything",
+        )
+        parser.add_argument(
+            "--output", help="Also write the parsed document as JSON to this file ('-' for stdout)",
+        )
+        parser.add_argument("--pages", help='Pages to read, 1-based, e.g. "1-2" (default: all)')
+        parser.add_argument("--jobs", type=int, help="Extraction processes (default: one per CPU)")
+        parser.add_argument(
+            "--no-cache", action="store_true", help="Do not use the extracted text cache",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            pages = iter_pages(
+                options["path"], options["pages"], options["jobs"],
+                None if options["no_cache"] else DEFAULT_CACHE_DIR,
+            )
+            text = "\n".join(pages)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+
+        document = parse_resume_text(text)
+        if not document:
+            raise CommandError("No resume sections found in the PDF")
+        if options["output"]:
+            self.write_document(document, options["output"])
+
+        changes = []
+        try:
+            with transaction.atomic():
+                if options["user"]:
+                    try:
+                        user = User.objects.get(Q(username=options["user"]) | Q(email=options["user"]))
+                    except User.DoesNotExist:
+                        raise CommandError(f"No user {options['user']!r}")
+                else:
+                    user = user_for_profile(document.get("profile"))
+                before = snapshot(user) if options["dry_run"] else None
+                report = import_resume(
+                    user, document.items(), skip_unchanged=not options["force"],
+                )
+                if options["dry_run"]:
+                    changes = list(diff_snapshots(before, snapshot(user)))
+                    transaction.set_rollback(True)
+        except SyncError as exc:
+            raise CommandError(str(exc))
+
+        write_report(self.stdout, report)
+        write_diff(self.stdout, changes)
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"Dry run for {user.username}: nothing was saved"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Imported {options['path']} for {user.username}"))
+
+    def write_document(self, document, output):
+        content = json.dumps(document, indent=2, ensure_ascii=False) + "\n"
+        if output == "-":
+            self.stdout.write(content, ending="")
+            return
+        with open(output, "w", encoding="utf-8") as fp:
+            fp.write(content)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from users.webhooks import BATCH_SIZE, process_pending
+
+
+class Command(BaseCommand):
+    help = "Apply pending Clerk webhook events from the inbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=BATCH_SIZE,
+            help=f"Events applied per transaction (default: {BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        handled = process_pending(options["batch_size"])
+        self.stdout.write(f"{handled} event(s) processed")
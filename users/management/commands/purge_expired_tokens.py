@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from users.blacklist import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Delete expired refresh tokens and their blacklist entries, in batches (run periodically)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Tokens deleted per transaction (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_expired(options["batch_size"])
+        self.stdout.write(f"{purged} expired token(s) purged")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_certification_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="profile_image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
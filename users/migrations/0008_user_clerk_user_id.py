@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0007_resumesectionfingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="clerk_synced_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="clerk_user_id",
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+
+def blank_to_null(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    User.objects.filter(email="").update(email=None)
+
+
+def null_to_blank(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    User.objects.filter(email__isnull=True).update(email="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0009_webhookevent"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="email",
+            field=models.EmailField(blank=True, max_length=254, null=True, unique=True),
+        ),
+        migrations.RunPython(blank_to_null, null_to_blank),
+    ]
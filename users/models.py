@@ -3,10 +3,16 @@ from django.db import models
 
 class User(AbstractUser):
     username = models.CharField(max_length=150, unique=True)
-    email = models.EmailField(unique=True)
+    # NULL rather than blank for users without an address (e.g. from Clerk),
+    # which the unique constraint would otherwise limit to one
+    email = models.EmailField(unique=True, null=True, blank=True)
+    # Subject of the user's Clerk session tokens, and the issue time of the
+    # token whose claims were last written back
+    clerk_user_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    clerk_synced_at = models.DateTimeField(null=True, blank=True)
     
     def __str__(self):
-        return self.email
+        return self.email or self.username
 
 class SkillCategory(models.Model):
     name = models.CharField(max_length=100)
@@ -80,6 +86,7 @@ class UserProfile(models.Model):
     linkedin = models.URLField(blank=True)
     twitter = models.URLField(blank=True)
     profile_image = models.ImageField(upload_to='profiles/', blank=True, null=True)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     # Relationships to other models
     skill_categories = models.ManyToManyField(SkillCategory, blank=True)
@@ -87,4 +94,47 @@ class UserProfile(models.Model):
     languages = models.ManyToManyField(Language, blank=True)
     
     def __str__(self):
-        return f"{self.user.email}'s Profile"
\ No newline at end of file
+        return f"{self.user.email}'s Profile"
+
+class ResumeSectionFingerprint(models.Model):
+    """
+    Hash of the last imported content of one resume section for a user.
+
+    Re-imports compare against it to skip the sections that did not change.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resume_fingerprints')
+    section = models.CharField(max_length=50)
+    fingerprint = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'section'], name='users_resume_section_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.section} ({self.fingerprint[:12]})"
+
+
+class WebhookEvent(models.Model):
+    """
+    Inbox of received Clerk webhook events, one row per svix message.
+
+    The endpoint only records events; ``users.webhooks`` applies them in
+    batches. The unique ``svix_id`` makes redeliveries no-ops.
+    """
+    svix_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['processed_at', 'id'], name='users_webhook_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} ({self.svix_id})"
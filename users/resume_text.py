@@ -0,0 +1,246 @@
+"""
+Turn the plain text of a CV into a ``resume_data.json`` style document.
+
+The text is split into sections on headings such as "Skills" or
+"Certifications" and each recognised section is parsed with simple line
+based rules. Only what is found is returned, so sections missing from
+the CV are left alone by the importer rather than emptied.
+"""
+import re
+from collections import OrderedDict
+
+# section -> headings that start it (compared lower-cased, without punctuation)
+HEADINGS = {
+    "summary": ("summary", "profile", "professional summary", "about me", "objective"),
+    "skill_categories": ("skills", "technical skills", "core skills", "skills and tools", "technologies"),
+    "certifications": ("certifications", "certificates", "licenses and certifications", "certifications and training"),
+    "projects": ("projects", "personal projects", "key projects", "selected projects"),
+    "languages": ("languages", "spoken languages"),
+    # Recognised only so that they end the previous section
+    "other": ("experience", "work experience", "professional experience", "education", "references", "interests", "hobbies", "awards"),
+}
+HEADING_SECTIONS = {heading: section for section, headings in HEADINGS.items() for heading in headings}
+
+BULLET = re.compile(r"^\s*(?:[-*•●▪◦‣–]|\d+[.)])\s+")
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE = re.compile(r"\+?\d[\d ()-]{7,}\d")
+URL = re.compile(r"(?:https?://)?(?:www\.)?[\w-]+(?:\.[\w-]+)+(?:/[^\s,|]*)?")
+YEAR_MONTH = re.compile(r"\b((?:19|20)\d{2})(?:[-/.](\d{1,2}))?\b")
+MONTH_YEAR = re.compile(r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+((?:19|20)\d{2})\b", re.I)
+PERCENT = re.compile(r"\(?\s*(\d{1,3})\s*%\s*\)?")
+IN_PROGRESS = re.compile(r"\b(in progress|ongoing|pursuing|expected|present)\b", re.I)
+STATUS_NOTE = re.compile(r"%|\b(in progress|ongoing|completed|wip)\b", re.I)
+SEPARATORS = re.compile(r"\s+[|–—-]\s+|\s*[|–—]\s*")
+
+MONTHS = ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+
+PROFICIENCIES = OrderedDict([
+    ("Native", ("native", "mother tongue", "first language")),
+    ("Fluent", ("fluent", "bilingual", "full professional")),
+    ("Proficient", ("proficient", "professional", "advanced")),
+    ("Intermediate", ("intermediate", "conversational", "working")),
+    ("Basic", ("basic", "beginner", "elementary", "limited")),
+])
+DEFAULT_PROFICIENCY = "Proficient"
+DEFAULT_SKILL_CATEGORY = "Skills"
+
+
+def _heading(line):
+    key = re.sub(r"[^a-z ]", " ", line.lower().replace("&", " and "))
+    key = " ".join(key.split())
+    if len(line) <= 40 and key in HEADING_SECTIONS:
+        return HEADING_SECTIONS[key]
+    return None
+
+
+def _strip_bullet(line):
+    return BULLET.sub("", line).strip()
+
+
+def split_sections(text):
+    """Return the header lines and a mapping of section -> its lines."""
+    header, sections = [], OrderedDict()
+    current = header
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        section = _heading(line.rstrip(":"))
+        if section is not None:
+            current = sections.setdefault(section, [])
+            continue
+        current.append(line)
+    return header, sections
+
+
+def _date(text):
+    match = MONTH_YEAR.search(text)
+    if match:
+        month = MONTHS.index(match.group(1).lower()[:3]) + 1
+        return f"{match.group(2)}-{month:02d}-01"
+    match = YEAR_MONTH.search(text)
+    if match:
+        month = int(match.group(2) or 1)
+        return f"{match.group(1)}-{min(max(month, 1), 12):02d}-01"
+    return ""
+
+
+def parse_profile(header, summary):
+    profile = OrderedDict()
+    text = " ".join(header)
+    if header and not EMAIL.search(header[0]) and not PHONE.search(header[0]):
+        first, _, last = header[0].partition(" ")
+        profile["first_name"], profile["last_name"] = first.title(), last.title()
+    if len(header) > 1 and not EMAIL.search(header[1]) and not URL.search(header[1]):
+        profile["title"] = header[1]
+    email = EMAIL.search(text)
+    if email:
+        profile["email"] = email.group(0)
+    phone = PHONE.search(text)
+    if phone:
+        profile["phone"] = re.sub(r"[ ()-]", "", phone.group(0))
+    for match in URL.finditer(EMAIL.sub("", text)):
+        url = match.group(0)
+        if not url.startswith("http"):
+            url = f"https://{url}"
+        field = "linkedin" if "linkedin.com" in url else "github" if "github.com" in url else "website"
+        profile.setdefault(field, url)
+    if summary:
+        profile["bio"] = " ".join(_strip_bullet(line) for line in summary)
+    return profile
+
+
+def parse_skills(lines):
+    """ "Category: a, b (80%)" lines become categories; loose items go to "Skills"."""
+    categories = OrderedDict()
+    for line in map(_strip_bullet, lines):
+        name, colon, items = line.partition(":")
+        if not colon:
+            name, items = DEFAULT_SKILL_CATEGORY, line
+        skills = categories.setdefault(name.strip(), OrderedDict())
+        for item in re.split(r"[,;•]", items):
+            level = PERCENT.search(item)
+            item = PERCENT.sub("", item).strip()
+            if item:
+                skills[item] = int(level.group(1)) if level else skills.get(item, 0)
+    return [
+        {"name": name, "skills": [{"name": skill, "level": level} for skill, level in skills.items()]}
+        for name, skills in categories.items() if skills
+    ]
+
+
+def _certification_type(text):
+    lowered = text.lower()
+    if re.search(r"\baws\b|amazon web services", lowered):
+        return "aws"
+    if re.search(r"\balx\b", lowered):
+        return "alx"
+    return "other"
+
+
+def parse_certifications(lines):
+    """One certification per line: "Title – Issuer (2024)" or "Title, Issuer, 2024"."""
+    certifications = []
+    for line in map(_strip_bullet, lines):
+        in_progress = bool(IN_PROGRESS.search(line))
+        date = "" if in_progress else _date(line)
+        cleaned = YEAR_MONTH.sub("", MONTH_YEAR.sub("", IN_PROGRESS.sub("", line)))
+        cleaned = re.sub(r"\(\s*\)|\s+", " ", cleaned).strip(" ,()-–—|")
+        parts = [part.strip(" ,()") for part in SEPARATORS.split(cleaned) if part.strip(" ,()")]
+        if len(parts) == 1 and ", " in cleaned:
+            parts = [part.strip() for part in cleaned.rsplit(", ", 1)]
+        if not parts:
+            continue
+        certifications.append({
+            "title": parts[0],
+            "issuer": parts[1] if len(parts) > 1 else "N/A",
+            "date": date,
+            "type": _certification_type(line),
+            "in_progress": in_progress,
+        })
+    return certifications
+
+
+def parse_projects(lines):
+    """
+    A line that is not a bullet starts a project ("Name | Python, Django");
+    the bullets under it form the description.
+    """
+    projects = []
+    for line in lines:
+        is_bullet = bool(BULLET.match(line))
+        text = _strip_bullet(line)
+        label, colon, rest = text.partition(":")
+        if label.lower() in ("technologies", "tech stack", "stack", "tools") and colon and projects:
+            projects[-1]["technologies"] = rest.strip()
+            continue
+        if is_bullet and projects:
+            key = "links" if URL.fullmatch(text) else "description"
+            projects[-1][key].append(text)
+            continue
+        # "(in progress, 70%)" describes the status, not the stack
+        text = re.sub(r"\s*\([^)]*\)", lambda m: "" if STATUS_NOTE.search(m.group(0)) else m.group(0), text)
+        parts = [part.strip() for part in SEPARATORS.split(text) if part.strip()]
+        projects.append({
+            "name": parts[0], "details": parts[1:], "description": [], "links": [], "technologies": "",
+            "note": line,
+        })
+
+    parsed = []
+    for project in projects:
+        text = " ".join([project["note"], *project["description"]])
+        link = URL.search(" ".join(project["links"] + project["details"] + project["description"]))
+        details = [part for part in project["details"] if not URL.fullmatch(part)]
+        in_progress = bool(IN_PROGRESS.search(text))
+        completion = PERCENT.search(text)
+        parsed.append({
+            "name": project["name"],
+            "description": " ".join(project["description"]) or " ".join(details),
+            "technologies": project["technologies"] or ", ".join(details),
+            "status": "in_progress" if in_progress else "completed",
+            "completion": f"{completion.group(1)}%" if completion else ("" if in_progress else "100%"),
+            "type": "web",
+            "link": link.group(0) if link else "",
+        })
+    return parsed
+
+
+def _proficiency(text):
+    lowered = text.lower()
+    for proficiency, words in PROFICIENCIES.items():
+        if any(word in lowered for word in words):
+            return proficiency
+    return None
+
+
+def parse_languages(lines):
+    """ "English (Fluent), Swahili – Native" on one or more lines."""
+    languages = []
+    for line in map(_strip_bullet, lines):
+        for item in re.split(r"[,;•]|\s{2,}", line):
+            name = re.split(r"\s*[(:–—-]\s*", item.strip(), maxsplit=1)[0].strip()
+            if not name:
+                continue
+            languages.append({"name": name, "proficiency": _proficiency(item) or DEFAULT_PROFICIENCY})
+    return languages
+
+
+def parse_resume_text(text):
+    """Parse CV text into an ordered ``resume_data.json`` style document."""
+    header, sections = split_sections(text)
+    document = OrderedDict()
+    profile = parse_profile(header, sections.get("summary"))
+    if profile:
+        document["profile"] = profile
+    parsers = (
+        ("skill_categories", parse_skills),
+        ("certifications", parse_certifications),
+        ("projects", parse_projects),
+        ("languages", parse_languages),
+    )
+    for section, parse in parsers:
+        if sections.get(section):
+            parsed = parse(sections[section])
+            if parsed:
+                document[section] = parsed
+    return document
@@ -1,8 +1,27 @@
 from rest_framework import serializers
+from rest_framework.relations import PKOnlyObject
 from django.contrib.auth import get_user_model
+from portfolio.fields import ImageSrcsetField
 from .models import Certification, Language, Skill, SkillCategory, UserProfile
 
 User = get_user_model()
+
+ID_LIST_FIELDS = ('skill_categories', 'certifications', 'languages')
+
+
+class IdListField(serializers.ManyRelatedField):
+    """
+    Reads the ids from a ``<field>_ids`` annotation (see ``users.aggregates``)
+    when the instance has one, and from the relation otherwise.
+    """
+
+    def get_attribute(self, instance):
+        ids = getattr(instance, f'{self.field_name}_ids', None)
+        if ids is None:
+            return super().get_attribute(instance)
+        return [PKOnlyObject(pk) for pk in ids]
+
+
 class SkillSerializer(serializers.ModelSerializer):
     class Meta:
         model = Skill
@@ -12,6 +31,7 @@ class CertificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Certification
         fields = ['id', 'title', 'issuer', 'date', 'in_progress', 'badge', 'type']
+        ref_name = 'ProfileCertification'
 
 class LanguageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -33,6 +53,7 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'email')
     
     def get_profile_image(self, obj):
+        # Querysets serializing many users should select_related('profile')
         try:
             return obj.profile.profile_image.url if obj.profile.profile_image else None
         except UserProfile.DoesNotExist:
@@ -46,21 +67,19 @@ class UserProfileSerializer(serializers.ModelSerializer):
     
     # Make profile_image read-only when receiving data (only allow updates via upload endpoint)
     profile_image = serializers.ImageField(read_only=True)
+    profile_image_srcset = ImageSrcsetField(source='profile_image_variants')
     
     # ManyToMany fields
-    skill_categories = serializers.PrimaryKeyRelatedField(
-        queryset=SkillCategory.objects.all(), 
-        many=True, 
+    skill_categories = IdListField(
+        child_relation=serializers.PrimaryKeyRelatedField(queryset=SkillCategory.objects.all()),
         required=False
     )
-    certifications = serializers.PrimaryKeyRelatedField(
-        queryset=Certification.objects.all(), 
-        many=True, 
+    certifications = IdListField(
+        child_relation=serializers.PrimaryKeyRelatedField(queryset=Certification.objects.all()),
         required=False
     )
-    languages = serializers.PrimaryKeyRelatedField(
-        queryset=Language.objects.all(), 
-        many=True, 
+    languages = IdListField(
+        child_relation=serializers.PrimaryKeyRelatedField(queryset=Language.objects.all()),
         required=False
     )
     
@@ -69,10 +88,11 @@ class UserProfileSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'username', 'email', 'first_name', 'last_name', 
             'title', 'bio', 'location', 'phone', 'website', 'github', 
-            'linkedin', 'twitter', 'profile_image', 'user', 
+            'linkedin', 'twitter', 'profile_image', 'profile_image_variants',
+            'profile_image_srcset', 'user', 
             'skill_categories', 'certifications', 'languages'
         ]
-        read_only_fields = ('user', 'id', 'profile_image')
+        read_only_fields = ('user', 'id', 'profile_image', 'profile_image_variants')
     
     def update(self, instance, validated_data):
         # Extract user data first
@@ -94,12 +114,12 @@ class UserProfileSerializer(serializers.ModelSerializer):
         instance.save()
         
         # Update ManyToMany relationships if provided
-        if skill_categories is not None:
-            instance.skill_categories.set(skill_categories)
-        if certifications is not None:
-            instance.certifications.set(certifications)
-        if languages is not None:
-            instance.languages.set(languages)
+        relations = zip(ID_LIST_FIELDS, (skill_categories, certifications, languages))
+        for field, related in relations:
+            if related is not None:
+                getattr(instance, field).set(related)
+                # The annotated id list is stale now
+                instance.__dict__.pop(f'{field}_ids', None)
         
         return instance
 # class UserProfileSerializer(serializers.ModelSerializer):
@@ -0,0 +1,308 @@
+"""
+Diff-based replacement of a profile's related lists.
+
+The bulk-update endpoints send the complete list a profile should end up
+with. Instead of clearing the relation and re-adding every row, the sync
+functions load what exists once, work out the difference and apply it
+with bulk queries inside one transaction, so the query count does not
+grow with the list and a failure leaves the profile untouched.
+"""
+from collections import namedtuple
+
+from django.db import transaction
+
+from portfolio.versioning import bump_versions
+
+from .models import Certification, Language, Skill, SkillCategory, UserProfile
+
+SyncResult = namedtuple("SyncResult", "created updated removed")
+
+CERTIFICATION_FIELDS = ("date", "in_progress", "type", "badge")
+
+
+class SyncError(ValueError):
+    pass
+
+
+def _clean_certification(item):
+    if not isinstance(item, dict):
+        raise SyncError("Each certification must be an object")
+    missing = [field for field in ("title", "issuer") if not item.get(field)]
+    if missing:
+        raise SyncError(f"Missing field(s): {', '.join(missing)}")
+    return {
+        "title": item["title"],
+        "issuer": item["issuer"],
+        # Certifications still in progress may have no date yet
+        "date": item.get("date") or "",
+        "in_progress": bool(item.get("inProgress", item.get("in_progress", False))),
+        "type": item.get("type") or "other",
+        "badge": item.get("badge") or "",
+    }
+
+
+def _shared_with_others(through, column, profile, ids):
+    """The ids among ``ids`` that profiles other than ``profile`` link to as well."""
+    if not ids:
+        return set()
+    return set(
+        through.objects.filter(**{f"{column}__in": ids})
+        .exclude(userprofile=profile)
+        .values_list(column, flat=True)
+    )
+
+
+def sync_certifications(profile, items, user=None):
+    """
+    Make ``items`` the certifications of ``profile``.
+
+    Certifications are matched on (title, issuer) among the profile's own
+    certifications; new ones are created for ``user``. A matching row
+    that another profile links to as well, or that another user owns, is
+    never changed: the profile gets a changed copy instead. Rows no longer
+    listed are unlinked from the profile but not deleted. Returns a
+    ``SyncResult`` with the number of rows created and updated and of
+    links removed.
+    """
+    # Validate everything before writing anything; the last duplicate wins
+    wanted = {}
+    for item in items:
+        cleaned = _clean_certification(item)
+        wanted[(cleaned["title"], cleaned["issuer"])] = cleaned
+
+    through = UserProfile.certifications.through
+    with transaction.atomic():
+        # Serialize concurrent syncs of the same profile
+        UserProfile.objects.select_for_update().filter(pk=profile.pk).values_list("pk").get()
+        linked_certifications = list(Certification.objects.filter(userprofile=profile).order_by("pk"))
+        existing = {}
+        for cert in linked_certifications:
+            # Duplicates are collapsed onto the first row
+            existing.setdefault((cert.title, cert.issuer), cert)
+
+        changed = {
+            cert.pk for key, cert in existing.items()
+            if key in wanted and any(getattr(cert, field) != wanted[key][field] for field in CERTIFICATION_FIELDS)
+        }
+        shared = _shared_with_others(through, "certification_id", profile, changed)
+
+        to_create, to_update, keep, copied = [], [], set(), 0
+        for key, values in wanted.items():
+            cert = existing.get(key)
+            if cert is not None and cert.pk not in changed:
+                keep.add(cert.pk)
+            elif cert is not None and cert.pk not in shared and cert.user_id in (None, profile.user_id):
+                for field in CERTIFICATION_FIELDS:
+                    setattr(cert, field, values[field])
+                to_update.append(cert)
+                keep.add(cert.pk)
+            else:
+                copied += cert is not None
+                to_create.append(Certification(user=user, **values))
+
+        Certification.objects.bulk_create(to_create)
+        Certification.objects.bulk_update(to_update, CERTIFICATION_FIELDS)
+
+        keep |= {cert.pk for cert in to_create}
+        linked = {cert.pk for cert in linked_certifications}
+        removed, added = linked - keep, keep - linked
+        if removed:
+            through.objects.filter(userprofile=profile, certification_id__in=removed).delete()
+        through.objects.bulk_create([
+            through(userprofile_id=profile.pk, certification_id=pk) for pk in added
+        ])
+
+    if to_create or to_update or removed or added:
+        bump_versions("profile")
+    # A copy replaces a row: an update, not a creation and a removal
+    return SyncResult(len(to_create) - copied, len(to_update) + copied, len(removed) - copied)
+
+
+def _clean_skill_category(item):
+    if not isinstance(item, dict) or not item.get("category"):
+        raise SyncError("Each skill category needs a category name")
+    skills = item.get("skills")
+    if skills is None:
+        return item["category"], None
+    if not isinstance(skills, list):
+        raise SyncError("Skills must be a list")
+    cleaned = {}
+    for skill in skills:
+        if not isinstance(skill, dict) or not skill.get("name"):
+            raise SyncError("Each skill needs a name")
+        try:
+            level = int(skill.get("level", 0))
+        except (TypeError, ValueError):
+            raise SyncError(f"Invalid level for skill {skill['name']}")
+        cleaned[skill["name"]] = level
+    return item["category"], cleaned
+
+
+def sync_skill_categories(profile, items):
+    """
+    Make ``items`` the skill categories of ``profile``, skills included.
+
+    Each item is ``{"category": name, "skills": [{"name", "level"}]}``.
+    Categories are matched by name among the profile's own categories and
+    created when missing; categories no longer listed are unlinked. Within
+    a category the skills are made to match the list exactly, deleting the
+    ones left out; an item without a ``skills`` key keeps its skills. A
+    category whose skills change while another profile links to it as
+    well is left alone: the profile gets a copy with the listed skills.
+    Returns a ``SyncResult`` counting categories and skills together.
+    """
+    wanted = {}
+    for item in items:
+        name, skills = _clean_skill_category(item)
+        wanted[name] = skills
+
+    through = UserProfile.skill_categories.through
+    with transaction.atomic():
+        UserProfile.objects.select_for_update().filter(pk=profile.pk).values_list("pk").get()
+        linked_categories = list(SkillCategory.objects.filter(userprofile=profile).order_by("pk"))
+        linked = {}
+        for category in linked_categories:
+            linked.setdefault(category.name, category)
+        current_skills = {}
+        for skill in Skill.objects.filter(category__in=linked.values()).order_by("pk"):
+            current_skills.setdefault(skill.category_id, []).append(skill)
+
+        # Work out each listed category's changes before writing any
+        changes = {}
+        for name, skills in wanted.items():
+            if skills is None or name not in linked:
+                continue
+            existing, to_create, to_update, to_delete = {}, [], [], []
+            for skill in current_skills.get(linked[name].pk, []):
+                # Duplicate names are collapsed onto the first row
+                if skill.name in skills and skill.name not in existing:
+                    existing[skill.name] = skill
+                else:
+                    to_delete.append(skill.pk)
+            for skill_name, level in skills.items():
+                skill = existing.get(skill_name)
+                if skill is None:
+                    to_create.append(skill_name)
+                elif skill.level != level:
+                    skill.level = level
+                    to_update.append(skill)
+            if to_create or to_update or to_delete:
+                changes[name] = (to_create, to_update, to_delete)
+        shared = _shared_with_others(
+            through, "skillcategory_id", profile, [linked[name].pk for name in changes]
+        )
+
+        new_categories = [SkillCategory(name=name) for name in wanted if name not in linked]
+        copies = {
+            name: SkillCategory(name=name) for name in changes if linked[name].pk in shared
+        }
+        SkillCategory.objects.bulk_create(new_categories + list(copies.values()))
+
+        skills_to_create, skills_to_update, skills_to_delete = [], [], []
+        created = updated = deleted = 0
+        for category in new_categories:
+            skills = wanted[category.name] or {}
+            skills_to_create += [
+                Skill(name=skill_name, level=level, category=category) for skill_name, level in skills.items()
+            ]
+            created += len(skills)
+        for name, (to_create, to_update, to_delete) in changes.items():
+            # A copy counts as the changes made to the shared category
+            created += len(to_create)
+            updated += len(to_update)
+            deleted += len(to_delete)
+            if name in copies:
+                skills_to_create += [
+                    Skill(name=skill_name, level=level, category=copies[name])
+                    for skill_name, level in wanted[name].items()
+                ]
+                continue
+            skills_to_create += [
+                Skill(name=skill_name, level=wanted[name][skill_name], category=linked[name])
+                for skill_name in to_create
+            ]
+            skills_to_update += to_update
+            skills_to_delete += to_delete
+
+        Skill.objects.bulk_create(skills_to_create)
+        Skill.objects.bulk_update(skills_to_update, ["level"])
+        if skills_to_delete:
+            Skill.objects.filter(pk__in=skills_to_delete).delete()
+
+        # Unlisted categories and duplicate names are unlinked, and copied
+        # ones replaced by their copy
+        unlisted = [
+            category.pk for category in linked_categories
+            if category.name not in wanted or linked[category.name] is not category
+        ]
+        replaced = [linked[name].pk for name in copies]
+        if unlisted or replaced:
+            through.objects.filter(userprofile=profile, skillcategory_id__in=unlisted + replaced).delete()
+        through.objects.bulk_create([
+            through(userprofile_id=profile.pk, skillcategory_id=category.pk)
+            for category in new_categories + list(copies.values())
+        ])
+
+    result = SyncResult(len(new_categories) + created, updated, len(unlisted) + deleted)
+    if any(result):
+        bump_versions("profile")
+    return result
+
+
+def sync_languages(profile, items):
+    """
+    Make ``items`` (``{"name", "proficiency"}``) the languages of ``profile``.
+
+    Languages are matched by name among the profile's own languages; the
+    ones no longer listed are unlinked. A language another profile links
+    to as well is not changed: the profile gets a copy instead.
+    """
+    wanted = {}
+    for item in items:
+        if not isinstance(item, dict) or not item.get("name") or not item.get("proficiency"):
+            raise SyncError("Each language needs a name and a proficiency")
+        wanted[item["name"]] = item["proficiency"]
+
+    through = UserProfile.languages.through
+    with transaction.atomic():
+        UserProfile.objects.select_for_update().filter(pk=profile.pk).values_list("pk").get()
+        linked_languages = list(Language.objects.filter(userprofile=profile).order_by("pk"))
+        linked = {}
+        for language in linked_languages:
+            linked.setdefault(language.name, language)
+
+        changed = {
+            language.pk for name, language in linked.items()
+            if name in wanted and language.proficiency != wanted[name]
+        }
+        shared = _shared_with_others(through, "language_id", profile, changed)
+
+        to_create, to_update, replaced = [], [], []
+        for name, proficiency in wanted.items():
+            language = linked.get(name)
+            if language is not None and language.pk in shared:
+                replaced.append(language.pk)
+                language = None
+            if language is None:
+                to_create.append(Language(name=name, proficiency=proficiency))
+            elif language.pk in changed:
+                language.proficiency = proficiency
+                to_update.append(language)
+
+        Language.objects.bulk_create(to_create)
+        Language.objects.bulk_update(to_update, ["proficiency"])
+        removed = [
+            language.pk for language in linked_languages
+            if language.name not in wanted or linked[language.name] is not language
+        ]
+        if removed or replaced:
+            through.objects.filter(userprofile=profile, language_id__in=removed + replaced).delete()
+        through.objects.bulk_create([
+            through(userprofile_id=profile.pk, language_id=language.pk) for language in to_create
+        ])
+
+    # A copy replaces a row: an update, not a creation and a removal
+    result = SyncResult(len(to_create) - len(replaced), len(to_update) + len(replaced), len(removed))
+    if any(result):
+        bump_versions("profile")
+    return result
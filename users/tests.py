@@ -1,3 +1,983 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from jwt.algorithms import RSAAlgorithm
+from PIL import Image
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from svix.webhooks import Webhook
+
+from certifications.models import Certification as PublicCertification
+from portfolio.throttling import get_backend
+from portfolio.versioning import KEY_TEMPLATE
+from projects.models import Project
+
+from . import authentication, tokens
+from .blacklist import BloomFilter, blacklist_filter
+from .importer import iter_sections
+from .models import Certification, Language, Skill, SkillCategory, User, UserProfile, WebhookEvent
+from .resume_text import parse_resume_text
+from .uploads import MAX_IMAGE_SIZE
+
+MEDIA_ROOT = tempfile.mkdtemp()
+UPLOAD_URL = "/api/auth/profile/upload-image/"
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def png_chunk(kind, data):
+    body = kind + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+
+def png_header(width, height):
+    """A PNG that claims the given size but carries almost no pixel data."""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + png_chunk(b"IHDR", ihdr)
+        + png_chunk(b"IDAT", zlib.compress(b"\x00" * 64))
+        + png_chunk(b"IEND", b"")
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_VARIANTS_ASYNC=False)
+class ProfileImageUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="owner", email="owner@example.com")
+        UserProfile.objects.create(user=cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        shutil.rmtree(os.path.join(MEDIA_ROOT, "profiles"), ignore_errors=True)
+
+    def stored_files(self):
+        directory = os.path.join(MEDIA_ROOT, "profiles")
+        if not os.path.isdir(directory):
+            return set()
+        return {name for name in os.listdir(directory) if name != "variants"}
+
+    def post(self, name, content, content_type="image/jpeg"):
+        upload = SimpleUploadedFile(name, content, content_type=content_type)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(UPLOAD_URL, {"profile_image": upload}, format="multipart")
+
+    def jpeg(self, size=(64, 48)):
+        buffer = BytesIO()
+        Image.new("RGB", size, (10, 120, 200)).save(buffer, "JPEG")
+        return buffer.getvalue()
+
+    def assertRejected(self, response, message):
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": message})
+        self.assertEqual(self.stored_files(), set())
+        self.assertFalse(UserProfile.objects.get(user=self.user).profile_image)
+
+    def test_valid_image_is_stored(self):
+        response = self.post("me.jpg", self.jpeg(), content_type="application/octet-stream")
+        self.assertEqual(response.status_code, 200)
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(self.stored_files(), {os.path.basename(profile.profile_image.name)})
+        with Image.open(profile.profile_image.path) as image:
+            self.assertEqual(image.size, (64, 48))
+
+    def test_replacing_image_deletes_old_file(self):
+        self.post("me.jpg", self.jpeg())
+        self.post("me.jpg", self.jpeg((32, 32)))
+        profile = UserProfile.objects.get(user=self.user)
+        self.assertEqual(self.stored_files(), {os.path.basename(profile.profile_image.name)})
+
+    def test_old_file_is_kept_until_commit(self):
+        self.post("me.jpg", self.jpeg())
+        old = UserProfile.objects.get(user=self.user).profile_image.name
+        upload = SimpleUploadedFile("me.jpg", self.jpeg((32, 32)), content_type="image/jpeg")
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(UPLOAD_URL, {"profile_image": upload}, format="multipart")
+        self.assertIn(os.path.basename(old), self.stored_files())
+        for callback in callbacks:
+            callback()
+        self.assertNotIn(os.path.basename(old), self.stored_files())
+
+    def test_failed_save_deletes_new_file(self):
+        self.post("me.jpg", self.jpeg())
+        before = self.stored_files()
+        upload = SimpleUploadedFile("me.jpg", self.jpeg((32, 32)), content_type="image/jpeg")
+        with mock.patch.object(UserProfile, "save", side_effect=RuntimeError("database is down")):
+            with self.assertRaises(RuntimeError), self.captureOnCommitCallbacks(execute=True):
+                self.client.post(UPLOAD_URL, {"profile_image": upload}, format="multipart")
+        self.assertEqual(self.stored_files(), before)
+
+    def test_rejects_wrong_magic_bytes(self):
+        # The declared content type is not trusted
+        response = self.post("me.jpg", b"<html>" + b"x" * 100, content_type="image/jpeg")
+        self.assertRejected(response, "Invalid file type.")
+
+    def test_rejects_truncated_image(self):
+        response = self.post("me.jpg", self.jpeg()[:20])
+        self.assertRejected(response, "Invalid image file.")
+
+    def test_rejects_decompression_bomb(self):
+        response = self.post("bomb.png", png_header(50_000, 50_000), "image/png")
+        self.assertRejected(response, "Image dimensions too large.")
+
+    def test_rejects_oversized_file(self):
+        content = self.jpeg() + b"\x00" * MAX_IMAGE_SIZE
+        response = self.post("big.jpg", content)
+        self.assertRejected(response, "File too large.")
+
+    def test_rejects_oversized_body_before_reading(self):
+        response = self.client.post(
+            UPLOAD_URL, b"", content_type="multipart/form-data; boundary=x",
+            CONTENT_LENGTH=str(MAX_IMAGE_SIZE * 2),
+        )
+        self.assertRejected(response, "File too large.")
+
+    def test_missing_file(self):
+        response = self.client.post(UPLOAD_URL, {}, format="multipart")
+        self.assertRejected(response, "No image file provided")
+
+
+class CertificationSyncTests(TestCase):
+    url = "/api/auth/profile/certifications/bulk-update/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="owner", email="owner@example.com")
+        cls.profile = UserProfile.objects.create(user=cls.user)
+        cls.old = Certification.objects.create(title="Old", issuer="ALX", date="2020")
+        cls.profile.certifications.add(cls.old)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, items):
+        return self.client.post(self.url, items, format="json")
+
+    def test_diff_is_applied(self):
+        items = [
+            {"title": "Old", "issuer": "ALX", "date": "2021", "inProgress": True},
+            {"title": "New", "issuer": "AWS", "date": "2024", "type": "aws"},
+        ]
+        response = self.sync(items)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.data["created"], response.data["updated"], response.data["removed"]), (1, 1, 0)
+        )
+        self.old.refresh_from_db()
+        self.assertEqual((self.old.date, self.old.in_progress), ("2021", True))
+        self.assertEqual(
+            set(self.profile.certifications.values_list("title", flat=True)), {"Old", "New"}
+        )
+
+        # Resending the same list changes nothing
+        response = self.sync(items)
+        self.assertEqual(
+            (response.data["created"], response.data["updated"], response.data["removed"]), (0, 0, 0)
+        )
+
+    def test_dropped_rows_are_unlinked_not_deleted(self):
+        response = self.sync([{"title": "New", "issuer": "AWS", "date": "2024"}])
+        self.assertEqual(response.data["removed"], 1)
+        self.assertFalse(self.profile.certifications.filter(pk=self.old.pk).exists())
+        self.assertTrue(Certification.objects.filter(pk=self.old.pk).exists())
+
+    def test_other_users_rows_are_not_matched(self):
+        other = User.objects.create_user(username="other", email="other@example.com")
+        theirs = Certification.objects.create(title="New", issuer="AWS", date="2020", user=other)
+        UserProfile.objects.create(user=other).certifications.add(theirs)
+
+        response = self.sync([{"title": "New", "issuer": "AWS", "date": "2024-01-01", "badge": "x"}])
+        self.assertEqual(response.data["created"], 1)
+        theirs.refresh_from_db()
+        self.assertEqual((theirs.date, theirs.badge, theirs.user_id), ("2020", "", other.pk))
+        mine = self.profile.certifications.get(title="New")
+        self.assertNotEqual(mine.pk, theirs.pk)
+        self.assertEqual((mine.date, mine.user_id), ("2024-01-01", self.user.pk))
+
+    def test_shared_row_is_copied_before_changing(self):
+        other_user = User.objects.create_user(username="other", email="other@example.com")
+        other = UserProfile.objects.create(user=other_user)
+        other.certifications.add(self.old)
+
+        response = self.sync([{"title": "Old", "issuer": "ALX", "date": "2021"}])
+        self.assertEqual(
+            (response.data["created"], response.data["updated"], response.data["removed"]), (0, 1, 0)
+        )
+        self.old.refresh_from_db()
+        self.assertEqual(self.old.date, "2020")
+        self.assertEqual(list(other.certifications.all()), [self.old])
+        self.assertEqual(self.profile.certifications.get().date, "2021")
+
+    def test_invalid_item_leaves_profile_untouched(self):
+        response = self.sync([
+            {"title": "New", "issuer": "AWS", "date": "2024"},
+            {"title": "Broken", "date": "2024"},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(self.profile.certifications.all()), [self.old])
+        self.assertFalse(Certification.objects.filter(title="New").exists())
+
+
+class SkillCategorySyncTests(TestCase):
+    url = "/api/auth/profile/skill-categories/bulk-update/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="owner", email="owner@example.com")
+        cls.profile = UserProfile.objects.create(user=cls.user)
+        cls.backend = SkillCategory.objects.create(name="Backend")
+        Skill.objects.create(name="Django", level=70, category=cls.backend)
+        Skill.objects.create(name="Flask", level=40, category=cls.backend)
+        cls.profile.skill_categories.add(cls.backend)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, items):
+        return self.client.post(self.url, items, format="json")
+
+    def skills(self, category):
+        return dict(category.skills.values_list("name", "level"))
+
+    def test_tree_is_replaced(self):
+        response = self.sync([
+            {"category": "Backend", "skills": [{"name": "Django", "level": 90}, {"name": "DRF", "level": 80}]},
+            {"category": "Frontend", "skills": [{"name": "React", "level": 60}]},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.data["created"], response.data["updated"], response.data["removed"]), (3, 1, 1)
+        )
+        # Flask was left out of the list, so it is deleted
+        self.assertEqual(self.skills(self.backend), {"Django": 90, "DRF": 80})
+        frontend = self.profile.skill_categories.get(name="Frontend")
+        self.assertEqual(self.skills(frontend), {"React": 60})
+
+    def test_category_without_skills_key_keeps_skills(self):
+        response = self.sync([{"category": "Backend"}])
+        self.assertEqual(response.data["removed"], 0)
+        self.assertEqual(self.skills(self.backend), {"Django": 70, "Flask": 40})
+
+    def test_unlisted_category_is_unlinked(self):
+        response = self.sync([])
+        self.assertEqual(response.data["removed"], 1)
+        self.assertFalse(self.profile.skill_categories.exists())
+        self.assertTrue(SkillCategory.objects.filter(pk=self.backend.pk).exists())
+
+    def test_invalid_skill_leaves_tree_untouched(self):
+        response = self.sync([
+            {"category": "Frontend", "skills": [{"name": "React", "level": 60}]},
+            {"category": "Backend", "skills": [{"name": "Django", "level": "high"}]},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(self.profile.skill_categories.all()), [self.backend])
+        self.assertEqual(self.skills(self.backend), {"Django": 70, "Flask": 40})
+
+    def test_shared_category_is_copied_before_changing(self):
+        other_user = User.objects.create_user(username="other", email="other@example.com")
+        other = UserProfile.objects.create(user=other_user)
+        other.skill_categories.add(self.backend)
+
+        response = self.sync([{"category": "Backend", "skills": [{"name": "Django", "level": 90}]}])
+        self.assertEqual(
+            (response.data["created"], response.data["updated"], response.data["removed"]), (0, 1, 1)
+        )
+        self.assertEqual(self.skills(self.backend), {"Django": 70, "Flask": 40})
+        self.assertEqual(list(other.skill_categories.all()), [self.backend])
+        mine = self.profile.skill_categories.get()
+        self.assertNotEqual(mine.pk, self.backend.pk)
+        self.assertEqual(self.skills(mine), {"Django": 90})
+
+    def test_shared_category_is_kept_while_unchanged(self):
+        other_user = User.objects.create_user(username="other", email="other@example.com")
+        UserProfile.objects.create(user=other_user).skill_categories.add(self.backend)
+        self.sync([{"category": "Backend"}])
+        self.assertEqual(list(self.profile.skill_categories.all()), [self.backend])
+
+
+class LanguageSyncTests(TestCase):
+    url = "/api/auth/profile/languages/bulk-update/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="owner", email="owner@example.com")
+        cls.profile = UserProfile.objects.create(user=cls.user)
+        cls.english = Language.objects.create(name="English", proficiency="Fluent")
+        cls.profile.languages.add(cls.english)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, items):
+        return self.client.post(self.url, items, format="json")
+
+    def languages(self, profile):
+        return dict(profile.languages.values_list("name", "proficiency"))
+
+    def test_diff_is_applied(self):
+        response = self.sync([
+            {"name": "English", "proficiency": "Native"},
+            {"name": "Swahili", "proficiency": "Native"},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.data["created"], response.data["updated"], response.data["removed"]), (1, 1, 0)
+        )
+        self.english.refresh_from_db()
+        self.assertEqual(self.english.proficiency, "Native")
+        self.assertEqual(self.languages(self.profile), {"English": "Native", "Swahili": "Native"})
+
+    def test_shared_language_is_copied_before_changing(self):
+        other_user = User.objects.create_user(username="other", email="other@example.com")
+        other = UserProfile.objects.create(user=other_user)
+        other.languages.add(self.english)
+
+        response = self.sync([{"name": "English", "proficiency": "Basic"}])
+        self.assertEqual(
+            (response.data["created"], response.data["updated"], response.data["removed"]), (0, 1, 0)
+        )
+        self.assertEqual(self.languages(other), {"English": "Fluent"})
+        self.assertEqual(self.languages(self.profile), {"English": "Basic"})
+
+    def test_invalid_item_leaves_profile_untouched(self):
+        response = self.sync([{"name": "Swahili", "proficiency": "Native"}, {"name": "French"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.languages(self.profile), {"English": "Fluent"})
+
+
+class ImportResumeTests(TestCase):
+    path = str(settings.BASE_DIR / "resume_data.json")
+
+    def run_import(self, *args):
+        out = StringIO()
+        call_command("import_resume", self.path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_sections_are_streamed(self):
+        with open(self.path, encoding="utf-8") as fp:
+            expected = json.load(fp)
+        with open(self.path, encoding="utf-8") as fp:
+            self.assertEqual(dict(iter_sections(fp, read_size=7)), expected)
+
+    def test_import_is_idempotent(self):
+        self.run_import()
+        user = User.objects.get(email="khalfan@khalfanathman.dev")
+        profile = user.profile
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(profile.skill_categories.count(), 5)
+        self.assertEqual(profile.languages.count(), 3)
+        self.assertEqual(user.projects.count(), 4)
+        self.assertEqual(profile.certifications.count(), 6)
+        # Undated certifications still in progress are not public
+        self.assertEqual(user.certifications.count(), 4)
+
+        output = self.run_import("--user", "khalfan")
+        self.assertEqual(output.count("0 created, 0 updated, 0 removed"), 5)
+
+    def test_dry_run_saves_nothing(self):
+        output = self.run_import("--dry-run")
+        self.assertIn("skill_categories: 20 created", output)
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(SkillCategory.objects.exists())
+
+    def test_dry_run_prints_row_changes(self):
+        self.run_import()
+        user = User.objects.get(email="khalfan@khalfanathman.dev")
+        user.profile.languages.filter(name="English").update(proficiency="Basic")
+        Project.objects.create(user=user, name="Scratch")
+
+        output = self.run_import("--dry-run")
+        self.assertIn("languages: ~ English: proficiency 'Basic' -> ", output)
+        self.assertIn("projects: - Scratch", output)
+        self.assertEqual(user.projects.filter(name="Scratch").count(), 1)
+
+    def test_dry_run_lists_added_rows(self):
+        output = self.run_import("--dry-run")
+        self.assertIn("skill_categories: + Programming Languages / Python: level=90", output)
+
+    def test_partial_dates_are_accepted(self):
+        with open(self.path, encoding="utf-8") as fp:
+            data = json.load(fp)
+        data["certifications"][0]["date"] = "2024"
+        data["certifications"][1]["date"] = "2022-03"
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "resume.json")
+        with open(self.path, "w", encoding="utf-8") as fp:
+            json.dump(data, fp)
+
+        self.run_import()
+        dates = dict(PublicCertification.objects.values_list("issuer", "date"))
+        self.assertEqual(dates["ALX AFRICA"], date(2024, 1, 1))
+        self.assertEqual(dates["Oracle"], date(2022, 3, 1))
+
+    def test_dry_run_keeps_version_stamps(self):
+        # Stamps only move once the import commits, never on a rolled-back dry run
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.run_import("--dry-run")
+        self.assertEqual(callbacks, [])
+        for label in ("profile", "projects", "certifications"):
+            self.assertIsNone(cache.get(KEY_TEMPLATE.format(label)))
+
+    def test_other_users_are_untouched(self):
+        other = User.objects.create_user(username="other", email="other@example.com")
+        profile = UserProfile.objects.create(user=other)
+        category = SkillCategory.objects.create(name="Cloud")
+        Skill.objects.create(name="AWS", level=10, category=category)
+        profile.skill_categories.add(category)
+
+        self.run_import()
+        self.assertEqual(list(profile.skill_categories.all()), [category])
+        self.assertEqual(dict(category.skills.values_list("name", "level")), {"AWS": 10})
+
+    def test_other_users_certifications_are_untouched(self):
+        with open(self.path, encoding="utf-8") as fp:
+            listed = json.load(fp)["certifications"][0]
+        other = User.objects.create_user(username="other", email="other@example.com")
+        profile = UserProfile.objects.create(user=other)
+        cert = Certification.objects.create(
+            title=listed["title"], issuer=listed["issuer"], date="2001-01-01", badge="mine", user=other,
+        )
+        profile.certifications.add(cert)
+
+        self.run_import()
+        cert.refresh_from_db()
+        self.assertEqual((cert.date, cert.badge, cert.user_id), ("2001-01-01", "mine", other.pk))
+        self.assertEqual(list(cert.userprofile_set.all()), [profile])
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            self.run_import("--user", "nobody")
+
+
+def text_pdf(lines):
+    """A one-page PDF showing ``lines`` in Helvetica."""
+    escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+    stream = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+    ]
+    pdf = "%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return pdf.encode("latin-1")
+
+
+CV_LINES = [
+    "Jane Doe",
+    "Backend Engineer",
+    "jane@example.com | +254 700 000 000 | github.com/janedoe",
+    "Skills",
+    "Languages: Python (90%), Go (60%)",
+    "Certifications",
+    "- AWS Cloud Practitioner - AWS (Jan 2023)",
+    "- Data Science (in progress)",
+    "Projects",
+    "Portfolio API | Django, PostgreSQL",
+    "- REST backend for a personal site.",
+    "Languages",
+    "English (Fluent), Swahili (Native)",
+]
+
+
+class ResumePdfImportTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def run_import(self, lines, *args):
+        path = os.path.join(self.directory, "cv.pdf")
+        with open(path, "wb") as fp:
+            fp.write(text_pdf(lines))
+        out = StringIO()
+        call_command("import_resume_pdf", path, "--jobs", "1", "--no-cache", *args, stdout=out)
+        return out.getvalue()
+
+    def test_parse_sections(self):
+        document = parse_resume_text("\n".join(CV_LINES))
+        self.assertEqual(document["profile"]["email"], "jane@example.com")
+        self.assertEqual(document["profile"]["github"], "https://github.com/janedoe")
+        self.assertEqual(
+            document["skill_categories"],
+            [{"name": "Languages", "skills": [{"name": "Python", "level": 90}, {"name": "Go", "level": 60}]}],
+        )
+        self.assertEqual(
+            [(cert["title"], cert["issuer"], cert["date"], cert["in_progress"]) for cert in document["certifications"]],
+            [("AWS Cloud Practitioner", "AWS", "2023-01-01", False), ("Data Science", "N/A", "", True)],
+        )
+        self.assertEqual(document["projects"][0]["technologies"], "Django, PostgreSQL")
+        self.assertEqual(
+            document["languages"],
+            [{"name": "English", "proficiency": "Fluent"}, {"name": "Swahili", "proficiency": "Native"}],
+        )
+
+    def test_only_changed_sections_are_reimported(self):
+        self.run_import(CV_LINES)
+        user = User.objects.get(email="jane@example.com")
+        self.assertEqual(user.projects.get().name, "Portfolio API")
+        self.assertEqual(user.resume_fingerprints.count(), 5)
+
+        revised = CV_LINES[:-1] + ["English (Fluent), Swahili (Native), Arabic (Basic)"]
+        output = self.run_import(revised)
+        self.assertEqual(output.count("unchanged, skipped"), 4)
+        self.assertIn("languages: 1 created, 0 updated, 0 removed", output)
+        self.assertEqual(user.profile.languages.count(), 3)
+
+        output = self.run_import(revised, "--force")
+        self.assertEqual(output.count("0 created, 0 updated, 0 removed"), 5)
+
+
+class JWKSServer:
+    """A local stand-in for Clerk's JWKS endpoint that counts fetches."""
+
+    def __init__(self):
+        self.keys = {}
+        self.hits = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits += 1
+                body = json.dumps({"keys": list(server.keys.values())}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/.well-known/jwks.json"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def add_key(self, kid):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+        self.keys[kid] = {**jwk, "kid": kid, "use": "sig", "alg": "RS256"}
+        return private_key
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class ClerkServerMixin:
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = JWKSServer()
+        cls.private_key = cls.server.add_key("key-1")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.settings_override = override_settings(
+            CLERK_JWKS_URL=self.server.url, CLERK_PUBLISHABLE_KEY=None, CLERK_JWKS_TTL=3600,
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        authentication._stores.clear()
+        authentication.verified_tokens.clear()
+        authentication.clerk_users.clear()
+        self.server.hits = 0
+
+    def token(self, sub="user_1", kid="key-1", private_key=None, lifetime=300, **claims):
+        claims = {"sub": sub, "exp": int(time.time()) + lifetime, **claims}
+        return jwt.encode(claims, private_key or self.private_key, algorithm="RS256", headers={"kid": kid})
+
+
+class ClerkTokenVerificationTests(ClerkServerMixin, SimpleTestCase):
+
+    def test_keys_are_fetched_once_per_process(self):
+        for sub in ("user_1", "user_2", "user_3"):
+            self.assertEqual(authentication.verify_clerk_token(self.token(sub))["sub"], sub)
+        self.assertEqual(self.server.hits, 1)
+
+    def test_repeat_token_skips_verification(self):
+        token = self.token()
+        authentication.verify_clerk_token(token)
+        with mock.patch.object(authentication.jwt, "decode", wraps=jwt.decode) as decode:
+            self.assertEqual(authentication.verify_clerk_token(token)["sub"], "user_1")
+        decode.assert_not_called()
+
+    def test_expired_token_is_rejected(self):
+        with self.assertRaises(jwt.ExpiredSignatureError):
+            authentication.verify_clerk_token(self.token(lifetime=-10))
+
+    def test_cached_token_expires(self):
+        token = self.token(lifetime=1)
+        authentication.verify_clerk_token(token)
+        with mock.patch.object(authentication.time, "time", return_value=time.time() + 5):
+            self.assertIsNone(authentication.verified_tokens.get(authentication.token_key(token)))
+
+    def test_unknown_kid_refetches_rotated_keys(self):
+        authentication.verify_clerk_token(self.token())
+        rotated = self.server.add_key("key-2")
+        self.addCleanup(self.server.keys.pop, "key-2")
+        with mock.patch.object(authentication, "JWKS_MIN_REFRESH_INTERVAL", 0):
+            claims = authentication.verify_clerk_token(self.token(kid="key-2", private_key=rotated))
+        self.assertEqual(claims["sub"], "user_1")
+        self.assertEqual(self.server.hits, 2)
+
+    def test_unknown_kid_refetch_is_rate_limited(self):
+        authentication.verify_clerk_token(self.token())
+        with self.assertRaises(jwt.InvalidTokenError):
+            authentication.verify_clerk_token(self.token(kid="missing"))
+        self.assertEqual(self.server.hits, 1)
+
+    def test_keys_refresh_in_background_before_expiry(self):
+        authentication.verify_clerk_token(self.token("user_1"))
+        store = authentication.get_jwks_store()
+        store.fetched_at -= 3600 * 0.9
+        with mock.patch.object(authentication.threading, "Thread") as thread:
+            authentication.verify_clerk_token(self.token("user_2"))
+        thread.assert_called_once()
+        # The request itself did not wait for a fetch
+        self.assertEqual(self.server.hits, 1)
+        thread.call_args.kwargs["target"]()
+        self.assertEqual(self.server.hits, 2)
+        self.assertFalse(store.refreshing)
+
+
+class ClerkUserTests(ClerkServerMixin, TestCase):
+    def authenticate(self, **claims):
+        return authentication.clerk_backend.authenticate(None, token=self.token(**claims))
+
+    def test_user_is_created_then_served_from_memory(self):
+        now = int(time.time()) - 100
+        user = self.authenticate(email="jane@example.com", iat=now)
+        self.assertEqual(User.objects.get(clerk_user_id="user_1"), user)
+        with self.assertNumQueries(0):
+            cached = self.authenticate(email="jane@example.com", iat=now + 1)
+        self.assertEqual((cached.pk, cached.email), (user.pk, "jane@example.com"))
+        self.assertIsNot(cached, user)
+
+    def test_email_written_back_only_from_newer_tokens(self):
+        now = int(time.time()) - 100
+        self.authenticate(email="jane@example.com", iat=now)
+        with self.assertNumQueries(1):
+            user = self.authenticate(email="jane@new.example.com", iat=now + 10)
+        self.assertEqual(User.objects.get(pk=user.pk).email, "jane@new.example.com")
+
+        # A token issued before the last sync cannot revert the email
+        with self.assertNumQueries(0):
+            user = self.authenticate(email="jane@example.com", iat=now + 5)
+        self.assertEqual(user.email, "jane@new.example.com")
+
+    def test_cached_user_expires_and_saves_invalidate(self):
+        user = self.authenticate(email="jane@example.com")
+        User.objects.filter(pk=user.pk).update(first_name="Jane")
+        with mock.patch.object(authentication.time, "time", return_value=time.time() + 3600):
+            self.assertEqual(self.authenticate(email="jane@example.com").first_name, "Jane")
+
+        user.last_name = "Doe"
+        user.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate(email="jane@example.com").last_name, "Doe")
+
+
+WEBHOOK_URL = "/api/auth/webhooks/clerk/"
+WEBHOOK_SECRET = "whsec_" + base64.b64encode(b"portfolio-webhook-test-secret!!!").decode()
+
+
+def clerk_event(kind, clerk_user_id, timestamp, email=None, verification="verified", **data):
+    data["id"] = clerk_user_id
+    if email:
+        data["email_addresses"] = [
+            {"id": "idn_1", "email_address": email, "verification": {"status": verification}},
+        ]
+        data["primary_email_address_id"] = "idn_1"
+    return {"type": kind, "timestamp": timestamp, "data": data}
+
+
+@override_settings(CLERK_WEBHOOK_SECRET=WEBHOOK_SECRET, CLERK_WEBHOOKS_ASYNC=False)
+class ClerkWebhookTests(TestCase):
+    def send(self, msg_id, event, secret=WEBHOOK_SECRET):
+        body = json.dumps(event)
+        now = datetime.now(tz=dt_timezone.utc)
+        signature = Webhook(secret).sign(msg_id, now, body)
+        return self.client.post(
+            WEBHOOK_URL, body, content_type="application/json",
+            HTTP_SVIX_ID=msg_id, HTTP_SVIX_TIMESTAMP=str(int(now.timestamp())),
+            HTTP_SVIX_SIGNATURE=signature,
+        )
+
+    def test_invalid_signature_is_rejected(self):
+        other = "whsec_" + base64.b64encode(b"some-other-secret-of-32-bytes!!!").decode()
+        event = clerk_event("user.created", "user_1", 1, "jane@example.com")
+        response = self.send("msg_1", event, secret=other)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_created_event_creates_user(self):
+        event = clerk_event("user.created", "user_1", 1, "jane@example.com", first_name="Jane")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.send("msg_1", event)
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(clerk_user_id="user_1")
+        self.assertEqual((user.username, user.email, user.first_name), ("jane@example.com", "jane@example.com", "Jane"))
+        self.assertFalse(user.has_usable_password())
+        self.assertIsNotNone(WebhookEvent.objects.get(svix_id="msg_1").processed_at)
+
+    def test_redelivery_is_ignored(self):
+        event = clerk_event("user.created", "user_1", 1, "jane@example.com")
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.send("msg_1", event).status_code, 200)
+        self.assertEqual(WebhookEvent.objects.count(), 1)
+        self.assertEqual(User.objects.filter(clerk_user_id="user_1").count(), 1)
+
+    def test_burst_is_coalesced_into_latest_state(self):
+        # Recorded without processing, then applied as one batch
+        with mock.patch("users.views.schedule_processing"):
+            self.send("msg_1", clerk_event("user.created", "user_1", 1, "jane@example.com"))
+            self.send("msg_3", clerk_event("user.updated", "user_1", 3, "jane@new.example.com", last_name="Doe"))
+            self.send("msg_2", clerk_event("user.updated", "user_1", 2, "jane@old.example.com"))
+        # One batch with a single insert, then an empty batch
+        with self.assertNumQueries(13):
+            self.assertEqual(call_command_output("process_webhook_events"), "3 event(s) processed")
+        user = User.objects.get(clerk_user_id="user_1")
+        self.assertEqual((user.email, user.last_name), ("jane@new.example.com", "Doe"))
+        self.assertFalse(WebhookEvent.objects.filter(processed_at__isnull=True).exists())
+
+    def test_existing_user_is_linked_by_email(self):
+        user = User.objects.create_user("jane", "jane@example.com", "pw")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send("msg_1", clerk_event("user.updated", "user_1", 1, "jane@example.com", first_name="Jane"))
+        user.refresh_from_db()
+        self.assertEqual((user.clerk_user_id, user.first_name), ("user_1", "Jane"))
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_unverified_address_is_not_linked(self):
+        user = User.objects.create_user("jane", "jane@example.com", "pw")
+        event = clerk_event("user.created", "user_1", 1, "jane@example.com", verification="unverified")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send("msg_1", event)
+        user.refresh_from_db()
+        self.assertIsNone(user.clerk_user_id)
+        # The new user does not get the address another account has
+        self.assertIsNone(User.objects.get(clerk_user_id="user_1").email)
+        self.assertFalse(WebhookEvent.objects.exclude(error="").exists())
+
+    def test_staff_account_is_not_linked(self):
+        for index, flags in enumerate(({"is_staff": True}, {"is_superuser": True})):
+            with self.subTest(**flags):
+                email = f"owner{index}@example.com"
+                user = User.objects.create_user(f"owner{index}", email, "pw", **flags)
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.send(f"msg_{index}", clerk_event("user.created", f"user_{index}", 1, email))
+                user.refresh_from_db()
+                self.assertIsNone(user.clerk_user_id)
+                self.assertNotEqual(User.objects.get(clerk_user_id=f"user_{index}").pk, user.pk)
+
+    def test_secondary_address_is_not_used(self):
+        event = clerk_event("user.created", "user_1", 1)
+        event["data"]["email_addresses"] = [
+            {"id": "idn_2", "email_address": "jane@example.com", "verification": {"status": "verified"}},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send("msg_1", event)
+        self.assertIsNone(User.objects.get(clerk_user_id="user_1").email)
+
+    def test_users_without_email(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send("msg_1", clerk_event("user.created", "user_1", 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send("msg_2", clerk_event("user.created", "user_2", 2))
+        users = User.objects.filter(clerk_user_id__in=["user_1", "user_2"]).order_by("clerk_user_id")
+        self.assertEqual([(user.username, user.email) for user in users], [("user_1", None), ("user_2", None)])
+        self.assertFalse(WebhookEvent.objects.exclude(error="").exists())
+
+    def test_deleted_event_removes_user(self):
+        User.objects.create_user("jane", "jane@example.com", clerk_user_id="user_1")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.send("msg_1", clerk_event("user.deleted", "user_1", 1, deleted=True))
+        self.assertFalse(User.objects.filter(clerk_user_id="user_1").exists())
+
+
+def call_command_output(*args, **options):
+    stdout = StringIO()
+    call_command(*args, stdout=stdout, **options)
+    return stdout.getvalue().strip()
+
+
+class StatelessJWTTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_backend().reset()
+        self.user = User.objects.create_user("jane", "jane@example.com", "pw", first_name="Jane")
+
+    def login(self):
+        response = self.client.post("/api/auth/login/", {"username": "jane", "password": "pw"})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def authenticate(self, access):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        return authentication.StatelessJWTAuthentication().authenticate(request)[0]
+
+    def test_user_is_built_from_claims(self):
+        access = self.login()["access"]
+        self.assertEqual(AccessToken(access)["email"], "jane@example.com")
+        with self.assertNumQueries(0):
+            user = self.authenticate(access)
+            self.assertEqual((user.pk, user.username, user.email, user.is_staff), (self.user.pk, "jane", "jane@example.com", False))
+            self.assertTrue(user.is_authenticated and user.is_active)
+        # The rest of the row is loaded at once, on first use
+        with self.assertNumQueries(1):
+            self.assertEqual((user.first_name, user.last_name, user.date_joined), ("Jane", "", self.user.date_joined))
+
+    def test_tokens_without_claims_load_the_user(self):
+        access = RefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate(access).first_name, "Jane")
+
+    def test_deactivation_revokes_tokens(self):
+        issued = self.login()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(issued["access"])
+        response = self.client.post("/api/auth/token/refresh/", {"refresh": issued["refresh"]})
+        self.assertEqual(response.status_code, 401)
+
+    def test_saving_revokes_tokens_and_refresh_updates_claims(self):
+        issued = self.login()
+        self.user.email = "jane@new.example.com"
+        with mock.patch.object(tokens.time, "time", return_value=time.time() + 5):
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(issued["access"])
+        response = self.client.post("/api/auth/token/refresh/", {"refresh": issued["refresh"]})
+        self.assertEqual(AccessToken(response.data["access"])["email"], "jane@new.example.com")
+
+    def test_unrelated_saves_keep_tokens(self):
+        access = self.login()["access"]
+        self.user.save(update_fields=["last_login"])
+        self.user.first_name = "Janet"
+        with mock.patch.object(tokens.time, "time", return_value=time.time() + 5):
+            self.user.save()
+            User.objects.get(pk=self.user.pk).save()
+        self.assertEqual(self.authenticate(access).pk, self.user.pk)
+
+    def test_unchanged_save_of_claims_user_keeps_tokens(self):
+        access = self.login()["access"]
+        user = self.authenticate(access)
+        user.last_name = user.first_name
+        with self.assertNumQueries(2), mock.patch.object(tokens.time, "time", return_value=time.time() + 5):
+            # The password, loaded after the claims, is compared with the row
+            user.save()
+        self.assertEqual(self.authenticate(access).pk, self.user.pk)
+
+    def test_password_change_revokes_tokens(self):
+        access = self.login()["access"]
+        self.user.set_password("new-password")
+        with mock.patch.object(tokens.time, "time", return_value=time.time() + 5):
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_claim_saved_later_still_revokes(self):
+        access = self.login()["access"]
+        self.user.email = "jane@new.example.com"
+        self.user.save(update_fields=["first_name"])
+        self.assertEqual(self.authenticate(access).pk, self.user.pk)
+        with mock.patch.object(tokens.time, "time", return_value=time.time() + 5):
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access)
+
+
+class RefreshTokenBlacklistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.reset()
+        get_backend().reset()
+        User.objects.create_user("jane", "jane@example.com", "pw")
+
+    def refresh(self, token):
+        return self.client.post("/api/auth/token/refresh/", {"refresh": token})
+
+    def test_rotated_token_cannot_be_reused(self):
+        issued = self.client.post("/api/auth/login/", {"username": "jane", "password": "pw"}).data
+        response = self.refresh(issued["refresh"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(response.data["refresh"]).status_code, 200)
+        self.assertEqual(self.refresh(issued["refresh"]).status_code, 401)
+        self.assertEqual(BlacklistedToken.objects.count(), 2)
+
+    def test_token_blacklisted_by_another_process_is_refused(self):
+        issued = self.client.post("/api/auth/login/", {"username": "jane", "password": "pw"}).data
+        blacklist_filter.might_contain("load")
+        jti = RefreshToken(issued["refresh"], verify=False)["jti"]
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+        self.assertFalse(blacklist_filter.might_contain(jti))
+        self.assertEqual(self.refresh(issued["refresh"]).status_code, 401)
+
+    def test_purge_deletes_expired_tokens_in_batches(self):
+        now = timezone.now()
+        for index in range(5):
+            expired = OutstandingToken.objects.create(
+                jti=f"expired-{index}", token="", expires_at=now - timedelta(days=1)
+            )
+            if index % 2:
+                BlacklistedToken.objects.create(token=expired)
+        OutstandingToken.objects.create(jti="current", token="", expires_at=now + timedelta(days=1))
+        self.assertEqual(call_command_output("purge_expired_tokens", batch_size=2), "5 expired token(s) purged")
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), ["current"])
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(1000, 0.01)
+        for index in range(1000):
+            bloom.add(f"in-{index}")
+        self.assertTrue(all(f"in-{index}" in bloom for index in range(1000)))
+        false_positives = sum(f"out-{index}" in bloom for index in range(10000))
+        self.assertLess(false_positives, 300)
@@ -0,0 +1,145 @@
+"""
+SimpleJWT tokens that carry what the API needs to know about their user.
+
+Access tokens hold the user's username, email and staff flag, so that
+``users.authentication.StatelessJWTAuthentication`` can build the request
+user without reading the user table. Claims are written at login and
+re-read from the database on every refresh.
+
+Saving a change to a claimed field, the active flag or the password
+revokes the access tokens issued before the save: clients refresh and
+get tokens with the new claims. A deactivated user's tokens
+are all refused until they expire. Revocations live in the default cache,
+so they reach other processes only through a shared cache backend; the
+default LocMemCache keeps them per process.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.exceptions import AuthenticationFailed
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import serializers, tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .blacklist import blacklist, is_blacklisted, outstand
+from .models import User
+
+# claim -> User field
+USER_CLAIMS = {"username": "username", "email": "email", "is_staff": "is_staff"}
+# Changing any of these makes outstanding tokens stale or, for the
+# password, must sign the user out
+CLAIMED_FIELDS = {"username", "email", "is_staff", "is_active", "password"}
+REVOKED_KEY = "users:tokens-revoked:{}"
+
+
+def add_user_claims(token, user):
+    for claim, field in USER_CLAIMS.items():
+        token[claim] = getattr(user, field)
+    return token
+
+
+def revoke_tokens(user_ids, everything=False):
+    """
+    Refuse access tokens of ``user_ids`` issued before now.
+
+    With ``everything`` the tokens issued until they could have expired are
+    refused as well, for users who must not get new ones.
+    """
+    lifetime = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    now = int(time.time())
+    not_before = now + lifetime + 1 if everything else now
+    cache.set_many({REVOKED_KEY.format(pk): not_before for pk in user_ids}, lifetime + 1)
+
+
+def is_revoked(user_id, issued_at):
+    not_before = cache.get(REVOKED_KEY.format(user_id))
+    return not_before is not None and (issued_at is None or issued_at < not_before)
+
+
+class RefreshToken(tokens.RefreshToken):
+    """A refresh token checked against the blacklist filter (``users.blacklist``)."""
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+
+class TokenObtainPairSerializer(serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    """
+    SimpleJWT's refresh, giving the new access token the user's current
+    claims. The rotated token is blacklisted before the new one is
+    recorded, so a token refreshed twice, even concurrently, is refused
+    the second time.
+    """
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        data = {"access": str(add_user_claims(refresh.access_token, user))}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                blacklist(refresh, user.pk)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            outstand(refresh, user.pk)
+            data["refresh"] = str(refresh)
+        return data
+
+
+def _claimed_values(user):
+    # Deferred fields are left out rather than loaded
+    return {field: user.__dict__[field] for field in CLAIMED_FIELDS if field in user.__dict__}
+
+
+@receiver(post_init, sender=User)
+def _remember_claimed_values(sender, instance, **kwargs):
+    instance._saved_claims = _claimed_values(instance)
+
+
+@receiver(pre_save, sender=User)
+def _compare_claimed_values(sender, instance, update_fields=None, raw=False, **kwargs):
+    instance._claims_changed = False
+    if raw or instance._state.adding:
+        return
+    fields = CLAIMED_FIELDS if update_fields is None else CLAIMED_FIELDS & set(update_fields)
+    current = {field: value for field, value in _claimed_values(instance).items() if field in fields}
+    saved = instance._saved_claims
+    # Fields deferred when the user was loaded are compared with the row
+    unknown = [field for field in current if field not in saved]
+    if unknown:
+        row = sender._base_manager.filter(pk=instance.pk).values(*unknown).first() or {}
+        saved = {**saved, **row}
+    instance._claims_changed = any(saved.get(field) != value for field, value in current.items())
+
+
+@receiver(post_save, sender=User)
+def _revoke_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if instance._claims_changed:
+        revoke_tokens([instance.pk], everything=not instance.is_active)
+    instance._saved_claims.update(
+        (field, value) for field, value in _claimed_values(instance).items()
+        if update_fields is None or field in update_fields
+    )
+
+
+@receiver(post_delete, sender=User)
+def _revoke_on_delete(sender, instance, **kwargs):
+    revoke_tokens([instance.pk], everything=True)
@@ -0,0 +1,191 @@
+"""
+Streaming upload handling for profile images.
+
+``ProfileImageUploadHandler`` replaces Django's default upload handlers
+for the upload-image endpoint. It never buffers the whole body: each
+chunk is checked and written straight to the file's final storage path.
+"""
+import os
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+from PIL import Image
+
+from .models import UserProfile
+
+MAX_IMAGE_SIZE = 5 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
+# Give up if the image dimensions are not found in the first bytes
+MAX_HEADER_SIZE = 512 * 1024
+
+# Pillow format -> content type; the client-supplied content type is ignored
+IMAGE_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp',
+}
+
+
+def sniff_format(head):
+    """Return the Pillow format name for the file's magic bytes, if allowed."""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'JPEG'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'PNG'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'GIF'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+class UploadRejected(Exception):
+    pass
+
+
+class StoredImage(UploadedFile):
+    """
+    An upload that has already been written to storage.
+
+    ``name`` is the basename, as for any upload; ``stored_name`` is the
+    storage name to assign to the image field.
+    """
+
+    def __init__(self, stored_name, size, content_type, width, height):
+        super().__init__(file=None, name=stored_name, content_type=content_type, size=size)
+        self.stored_name = stored_name
+        self.width = width
+        self.height = height
+
+    def __repr__(self):
+        return f"<StoredImage: {self.stored_name} ({self.content_type})>"
+
+
+class ProfileImageUploadHandler(FileUploadHandler):
+    """
+    Validates and stores the ``profile_image`` field while it streams in.
+
+    - The magic bytes of the first chunk decide the type.
+    - Pillow parses only the header, so dimensions are checked without
+      decoding pixels and decompression bombs are rejected early.
+    - More than ``MAX_IMAGE_SIZE`` bytes aborts the file; the rest of the
+      body is read and discarded without being kept.
+
+    Any problem is stored on ``error`` and the file is skipped.
+    """
+    field_name = 'profile_image'
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.field = UserProfile._meta.get_field('profile_image')
+        self.storage = self.field.storage
+        self.error = None
+        self.destination = None
+        self.stored_name = None
+        self.is_local = True
+        self.image_format = None
+        self.dimensions = None
+        self.head = bytearray()
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        if field_name != self.field_name or self.destination is not None:
+            raise SkipFile()
+        self.stored_name, self.destination = self._open_destination(file_name)
+        raise StopFutureHandlers()
+
+    def _open_destination(self, file_name):
+        name = self.field.generate_filename(None, file_name)
+        try:
+            self.storage.path(name)
+        except NotImplementedError:
+            # Storage without local paths: spool, then save once complete
+            self.is_local = False
+            return name, tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+
+        while True:
+            name = self.storage.get_available_name(name)
+            path = self.storage.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+            except FileExistsError:
+                continue
+            if self.storage.file_permissions_mode is not None:
+                os.chmod(path, self.storage.file_permissions_mode)
+            return name, os.fdopen(fd, 'wb')
+
+    def _check_header(self, final=False):
+        if self.image_format is None:
+            if len(self.head) < 12 and not final:
+                return
+            self.image_format = sniff_format(bytes(self.head[:12]))
+            if self.image_format is None:
+                raise UploadRejected('Invalid file type.')
+        try:
+            with Image.open(BytesIO(self.head), formats=[self.image_format]) as image:
+                self.dimensions = image.size
+        except Image.DecompressionBombError:
+            raise UploadRejected('Image dimensions too large.')
+        except Exception:
+            # Header not complete yet
+            if final or len(self.head) >= MAX_HEADER_SIZE:
+                raise UploadRejected('Invalid image file.')
+            return
+        width, height = self.dimensions
+        if width * height > MAX_IMAGE_PIXELS:
+            raise UploadRejected('Image dimensions too large.')
+
+    def receive_data_chunk(self, raw_data, start):
+        try:
+            if start + len(raw_data) > MAX_IMAGE_SIZE:
+                raise UploadRejected('File too large.')
+            if self.dimensions is None:
+                self.head += raw_data
+                self._check_header()
+                if self.dimensions is not None:
+                    self.head = bytearray()
+        except UploadRejected as exc:
+            self._reject(str(exc))
+            raise SkipFile()
+        self.destination.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.destination is None or self.error:
+            return None
+        if self.dimensions is None:
+            try:
+                self._check_header(final=True)
+            except UploadRejected as exc:
+                self._reject(str(exc))
+                return None
+        if self.is_local:
+            self.destination.close()
+        else:
+            self.destination.seek(0)
+            self.stored_name = self.storage.save(self.stored_name, self.destination)
+            self.destination.close()
+        self.destination = None
+        width, height = self.dimensions
+        return StoredImage(
+            self.stored_name, file_size, IMAGE_TYPES[self.image_format], width, height
+        )
+
+    def _reject(self, message):
+        self.error = message
+        self._discard()
+
+    def _discard(self):
+        if self.destination is not None:
+            self.destination.close()
+            self.destination = None
+            if self.is_local:
+                self.storage.delete(self.stored_name)
+
+    def upload_interrupted(self):
+        self._discard()
@@ -2,9 +2,9 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     CertificationViewSet, SkillViewSet, LanguageViewSet, 
-    SkillCategoryViewSet, UserProfileViewSet, UserViewSet
+    SkillCategoryViewSet, UserProfileViewSet, UserViewSet, ClerkWebhookView, LoginView
 )
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
 
 router = DefaultRouter()
 router.register(r'profile/certifications', CertificationViewSet, basename='certification')
@@ -17,10 +17,12 @@ router.register(r'profile', UserProfileViewSet, basename='profile')
 router.register(r'users', UserViewSet, basename='user')
 
 urlpatterns = [
-    path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('login/', LoginView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('', include(router.urls)),
     # Legacy/Convenience mapping:
     path('me/', UserViewSet.as_view({'get': 'me'}), name='current-user'),
-    path('register/', UserViewSet.as_view({'post': 'register'}), name='register-user'),
+    # With the action's own options (its AllowAny), as the router would
+    path('register/', UserViewSet.as_view({'post': 'register'}, **UserViewSet.register.kwargs), name='register-user'),
+    path('webhooks/clerk/', ClerkWebhookView.as_view(), name='clerk-webhook'),
 ]
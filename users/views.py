@@ -1,10 +1,16 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from . import aggregates
 from .models import Certification, Language, Skill, SkillCategory, UserProfile
 from .serializers import (
+    ID_LIST_FIELDS,
     LanguageSerializer,
     SkillCategorySerializer,
     SkillSerializer,
@@ -13,46 +19,51 @@ from .serializers import (
     UserRegistrationSerializer,
     CertificationSerializer,
 )
+from portfolio.mixins import ConditionalGetMixin
+from portfolio.owner import get_public_owner
+from .sync import SyncError, sync_certifications, sync_languages, sync_skill_categories
+from .uploads import MAX_IMAGE_SIZE, ProfileImageUploadHandler
+from .webhooks import record_event, schedule_processing
+from svix.webhooks import Webhook, WebhookVerificationError
 import os
 from datetime import datetime
 
 User = get_user_model()
 
-class BaseProfileViewSet(viewsets.ModelViewSet):
+# Multipart boundaries and headers around the image itself
+UPLOAD_OVERHEAD = 64 * 1024
+
+class BaseProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     Base ViewSet handling the logic for retrieval:
     - If authenticated, return current user's items.
-    - If anonymous, return 'AbuArwa001' items (Public Portfolio Mode).
+    - If anonymous, return the public portfolio owner's items (Public Portfolio Mode).
     """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-
-    def get_target_user(self):
-        if self.request.user.is_authenticated:
-            return self.request.user
-        try:
-            return User.objects.get(username="AbuArwa001")
-        except User.DoesNotExist:
-            return None
+    version_collections = ('profile',)
 
     def get_profile(self):
-        user = self.get_target_user()
-        if not user:
-            return None
+        # Current user's profile, created on first access
+        user = self.request.user
         try:
             return user.profile
         except UserProfile.DoesNotExist:
-             if user == self.request.user:
-                 return UserProfile.objects.create(user=user)
-             return None
+            return UserProfile.objects.create(user=user)
+
+    def get_target_profile_id(self):
+        if self.request.user.is_authenticated:
+            return self.get_profile().pk
+        owner = get_public_owner()
+        return owner.profile_id if owner else None
 
 class CertificationViewSet(BaseProfileViewSet):
     serializer_class = CertificationSerializer
     
     def get_queryset(self):
-        profile = self.get_profile()
-        if not profile:
+        profile_id = self.get_target_profile_id()
+        if not profile_id:
             return Certification.objects.none()
-        return profile.certifications.all()
+        return Certification.objects.filter(userprofile=profile_id)
 
     def perform_create(self, serializer):
         cert = serializer.save(user=self.request.user)
@@ -60,41 +71,15 @@ class CertificationViewSet(BaseProfileViewSet):
 
     @action(detail=False, methods=['post'], url_path='bulk-update')
     def bulk_update(self, request):
-        profile = self.request.user.profile
         data = request.data
-        
         if not isinstance(data, list):
             return Response({"error": "Expected a list of certifications"}, status=400)
-        
-        # Clear existing? Original code did clear.
-        profile.certifications.clear()
-        
-        for cert_data in data:
-            in_progress = cert_data.get('inProgress', cert_data.get('in_progress', False))
-            
-            # Use get_or_create to avoid duplicates if title/issuer matches
-            cert, created = Certification.objects.get_or_create(
-                title=cert_data['title'],
-                issuer=cert_data['issuer'],
-                defaults={
-                    'date': cert_data['date'],
-                    'in_progress': in_progress,
-                    'type': cert_data.get('type', 'other'),
-                    'badge': cert_data.get('badge', ''),
-                    'user': request.user
-                }
-            )
-            
-            if not created:
-                cert.date = cert_data['date']
-                cert.in_progress = in_progress
-                cert.type = cert_data.get('type', 'other')
-                cert.badge = cert_data.get('badge', '')
-                cert.save()
-            
-            profile.certifications.add(cert)
-        
-        return Response({'status': 'Certifications updated successfully'})
+
+        try:
+            result = sync_certifications(self.get_profile(), data, user=request.user)
+        except SyncError as exc:
+            return Response({"error": str(exc)}, status=400)
+        return Response({'status': 'Certifications updated successfully', **result._asdict()})
 
     def perform_destroy(self, instance):
         # Remove from profile but don't delete object if we want to keep it generic?
@@ -110,10 +95,10 @@ class LanguageViewSet(BaseProfileViewSet):
     serializer_class = LanguageSerializer
 
     def get_queryset(self):
-        profile = self.get_profile()
-        if not profile:
+        profile_id = self.get_target_profile_id()
+        if not profile_id:
             return Language.objects.none()
-        return profile.languages.all()
+        return Language.objects.filter(userprofile=profile_id)
 
     def perform_create(self, serializer):
         lang = serializer.save()
@@ -121,92 +106,81 @@ class LanguageViewSet(BaseProfileViewSet):
 
     @action(detail=False, methods=['post'], url_path='bulk-update')
     def bulk_update(self, request):
-        profile = self.request.user.profile
         data = request.data
         if not isinstance(data, list):
             return Response({"error": "Expected a list of languages"}, status=400)
-        
-        profile.languages.clear()
-        for lang_data in data:
-            lang, _ = Language.objects.get_or_create(
-                name=lang_data['name'],
-                proficiency=lang_data['proficiency']
-            )
-            profile.languages.add(lang)
-        return Response({'status': 'Languages updated successfully'})
+
+        try:
+            result = sync_languages(self.get_profile(), data)
+        except SyncError as exc:
+            return Response({"error": str(exc)}, status=400)
+        return Response({'status': 'Languages updated successfully', **result._asdict()})
 
 class SkillCategoryViewSet(BaseProfileViewSet):
     serializer_class = SkillCategorySerializer
 
     def get_queryset(self):
-        profile = self.get_profile()
-        if not profile:
+        profile_id = self.get_target_profile_id()
+        if not profile_id:
             return SkillCategory.objects.none()
-        return profile.skill_categories.all()
+        return SkillCategory.objects.filter(userprofile=profile_id).prefetch_related('skills')
 
     @action(detail=False, methods=['post'], url_path='bulk-update')
     def bulk_update(self, request):
-        profile = self.request.user.profile
         data = request.data
         if not isinstance(data, list):
             return Response({"error": "Expected a list of skill categories"}, status=400)
-        
-        profile.skill_categories.clear() # Maybe dangerous if multiple sessions? But consistent with old code.
-        
-        for category_data in data:
-            category, _ = SkillCategory.objects.get_or_create(name=category_data['category'])
-            
-            # Handle skills within category
-            if 'skills' in category_data:
-                for skill_data in category_data['skills']:
-                     skill, created = Skill.objects.get_or_create(
-                        name=skill_data['name'],
-                        category=category,
-                        defaults={'level': skill_data['level']}
-                     )
-                     if not created:
-                         skill.level = skill_data['level']
-                         skill.save()
-            
-            profile.skill_categories.add(category)
-        return Response({'status': 'Skills updated successfully'})
+
+        try:
+            result = sync_skill_categories(self.get_profile(), data)
+        except SyncError as exc:
+            return Response({"error": str(exc)}, status=400)
+        return Response({'status': 'Skills updated successfully', **result._asdict()})
 
 class SkillViewSet(BaseProfileViewSet):
     serializer_class = SkillSerializer
 
     def get_queryset(self):
-        profile = self.get_profile()
-        if not profile:
+        profile_id = self.get_target_profile_id()
+        if not profile_id:
             return Skill.objects.none()
         
-        # Original logic: return skills that belong to the categories the user has
-        user_categories = profile.skill_categories.all()
-        return Skill.objects.filter(category__in=user_categories)
+        # Skills that belong to the categories the user has, as a single join
+        return Skill.objects.filter(category__userprofile=profile_id)
 
     def perform_create(self, serializer):
         skill = serializer.save()
         if skill.category not in self.request.user.profile.skill_categories.all():
             self.request.user.profile.skill_categories.add(skill.category)
 
-class UserProfileViewSet(viewsets.ViewSet):
+class UserProfileViewSet(ConditionalGetMixin, viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    version_collections = ('profile',)
+
+    def get_queryset(self):
+        queryset = UserProfile.objects.select_related('user')
+        if not aggregates.supported():
+            return queryset.prefetch_related(*ID_LIST_FIELDS)
+        # The id lists rendered by UserProfileSerializer, in the same query
+        return queryset.annotate(**{
+            f'{field}_ids': aggregates.id_list(UserProfile, field) for field in ID_LIST_FIELDS
+        })
 
     def list(self, request):
         # Handles GET /api/auth/profile/
-        user = request.user if request.user.is_authenticated else None
-        if not user:
-            try:
-                user = User.objects.get(username="AbuArwa001")
-            except User.DoesNotExist:
-                return Response({'error': 'User not found'}, status=404)
-        
+        if request.user.is_authenticated:
+            profile, _ = self.get_queryset().get_or_create(user=request.user)
+            return Response(UserProfileSerializer(profile).data)
+
+        owner = get_public_owner()
+        if not owner:
+            return Response({'error': 'User not found'}, status=404)
+        if not owner.profile_id:
+            return Response({'error': 'Profile not found'}, status=404)
         try:
-            profile = user.profile
+            profile = self.get_queryset().get(pk=owner.profile_id)
         except UserProfile.DoesNotExist:
-            if request.user.is_authenticated and user == request.user:
-                profile = UserProfile.objects.create(user=user)
-            else:
-                return Response({'error': 'Profile not found'}, status=404)
+            return Response({'error': 'Profile not found'}, status=404)
         
         return Response(UserProfileSerializer(profile).data)
 
@@ -215,7 +189,7 @@ class UserProfileViewSet(viewsets.ViewSet):
         if not request.user.is_authenticated:
             return Response({'error': 'Authentication required'}, status=401)
         
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        profile, _ = self.get_queryset().get_or_create(user=request.user)
         serializer = UserProfileSerializer(profile, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -237,29 +211,39 @@ class UserProfileViewSet(viewsets.ViewSet):
         if not request.user.is_authenticated:
             return Response({'error': 'Authentication required'}, status=401)
         
-        if 'profile_image' not in request.FILES:
-            return Response({'error': 'No image file provided'}, status=400)
-        
-        uploaded_file = request.FILES['profile_image']
-        allowed_types = ['image/jpeg', 'image/png', 'image/gif', 'image/webp']
-        if uploaded_file.content_type not in allowed_types:
-             return Response({'error': 'Invalid file type.'}, status=400)
-        
-        if uploaded_file.size > 5 * 1024 * 1024:
+        # Refuse obviously oversized bodies before reading any of them
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > MAX_IMAGE_SIZE + UPLOAD_OVERHEAD:
             return Response({'error': 'File too large.'}, status=400)
 
+        # Validate and write the image while the body streams in
+        handler = ProfileImageUploadHandler(request._request)
+        request._request.upload_handlers = [handler]
+        uploaded_file = request.FILES.get('profile_image')
+        if handler.error:
+            return Response({'error': handler.error}, status=400)
+        if uploaded_file is None:
+            return Response({'error': 'No image file provided'}, status=400)
+
         profile, _ = UserProfile.objects.get_or_create(user=request.user)
-        
-        # Logic to delete old image
-        if profile.profile_image:
-             try:
-                 if os.path.isfile(profile.profile_image.path):
-                     os.remove(profile.profile_image.path)
-             except Exception:
-                 pass
-        
-        profile.profile_image = uploaded_file
-        profile.save()
+        old_image = profile.profile_image.name
+        storage = profile.profile_image.storage
+
+        # The handler already stored the file, so only its name is assigned
+        profile.profile_image = uploaded_file.stored_name
+        try:
+            profile.save()
+        except Exception:
+            # Nothing refers to the new file
+            storage.delete(uploaded_file.stored_name)
+            raise
+
+        if old_image and old_image != uploaded_file.stored_name:
+            # Only once the new name is committed
+            transaction.on_commit(lambda: storage.delete(old_image), robust=True)
         return Response({'message': 'Profile image uploaded successfully', 'imageUrl': profile.profile_image.url})
 
 
@@ -270,6 +254,11 @@ class UserProfileViewSet(viewsets.ViewSet):
 
 
 class UserViewSet(viewsets.ViewSet):
+    def get_throttles(self):
+        # Registration hashes a password; throttled per IP (portfolio.throttling)
+        self.throttle_scope = "register" if self.action == "register" else None
+        return super().get_throttles()
+
     @action(detail=False, methods=['get'])
     def me(self, request):
         if not request.user.is_authenticated:
@@ -291,3 +280,31 @@ class UserViewSet(viewsets.ViewSet):
             return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+class LoginView(TokenObtainPairView):
+    # Every attempt hashes a password; throttled per IP (portfolio.throttling)
+    throttle_scope = "login"
+
+
+class ClerkWebhookView(APIView):
+    """
+    Receives Clerk webhooks (svix-signed). Events are only verified and
+    recorded here; ``users.webhooks`` applies them in the background.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        secret = settings.CLERK_WEBHOOK_SECRET
+        if not secret:
+            return Response({'error': 'Webhook secret not configured'}, status=503)
+
+        headers = {name: request.headers.get(name, '') for name in ('svix-id', 'svix-timestamp', 'svix-signature')}
+        try:
+            payload = Webhook(secret).verify(request.body, headers)
+        except WebhookVerificationError:
+            return Response({'error': 'Invalid signature'}, status=400)
+
+        record_event(headers['svix-id'], payload)
+        schedule_processing()
+        return Response({'status': 'received'})
@@ -0,0 +1,226 @@
+"""
+Clerk webhook ingestion.
+
+``ClerkWebhookView`` verifies the svix signature, records the event in the
+``WebhookEvent`` inbox and answers at once; redeliveries of a message id
+are ignored. A single background worker then applies pending events in
+batches. Within a batch the events for one Clerk user are coalesced into
+their final state, so a burst of updates costs one write per user.
+``manage.py process_webhook_events`` drains the inbox by hand, e.g. after
+a restart or to retry failures.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from portfolio.versioning import bump_versions
+
+from .authentication import clerk_users
+from .models import User, WebhookEvent
+from .tokens import revoke_tokens
+
+logger = logging.getLogger(__name__)
+
+USER_EVENTS = ("user.created", "user.updated", "user.deleted")
+USER_SYNC_FIELDS = ("email", "first_name", "last_name")
+BATCH_SIZE = 500
+# Events failing this many times are left for manual inspection
+MAX_ATTEMPTS = 5
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clerk-webhooks")
+_scheduled = threading.Event()
+
+
+def record_event(svix_id, payload):
+    """Store an event unless its message id was already received."""
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(svix_id=svix_id, event_type=payload.get("type", ""), payload=payload)],
+        ignore_conflicts=True,
+    )
+
+
+def _primary_address(data):
+    for address in data.get("email_addresses") or []:
+        if address.get("id") == data.get("primary_email_address_id"):
+            return address
+    return {}
+
+
+def primary_email(data):
+    """The user's primary address, or ``None`` (stored as NULL) if there is none."""
+    return _primary_address(data).get("email_address") or None
+
+
+def verified_email(data):
+    """The user's primary address if Clerk has verified it, else ``None``."""
+    address = _primary_address(data)
+    if (address.get("verification") or {}).get("status") == "verified":
+        return address.get("email_address") or None
+    return None
+
+
+def coalesce(events):
+    """
+    Reduce events to the final state of each Clerk user.
+
+    Returns ``{clerk_user_id: data or None}``, where ``None`` means the user
+    was deleted last. Events are applied in the order Clerk sent them.
+    """
+    states = {}
+    for event in sorted(events, key=lambda event: (event.payload.get("timestamp") or 0, event.pk)):
+        data = event.payload.get("data") or {}
+        clerk_user_id = data.get("id")
+        if event.event_type not in USER_EVENTS or not clerk_user_id:
+            continue
+        if event.event_type == "user.deleted":
+            states[clerk_user_id] = None
+        else:
+            states[clerk_user_id] = {
+                "email": primary_email(data),
+                "first_name": data.get("first_name") or "",
+                "last_name": data.get("last_name") or "",
+                "verified_email": verified_email(data),
+            }
+    return states
+
+
+def apply_user_states(states):
+    """Write coalesced user states with bulk queries; returns the number of users changed."""
+    deleted = [clerk_user_id for clerk_user_id, state in states.items() if state is None]
+    upserts = {clerk_user_id: state for clerk_user_id, state in states.items() if state is not None}
+    changed = 0
+    if deleted:
+        # Deleted one by one through the ORM so cascades and signals run
+        for user in User.objects.filter(clerk_user_id__in=deleted):
+            user.delete()
+            changed += 1
+    if not upserts:
+        return changed
+
+    existing = {user.clerk_user_id: user for user in User.objects.filter(clerk_user_id__in=upserts)}
+    emails = {state["email"] for state in upserts.values() if state["email"]}
+    # Users who signed up before Clerk are linked by a verified primary
+    # address instead of duplicated; staff accounts are never taken over
+    verified = {state["verified_email"] for state in upserts.values() if state["verified_email"]}
+    unlinked, taken_emails = {}, {}
+    for user in User.objects.filter(email__in=emails):
+        taken_emails[user.email] = user.pk
+        if user.email in verified and user.clerk_user_id is None and not (user.is_staff or user.is_superuser):
+            unlinked[user.email] = user
+    taken_usernames = set(User.objects.filter(username__in=emails).values_list("username", flat=True))
+
+    to_create, to_update = [], []
+    for clerk_user_id, state in upserts.items():
+        user = existing.get(clerk_user_id) or unlinked.pop(state["verified_email"], None)
+        email = state["email"]
+        if email in taken_emails and (user is None or taken_emails[email] != user.pk):
+            # Another account has the address; it is not copied onto this one
+            email = None
+        if user is None:
+            username = email
+            if not username or username in taken_usernames:
+                username = clerk_user_id
+            taken_usernames.add(username)
+            user = User(
+                username=username, clerk_user_id=clerk_user_id, email=email,
+                first_name=state["first_name"], last_name=state["last_name"],
+            )
+            user.set_unusable_password()
+            to_create.append(user)
+            if email:
+                taken_emails[email] = None
+            continue
+        if email:
+            taken_emails[email] = user.pk
+        state = {**state, "email": email}
+        values = {field: state[field] or getattr(user, field) for field in USER_SYNC_FIELDS}
+        if user.clerk_user_id != clerk_user_id or any(getattr(user, f) != v for f, v in values.items()):
+            user.clerk_user_id = clerk_user_id
+            for field, value in values.items():
+                setattr(user, field, value)
+            to_update.append(user)
+
+    User.objects.bulk_create(to_create)
+    User.objects.bulk_update(to_update, ["clerk_user_id", *USER_SYNC_FIELDS])
+    if to_create or to_update:
+        # bulk writes send no signals
+        bump_versions("profile")
+        for user in to_update:
+            clerk_users.discard(user.clerk_user_id)
+        revoke_tokens([user.pk for user in to_update])
+    return changed + len(to_create) + len(to_update)
+
+
+def process_batch(batch_size=BATCH_SIZE):
+    """Apply up to ``batch_size`` pending events; returns how many were handled."""
+    with transaction.atomic():
+        events = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True, attempts__lt=MAX_ATTEMPTS)
+            .order_by("id")[:batch_size]
+        )
+        if not events:
+            return 0
+        try:
+            with transaction.atomic():
+                apply_user_states(coalesce(events))
+            done, failed = events, []
+        except Exception:
+            # Retry one by one so a single bad event does not hold back the rest
+            logger.warning("Batch of %d Clerk webhook events failed; retrying singly", len(events))
+            done, failed = [], []
+            for event in events:
+                try:
+                    with transaction.atomic():
+                        apply_user_states(coalesce([event]))
+                    done.append(event)
+                except Exception as exc:
+                    logger.exception("Clerk webhook event %s failed", event.svix_id)
+                    event.attempts += 1
+                    event.error = str(exc)
+                    failed.append(event)
+        WebhookEvent.objects.filter(pk__in=[event.pk for event in done]).update(
+            processed_at=timezone.now(), error=""
+        )
+        WebhookEvent.objects.bulk_update(failed, ["attempts", "error"])
+    return len(events)
+
+
+def process_pending(batch_size=BATCH_SIZE):
+    """Apply pending events batch by batch until none are left."""
+    total = 0
+    while True:
+        handled = process_batch(batch_size)
+        if not handled:
+            return total
+        total += handled
+
+
+def _run_in_background():
+    try:
+        # Cleared first, so events arriving meanwhile schedule another run
+        _scheduled.clear()
+        process_pending()
+    except Exception:
+        logger.exception("Processing Clerk webhook events failed")
+    finally:
+        connections.close_all()
+
+
+def schedule_processing():
+    """Drain the inbox after the current transaction commits."""
+    if not settings.CLERK_WEBHOOKS_ASYNC:
+        transaction.on_commit(process_pending)
+        return
+
+    def submit():
+        # One queued run covers every event recorded before it starts
+        if not _scheduled.is_set():
+            _scheduled.set()
+            _executor.submit(_run_in_background)
+
+    transaction.on_commit(submit)